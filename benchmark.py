@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Hippodrome Benchmark Harness
+Measures the solver, the database builder and the explorer API
+
+    sample   Pick a fixed set of configurations per move-count bucket from a
+             solutions CSV or target database and save it as JSON
+    run      Benchmark against a sample file and write the results as JSON
+    compare  Report the change between two results files and flag regressions
+    scaling  Build distance tables for several board sizes and piece sets and
+             record state count, build time and peak memory of each
+
+The same sample file always yields the same workload, so results from
+different commits can be compared directly.
+"""
+
+import argparse
+import contextlib
+import csv
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from hippodrome.board import TARGETS, parse_geometry
+from hippodrome.configs import count_arrangements
+from hippodrome.distances import UNREACHABLE, build_distance_table
+from hippodrome.solver import solve
+from validate_solutions import read_chunks, resolve_target
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend_explorer')
+
+DEFAULT_BUCKET_WIDTH = 5
+DEFAULT_PER_BUCKET = 5
+DEFAULT_CONCURRENCY = (1, 4, 16)
+DEFAULT_THRESHOLD = 10.0  # percent
+
+# Endpoint name -> path template; {id}, {board}, {min_moves} and {max_moves}
+# are filled from the sample for every request
+API_ENDPOINTS = {
+    'solution': '/api/solution/{id}?target={target}',
+    'solution_moves': '/api/solution/{id}?target={target}&format=moves',
+    'search_by_board': '/api/search_by_board?board={board}&target={target}',
+    'search': '/api/search?min_moves={min_moves}&max_moves={max_moves}&limit=50&target={target}',
+    'puzzles': '/api/puzzles?min_moves={min_moves}&limit=50&target={target}',
+    'stats': '/api/stats?target={target}',
+    'random': '/api/random?target={target}',
+}
+
+# Board sizes and piece sets of the scaling benchmark; each is solved for
+# its top row.  Larger spaces than --max-states are only counted.
+SCALING_VARIANTS = (
+    ('3x3', 'NNNKKRRBx'),
+    ('4x3', 'NNNNKKKRRBBx'),
+    ('4x4', 'KKKKKKKKKKNNNNRx'),
+    ('5x5', 'NNNNNKKKKKKKKKKKKKKKKKKKx'),
+    ('5x5', 'NNNNNQQQQQQQQQQQQQQQQQQQx'),
+    ('5x3', 'NNNNNKKKKRRRBBx'),
+    ('5x5', 'NNNNNKKKKKKKKKKKKKKKKKKRx'),
+    ('4x4', 'NNNNKKKRRRRBBBBx'),
+    ('5x5', 'NNNNNKKKKKKRRRRRRBBBBBBBx'),
+)
+DEFAULT_MAX_STATES = 2000000
+
+# Metrics where a larger value is better; every other metric is a time
+HIGHER_IS_BETTER = ('nodes_per_sec', 'rows_per_sec', 'throughput_rps', 'states_per_sec')
+# Single-sample extremes, reported but too noisy to flag as regressions
+UNFLAGGED = ('max_ms',)
+
+
+def bucket_name(moves: int, width: int) -> str:
+    if moves < 0:
+        return 'unsolvable'
+    start = moves // width * width
+    return f'{start:02d}-{start + width - 1:02d}'
+
+
+def sample_store(store: str, per_bucket: int, bucket_width: int, seed: int) -> Dict[str, List[Dict]]:
+    """
+    Reservoir-sample up to per_bucket solutions from every move-count bucket
+
+    Returns:
+        Bucket name -> list of {'id', 'board', 'moves', 'path'} sorted by id
+    """
+    rng = random.Random(seed)
+    reservoirs: Dict[str, List] = {}
+    seen: Dict[str, int] = {}
+
+    for chunk in read_chunks(store, 100000):
+        for config_id, board, path, moves in chunk:
+            name = bucket_name(moves, bucket_width)
+            seen[name] = seen.get(name, 0) + 1
+            reservoir = reservoirs.setdefault(name, [])
+            record = {'id': config_id, 'board': board, 'moves': moves, 'path': path}
+            if len(reservoir) < per_bucket:
+                reservoir.append(record)
+            else:
+                slot = rng.randrange(seen[name])
+                if slot < per_bucket:
+                    reservoir[slot] = record
+
+    return {name: sorted(records, key=lambda r: r['id']) for name, records in sorted(reservoirs.items())}
+
+
+def sample_digest(samples: Dict) -> str:
+    return hashlib.sha256(json.dumps(samples['buckets'], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def solved_samples(samples: Dict) -> Iterator[Dict]:
+    for name, records in samples['buckets'].items():
+        if name != 'unsolvable':
+            yield from records
+
+
+@contextlib.contextmanager
+def working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict:
+    ordered = sorted(latencies_ms)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+    return {
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def bench_solver(samples: Dict, algorithms: Sequence[str], tt_size: int) -> Dict:
+    """Time-to-solve and nodes/sec of the Python solver per bucket"""
+    target = samples['target_positions']
+    results = {}
+    for algorithm in algorithms:
+        per_bucket = {}
+        for name, records in samples['buckets'].items():
+            if name == 'unsolvable':
+                continue
+            times, stats = [], {}
+            for record in records:
+                start = time.perf_counter()
+                path = solve(record['board'], target, algorithm, tt_size=tt_size, stats=stats)
+                times.append((time.perf_counter() - start) * 1000)
+                if not path:
+                    print(f"⚠️ {algorithm}: no solution for config {record['id']}")
+            total_s = sum(times) / 1000
+            per_bucket[name] = {
+                'configs': len(records),
+                'mean_ms': round(statistics.fmean(times), 3),
+                'max_ms': round(max(times), 3),
+                'expanded': stats['expanded'],
+                'nodes_per_sec': round(stats['expanded'] / total_s) if total_s else 0,
+            }
+            print(f"   {algorithm:5s} {name}: {per_bucket[name]['mean_ms']:9.1f} ms/config, "
+                  f"{per_bucket[name]['nodes_per_sec']:,} nodes/s")
+        results[algorithm] = per_bucket
+    return results
+
+
+def bench_cpp_solver(binary: str, samples: Dict, workdir: str) -> Dict:
+    """Time-to-solve of the compiled solver per bucket, as it reports it"""
+    run_dir = os.path.join(workdir, 'cpp')
+    os.makedirs(run_dir, exist_ok=True)
+    records = list(solved_samples(samples))
+    with open(os.path.join(run_dir, 'filtered_hippodrome_configs.csv'), 'w', encoding='utf-8') as file:
+        file.write('ID,Initial Board\n')
+        for record in records:
+            file.write(f"{record['id']},{record['board']}\n")
+
+    target = ','.join(map(str, samples['target_positions']))
+    subprocess.run([os.path.abspath(binary), 'all', '1', target], cwd=run_dir, check=True,
+                   stdout=subprocess.DEVNULL)
+    output_dir = os.path.join(run_dir, 'solutions_csv')
+    with open(os.path.join(output_dir, os.listdir(output_dir)[0]), 'r', encoding='utf-8') as file:
+        times = {int(row['ID']): float(row['Time (ms)']) for row in csv.DictReader(file)}
+
+    results = {}
+    for name, bucket in samples['buckets'].items():
+        bucket_times = [times[record['id']] for record in bucket if record['id'] in times]
+        if name != 'unsolvable' and bucket_times:
+            results[name] = {'configs': len(bucket_times), 'mean_ms': round(statistics.fmean(bucket_times), 3),
+                             'max_ms': round(max(bucket_times), 3)}
+            print(f"   c++   {name}: {results[name]['mean_ms']:9.1f} ms/config")
+    return results
+
+
+def write_synthetic_csv(samples: Dict, rows: int, csv_path: str) -> None:
+    """A solver CSV of rows solutions, cycling through the sampled ones"""
+    records = list(solved_samples(samples))
+    with open(csv_path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write('ID,Initial Board,Solution Path,Moves,Time (ms)\n')
+        for config_id in range(rows):
+            record = records[config_id % len(records)]
+            file.write(f"{config_id},{record['board']},{record['path']},{record['moves']},1.0\n")
+
+
+def bench_builder(samples: Dict, rows: int, workdir: str) -> Dict:
+    """Ingest rate of create_target_databases.py; leaves the database in workdir"""
+    if FRONTEND_DIR not in sys.path:
+        sys.path.insert(0, FRONTEND_DIR)
+    import create_target_databases
+
+    csv_path = os.path.join(workdir, 'hippodrome_solutions_og.csv')
+    write_synthetic_csv(samples, rows, csv_path)
+    target_config = {'name': samples['target'], 'positions': samples['target_positions'],
+                     'description': samples['target']}
+
+    with working_directory(workdir), contextlib.redirect_stdout(open(os.devnull, 'w')):
+        start = time.perf_counter()
+        ok = create_target_databases.create_target_database(csv_path, target_config)
+        elapsed = time.perf_counter() - start
+        create_target_databases.create_targets_index()
+    if not ok:
+        raise RuntimeError('create_target_database failed')
+
+    db_path = os.path.join(workdir, f"hippodrome_{samples['target'].replace('-', '_')}.db")
+    result = {
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows / elapsed),
+        'db_mb': round(os.path.getsize(db_path) / (1024 * 1024), 2),
+    }
+    print(f"   {rows:,} rows in {elapsed:.2f}s ({result['rows_per_sec']:,} rows/s, {result['db_mb']} MB)")
+    return result
+
+
+def bench_api(samples: Dict, rows: int, workdir: str, concurrency: Sequence[int], requests: int,
+              seed: int) -> Dict:
+    """Latency and throughput of app.py endpoints through the Flask test client"""
+    if FRONTEND_DIR not in sys.path:
+        sys.path.insert(0, FRONTEND_DIR)
+    import app as explorer
+
+    records = list(solved_samples(samples))
+    rng = random.Random(seed)
+    # The same request list for every endpoint and concurrency level
+    fills = []
+    for _ in range(requests):
+        record = rng.choice(records)
+        fills.append({'id': rng.randrange(rows), 'board': record['board'], 'target': samples['target'],
+                      'min_moves': record['moves'], 'max_moves': record['moves'] + DEFAULT_BUCKET_WIDTH})
+
+    def worker(urls: List[str]) -> List[float]:
+        client = explorer.app.test_client()
+        latencies = []
+        for url in urls:
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} returned {response.status_code}')
+        return latencies
+
+    results = {}
+    with working_directory(workdir):
+        # Warm the target (open, mmap, statistics) outside the measurements
+        worker([API_ENDPOINTS['stats'].format(**fills[0])])
+        for endpoint, template in API_ENDPOINTS.items():
+            urls = [template.format(**fill) for fill in fills]
+            per_level = {}
+            for threads in concurrency:
+                with ThreadPoolExecutor(threads) as pool:
+                    start = time.perf_counter()
+                    batches = list(pool.map(worker, [urls[i::threads] for i in range(threads)]))
+                    elapsed = time.perf_counter() - start
+                summary = latency_summary([latency for batch in batches for latency in batch])
+                summary['throughput_rps'] = round(len(urls) / elapsed, 1)
+                per_level[f'c{threads}'] = summary
+                print(f"   {endpoint:16s} c={threads:<3d} p50 {summary['p50_ms']:7.2f} ms, "
+                      f"p99 {summary['p99_ms']:7.2f} ms, {summary['throughput_rps']:8.1f} req/s")
+            results[endpoint] = per_level
+    return results
+
+
+def bench_scaling(variants: Sequence[Tuple[str, str]], max_states: int) -> Dict:
+    """
+    Build the top-row distance table of each board size and piece set
+
+    Returns:
+        Per variant: squares, states and table size, plus build time,
+        throughput, peak traced memory and depth for the tables built
+    """
+    results = {}
+    for size, pieces in variants:
+        geometry = parse_geometry(size)
+        states = count_arrangements(pieces)
+        result = {'squares': geometry.squares, 'states': states, 'table_mb': round(states / (1024 * 1024), 3)}
+        name = f'{size}_{pieces}'
+        if states > max_states:
+            print(f"   {size} {pieces}: {states:,} states (not built, above --max-states)")
+            results[name] = result
+            continue
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        table = build_distance_table(pieces, geometry.targets['top-row'], geometry=geometry)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        reachable = table[table != UNREACHABLE]
+        result.update({
+            'build_s': round(elapsed, 3),
+            'states_per_sec': round(states / elapsed, 1),
+            'peak_mb': round(peak / (1024 * 1024), 1),
+            'reachable': int(len(reachable)),
+            'max_distance': int(reachable.max()) if len(reachable) else None,
+        })
+        print(f"   {size} {pieces}: {states:,} states in {elapsed:.2f}s, peak {result['peak_mb']} MB, "
+              f"max distance {result['max_distance']}")
+        results[name] = result
+    return results
+
+
+def flatten(results: Dict, prefix: str = '') -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """
+    Relative change of every metric present in both results
+
+    Returns:
+        Rows with 'metric', 'baseline', 'current', 'change_pct' and
+        'regression' (worse by more than threshold percent)
+    """
+    old, new = flatten(baseline['results']), flatten(current['results'])
+    rows = []
+    for metric in sorted(old.keys() & new.keys()):
+        leaf = metric.rsplit('.', 1)[-1]
+        if not (leaf.endswith('_ms') or leaf in HIGHER_IS_BETTER) or not old[metric]:
+            continue
+        change = (new[metric] - old[metric]) / old[metric] * 100
+        worse = -change if leaf in HIGHER_IS_BETTER else change
+        rows.append({'metric': metric, 'baseline': old[metric], 'current': new[metric],
+                     'change_pct': round(change, 1), 'regression': leaf not in UNFLAGGED and worse > threshold})
+    return rows
+
+
+def run(args) -> None:
+    with open(args.samples, 'r', encoding='utf-8') as file:
+        samples = json.load(file)
+    sections = args.only or ['solver', 'builder', 'api']
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='hippodrome_bench_')
+    try:
+        if 'solver' in sections:
+            print("\n🧠 Solver")
+            results['solver'] = bench_solver(samples, args.algorithm or ['astar', 'ida'], args.tt_size)
+            if args.solver_binary:
+                results['cpp_solver'] = bench_cpp_solver(args.solver_binary, samples, workdir)
+        if 'builder' in sections or 'api' in sections:
+            print("\n🗄️ Builder")
+            results['builder'] = bench_builder(samples, args.rows, workdir)
+        if 'api' in sections:
+            print("\n🌐 API")
+            results['api'] = bench_api(samples, args.rows, workdir, args.concurrency, args.requests, args.seed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'samples': os.path.basename(args.samples),
+        'sample_digest': sample_digest(samples),
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(output, file, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+
+def scaling(args) -> None:
+    variants = [tuple(variant.split(':', 1)) for variant in args.variant] if args.variant else SCALING_VARIANTS
+    for size, pieces in variants:
+        if len(pieces) != parse_geometry(size).squares:
+            raise SystemExit(f"❌ {len(pieces)} pieces do not fill a {size} board")
+
+    print(f"\n📐 Scaling (building tables up to {args.max_states:,} states)")
+    output = {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': {'scaling': bench_scaling(variants, args.max_states)},
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(output, file, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+
+def compare(args) -> int:
+    with open(args.baseline, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.current, 'r', encoding='utf-8') as file:
+        current = json.load(file)
+
+    if baseline.get('sample_digest') != current.get('sample_digest'):
+        print("⚠️ The results were measured on different sample files")
+
+    rows = compare_results(baseline, current, args.threshold)
+    width = max((len(row['metric']) for row in rows), default=10)
+    print(f"{'metric':{width}s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for row in rows:
+        flag = ' ❌' if row['regression'] else ''
+        print(f"{row['metric']:{width}s} {row['baseline']:12,.3f} {row['current']:12,.3f} "
+              f"{row['change_pct']:+7.1f}%{flag}")
+
+    regressions = sum(row['regression'] for row in rows)
+    if regressions:
+        print(f"\n❌ {regressions} metric(s) regressed by more than {args.threshold}%")
+        return 1
+    print(f"\n✅ No regressions beyond {args.threshold}%")
+    return 0
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark the solver, builder and explorer API')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sample_parser = commands.add_parser('sample', help='Save a fixed per-bucket sample of a solutions store')
+    sample_parser.add_argument('store', help='Solutions CSV or target database (.db)')
+    sample_parser.add_argument('-o', '--output', required=True, help='Sample JSON file')
+    sample_parser.add_argument('--target', help="Target name or squares (default: from the store)")
+    sample_parser.add_argument('--per-bucket', type=int, default=DEFAULT_PER_BUCKET,
+                               help=f'Configurations per bucket (default {DEFAULT_PER_BUCKET})')
+    sample_parser.add_argument('--bucket-width', type=int, default=DEFAULT_BUCKET_WIDTH,
+                               help=f'Move counts per bucket (default {DEFAULT_BUCKET_WIDTH})')
+    sample_parser.add_argument('--seed', type=int, default=0, help='Sampling seed (default 0)')
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks on a sample file')
+    run_parser.add_argument('--samples', required=True, help='Sample JSON written by the sample command')
+    run_parser.add_argument('-o', '--output', default='benchmarks/results.json', help='Results JSON file')
+    run_parser.add_argument('--only', action='append', choices=['solver', 'builder', 'api'],
+                            help='Run only these sections (repeatable)')
+    run_parser.add_argument('--algorithm', action='append', choices=['astar', 'ida'],
+                            help='Python solver algorithms (repeatable, default both)')
+    run_parser.add_argument('--tt-size', type=int, default=1 << 16, help='IDA* transposition table slots')
+    run_parser.add_argument('--solver-binary', help='Also time the compiled solver, e.g. ./solver')
+    run_parser.add_argument('--rows', type=int, default=200000, help='Rows ingested by the builder (default 200000)')
+    run_parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and level (default 500)')
+    run_parser.add_argument('--concurrency', type=int, nargs='+', default=list(DEFAULT_CONCURRENCY),
+                            help='Concurrent clients per level (default 1 4 16)')
+    run_parser.add_argument('--seed', type=int, default=0, help='Request sequence seed (default 0)')
+
+    compare_parser = commands.add_parser('compare', help='Compare two results files')
+    compare_parser.add_argument('baseline', help='Baseline results JSON')
+    compare_parser.add_argument('current', help='Current results JSON')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help=f'Percent change counted as a regression (default {DEFAULT_THRESHOLD})')
+
+    scaling_parser = commands.add_parser('scaling', help='Measure how distance tables scale with board size')
+    scaling_parser.add_argument('-o', '--output', default='benchmarks/scaling.json', help='Results JSON file')
+    scaling_parser.add_argument('--variant', action='append', metavar='SIZE:PIECES',
+                                help="Board size and pieces such as '5x5:NNNNNKKKKKKKKKKKKKKKKKKKx' "
+                                     "(repeatable, default: a built-in set)")
+    scaling_parser.add_argument('--max-states', type=int, default=DEFAULT_MAX_STATES,
+                                help=f'Largest state space to build (default {DEFAULT_MAX_STATES:,})')
+
+    args = parser.parse_args()
+    print("🏇 Hippodrome Benchmarks 🏇")
+    print("=" * 40)
+
+    if args.command == 'sample':
+        target = resolve_target(args.store, args.target)
+        target_name = next((name for name, squares in TARGETS.items() if tuple(squares) == tuple(target)),
+                           'custom-' + ','.join(map(str, target)))
+        buckets = sample_store(args.store, args.per_bucket, args.bucket_width, args.seed)
+        samples = {
+            'store': os.path.basename(args.store),
+            'target': target_name,
+            'target_positions': list(target),
+            'bucket_width': args.bucket_width,
+            'seed': args.seed,
+            'buckets': buckets,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(samples, file, indent=2)
+        for name, records in buckets.items():
+            print(f"   {name}: {len(records)} configs")
+        print(f"✅ Sample written to {args.output} (digest {sample_digest(samples)})")
+    elif args.command == 'run':
+        run(args)
+    elif args.command == 'scaling':
+        scaling(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
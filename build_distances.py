@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Hippodrome Distance Table Builder
+Solves the whole state space of a piece set backwards from the goal
+
+Writes distances_<target>.npy (uint8 per board, indexed by rank) and a
+.json sidecar for each target. The explorer's /api/hint endpoint and the
+validator's --reference option read these tables.  --size builds tables
+for other board dimensions, e.g. --size 3x4 --pieces NNNNKKKRRBBx.
+"""
+
+import argparse
+import os
+import time
+
+from hippodrome.board import DEFAULT_GEOMETRY, parse_geometry
+from hippodrome.configs import count_arrangements
+from hippodrome.distances import build_distance_table, save_distance_table, table_path
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Build whole-state-space distance tables')
+    parser.add_argument('--pieces', required=True, help="Piece multiset, e.g. 'NNNNKKKRRRRBBBBx'")
+    parser.add_argument('--target', action='append', default=[],
+                        help="Target name or squares like '0,1,4,5' (repeatable, default: all named targets)")
+    parser.add_argument('--size', default=DEFAULT_GEOMETRY.name, help="Board size such as '5x5' (default 4x4)")
+    parser.add_argument('-o', '--output-dir', default='.', help='Directory for the tables')
+    args = parser.parse_args()
+
+    try:
+        geometry = parse_geometry(args.size)
+    except ValueError as e:
+        parser.error(str(e))
+    if len(args.pieces) != geometry.squares:
+        parser.error(f'{len(args.pieces)} pieces do not fill a {geometry.name} board')
+
+    print("🏇 Hippodrome Distance Table Builder 🏇")
+    print("=" * 40)
+    print(f"Board: {geometry.name} | Pieces: {''.join(sorted(args.pieces))} | "
+          f"States: {count_arrangements(args.pieces):,}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for target_arg in args.target or list(geometry.targets):
+        try:
+            target = geometry.parse_target(target_arg)
+        except ValueError as e:
+            parser.error(str(e))
+        target_name = target_arg if target_arg in geometry.targets else '_'.join(map(str, target))
+
+        print(f"\n🎯 Target {target_name} ({','.join(map(str, target))})")
+        start = time.perf_counter()
+        table = build_distance_table(
+            args.pieces, target,
+            progress=lambda distance, count: print(f"   distance {distance:3d}: {count:,} boards"),
+            geometry=geometry,
+        )
+        path = table_path(args.output_dir, target_name)
+        save_distance_table(path, table, args.pieces, target, target_name, geometry)
+        print(f"✅ Wrote {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+ASGI entry point for the Hippodrome Explorer.
+
+Serves the same Flask endpoints as app.py/app_cloud.py, but runs each
+request in a bounded thread pool behind an asyncio event loop.  Requests
+are admitted against per-endpoint and per-target concurrency limits and
+shed with a 503 when a limit is full, and slow requests are answered with
+a 504 after their endpoint's timeout.  A cold target that is downloading
+or a long search can therefore only tie up its own share of the pool.
+
+Streaming endpoints (/api/stream/...) are relayed chunk by chunk instead of
+being collected: each chunk is produced in the pool and must arrive within
+the endpoint's timeout, and the request keeps its slots until the body is
+closed.
+
+Run with:
+    uvicorn app_asgi:app --host 0.0.0.0 --port $PORT
+    gunicorn app_asgi:app -k uvicorn.workers.UvicornWorker
+
+Environment:
+    HIPPODROME_APP      Flask module to serve: app_cloud (default) or app
+    ASGI_THREADS        Worker threads for database reads (default 8)
+    ASGI_MAX_QUEUE      Requests allowed to wait for a free thread (default 16)
+    ASGI_TARGET_LIMIT   Concurrent requests per target (default ASGI_THREADS // 2)
+"""
+
+import asyncio
+import importlib
+import io
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+flask_module = importlib.import_module(os.environ.get('HIPPODROME_APP', 'app_cloud'))
+flask_app = flask_module.app
+
+THREADS = int(os.environ.get('ASGI_THREADS', 8))
+MAX_QUEUE = int(os.environ.get('ASGI_MAX_QUEUE', 16))
+TARGET_LIMIT = int(os.environ.get('ASGI_TARGET_LIMIT', max(1, THREADS // 2)))
+
+# Path prefix -> (max concurrent requests, timeout in seconds).
+# The longest matching prefix wins; heavy scans get a small share.
+ENDPOINT_LIMITS = {
+    '/api/solution': (16, 10.0),
+    '/api/random': (8, 10.0),
+    '/api/search_by_board': (8, 10.0),
+    '/api/hint': (16, 5.0),
+    '/api/alternatives': (8, 10.0),
+    '/api/hardest': (8, 10.0),
+    '/api/difficulty': (4, 10.0),
+    '/api/compare': (8, 10.0),
+    '/api/search': (4, 15.0),
+    '/api/puzzles': (4, 15.0),
+    '/api/stats': (2, 30.0),
+    '/api/targets': (4, 10.0),
+    '/api/stream': (4, 30.0),
+    '/': (16, 10.0),
+}
+
+# Prefixes whose responses are relayed as they are produced
+STREAM_PREFIXES = ('/api/stream',)
+
+
+class ConcurrencyLimit:
+    """Counter of in-flight requests; only touched from the event loop thread"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_acquire(self):
+        if self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+
+executor = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix='hippodrome')
+# Work submitted to the pool and not yet finished, cancelled on shutdown
+# (ThreadPoolExecutor.shutdown only takes cancel_futures from Python 3.9)
+submitted = set()
+submitted_lock = threading.Lock()
+pool_limit = ConcurrencyLimit(THREADS + MAX_QUEUE)
+endpoint_limits = {prefix: ConcurrencyLimit(limit) for prefix, (limit, _) in ENDPOINT_LIMITS.items()}
+target_limits = {}
+# Read once at startup; targets loaded later get their own limit once resident
+KNOWN_TARGETS = frozenset(flask_module.known_targets())
+
+
+def submit(fn, *args):
+    """Run fn in the pool, tracking the future until it is done"""
+    future = executor.submit(fn, *args)
+    with submitted_lock:
+        submitted.add(future)
+    future.add_done_callback(forget)
+    return future
+
+
+def forget(future):
+    with submitted_lock:
+        submitted.discard(future)
+
+
+def match_endpoint(path):
+    """Return the configured prefix that governs a request path"""
+    return max((prefix for prefix in ENDPOINT_LIMITS if path.startswith(prefix)), key=len)
+
+
+def target_limit(target):
+    """Concurrency limit of a target; names that are not targets share one"""
+    # Every known target keeps its own limit, so a cold one downloading only
+    # holds up itself, while bogus ?target= values cannot grow the table
+    if target not in KNOWN_TARGETS and target not in flask_module.target_manager.targets:
+        target = 'other'
+    return target_limits.setdefault(target, ConcurrencyLimit(TARGET_LIMIT))
+
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
+
+
+def call_wsgi(environ):
+    """Run the Flask app for one request and collect the whole response"""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+        return chunks.append
+
+    result = flask_app.wsgi_app(environ, start_response)
+    try:
+        for chunk in result:
+            chunks.append(chunk)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+def start_wsgi(environ):
+    """Run the Flask app until it returns its response body iterator"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+
+        def write(data):
+            raise NotImplementedError('Streaming responses must not use write()')
+        return write
+
+    body = flask_app.wsgi_app(environ, start_response)
+    return response['status'], response['headers'], body
+
+
+def close_body(body):
+    if hasattr(body, 'close'):
+        body.close()
+
+
+async def send_response(send, status, headers, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_error(send, status, message, retry_after=None):
+    headers = [('Content-Type', 'application/json')]
+    if retry_after is not None:
+        headers.append(('Retry-After', str(retry_after)))
+    await send_response(send, status, headers, json.dumps({'error': message}).encode())
+
+
+async def relay_stream(send, environ, timeout, release_all):
+    """Send a streaming response chunk by chunk, then free the request's slots"""
+    pending = submit(start_wsgi, environ)
+    body = None
+    try:
+        status, headers, body = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(pending)), timeout)
+        chunks = iter(body)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        while True:
+            pending = submit(next, chunks, None)
+            chunk = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(pending)), timeout)
+            if chunk is None:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    except asyncio.TimeoutError:
+        if body is None:
+            await send_error(send, 504, f'Request timed out after {timeout:.0f}s')
+        else:
+            # Headers are out: end the body early; the missing end record tells the client
+            await send({'type': 'http.response.body', 'body': b''})
+    except Exception as e:
+        # Errors after the headers (e.g. the client went away) just end the stream
+        if body is None:
+            await send_error(send, 500, str(e))
+    finally:
+        def cleanup(finished):
+            # Close the body once no chunk is being produced, so generators
+            # release their connections, and only then free the slots
+            stream_body = body
+            if stream_body is None and not finished.cancelled() and finished.exception() is None:
+                stream_body = finished.result()[2]
+            submit(close_body, stream_body).add_done_callback(release_all)
+
+        pending.add_done_callback(cleanup)
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body', False):
+            return body
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            with submitted_lock:
+                waiting = list(submitted)
+            # Requests still queued are dropped; running ones finish
+            for future in waiting:
+                future.cancel()
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    prefix = match_endpoint(scope['path'])
+    timeout = ENDPOINT_LIMITS[prefix][1]
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    target = query.get('target', ['top-row'])[0] if scope['path'].startswith('/api/') else None
+
+    # Admission: pool capacity, then endpoint share, then per-target share
+    acquired = []
+    limits = [pool_limit, endpoint_limits[prefix]]
+    if target is not None:
+        limits.append(target_limit(target))
+    for limit in limits:
+        if not limit.try_acquire():
+            for held in acquired:
+                held.release()
+            await send_error(send, 503, 'Server busy, please retry shortly', retry_after=1)
+            return
+        acquired.append(limit)
+
+    loop = asyncio.get_running_loop()
+
+    def release_all(_future):
+        # Slots are freed when the worker thread finishes, not when the
+        # client gives up, so a timed-out request still counts until done
+        for held in acquired:
+            loop.call_soon_threadsafe(held.release)
+
+    body = await read_body(receive)
+    if prefix in STREAM_PREFIXES:
+        await relay_stream(send, build_environ(scope, body), timeout, release_all)
+        return
+
+    future = submit(call_wsgi, build_environ(scope, body))
+    future.add_done_callback(release_all)
+
+    try:
+        status, headers, payload = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)), timeout
+        )
+    except asyncio.TimeoutError:
+        future.cancel()
+        await send_error(send, 504, f'Request timed out after {timeout:.0f}s')
+        return
+    except Exception as e:
+        await send_error(send, 500, str(e))
+        return
+
+    await send_response(send, status, headers, payload)
@@ -1,20 +1,36 @@
+import time
+IMPORTS_STARTED = time.perf_counter()
+
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 import sqlite3
 import os
-import random
-import json
-import urllib.request
-import tempfile
-import hashlib
+import threading
+from functools import lru_cache
 from pathlib import Path
 
+from errors import InvalidRequest, check_board
+from solution_search import parse_search_args, run_search
+from search_instrumentation import search_statistics
+from difficulty import difficulty_summary, hardest_solutions
+from solution_stream import STREAM_TRANSPORTS, parse_format, parse_stream_args, stream_export, stream_solution
+from target_manager import TargetManager
+from startup import STARTUP
+import metrics
+
+SETUP_STARTED = time.perf_counter()
+STARTUP.record('imports', SETUP_STARTED - IMPORTS_STARTED)
+
 app = Flask(__name__)
 CORS(app)
 
-# Cache directory for downloaded databases
-CACHE_DIR = Path(tempfile.gettempdir()) / 'hippodrome_cache'
-CACHE_DIR.mkdir(exist_ok=True)
+def get_cache_dir():
+    """Cache directory for downloaded databases, created on first use"""
+    import tempfile
+    
+    cache_dir = Path(tempfile.gettempdir()) / 'hippodrome_cache'
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir
 
 # Database URLs from environment variables or defaults
 DB_URLS = {
@@ -26,6 +42,10 @@ DB_URLS = {
     'center': os.environ.get('DB_URL_CENTER', '')
 }
 
+# One lock per database so concurrent first hits share a single download
+DOWNLOAD_LOCKS = {}
+DOWNLOAD_LOCKS_GUARD = threading.Lock()
+
 def get_db_path(db_name):
     """Get database path, downloading from URL if needed"""
     # First check if local file exists
@@ -47,29 +67,90 @@ def get_db_path(db_name):
     if not db_url:
         raise FileNotFoundError(f"No database found for {db_name}")
     
-    # Check cache
+    # Check cache (download-only modules are imported on this path only)
+    import hashlib
+    import urllib.request
+    
     url_hash = hashlib.md5(db_url.encode()).hexdigest()
-    cache_path = CACHE_DIR / f"{db_name}_{url_hash}.db"
+    cache_path = get_cache_dir() / f"{db_name}_{url_hash}.db"
     
     if cache_path.exists():
         print(f"Using cached {db_name} database")
         return str(cache_path)
     
-    # Download database
-    print(f"Downloading {db_name} database from {db_url[:50]}...")
-    try:
-        urllib.request.urlretrieve(db_url, cache_path)
-        print(f"Successfully downloaded {db_name} database")
-        return str(cache_path)
-    except Exception as e:
-        raise Exception(f"Failed to download {db_name} database: {str(e)}")
+    with DOWNLOAD_LOCKS_GUARD:
+        lock = DOWNLOAD_LOCKS.setdefault(db_name, threading.Lock())
+    
+    with lock:
+        # Another thread may have finished the download while we waited
+        if cache_path.exists():
+            print(f"Using cached {db_name} database")
+            return str(cache_path)
+        
+        # Download database to a temporary name and rename it into place,
+        # so a partially written file is never opened as the cache
+        print(f"Downloading {db_name} database from {db_url[:50]}...")
+        partial_path = cache_path.with_suffix('.part')
+        try:
+            start = time.perf_counter()
+            urllib.request.urlretrieve(db_url, partial_path)
+            os.replace(partial_path, cache_path)
+            metrics.observe_download(db_name, time.perf_counter() - start)
+            print(f"Successfully downloaded {db_name} database")
+            return str(cache_path)
+        except Exception as e:
+            if partial_path.exists():
+                partial_path.unlink()
+            raise Exception(f"Failed to download {db_name} database: {str(e)}")
+
+# Targets are loaded on first use and evicted under a shared memory budget
+target_manager = TargetManager(get_db_path, on_load=metrics.observe_warmup)
+metrics.init_app(app, target_manager)
 
 def get_target_db_connection(target_name):
     """Get a database connection for a specific target"""
-    db_path = get_db_path(target_name)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return metrics.TimedConnection(target_manager.connect(target_name))
+
+# Whole-state-space distance tables written by build_distances.py
+DISTANCES_DIR = os.environ.get('DISTANCES_DIR', '.')
+
+@lru_cache(maxsize=None)
+def get_distance_table(target_name):
+    """Memory-map the distance table for a target"""
+    from hippodrome.distances import DistanceTable, table_path
+    
+    path = table_path(DISTANCES_DIR, target_name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No distance table for target {target_name}")
+    return DistanceTable(path)
+
+# Optional columns returned with every solution when a database has them
+OPTIONAL_SOLUTION_COLUMNS = ('optimal_path_count',)
+
+def get_solution_columns(target_name):
+    """Column list for selecting full solution rows of a target"""
+    def load_columns():
+        conn = get_target_db_connection(target_name)
+        existing = {row['name'] for row in conn.execute('PRAGMA table_info(solutions)').fetchall()}
+        conn.close()
+        optional = [column for column in OPTIONAL_SOLUTION_COLUMNS if column in existing]
+        return ', '.join(['id', 'initial_board', 'solution_path', 'moves', 'time_ms'] + optional)
+    
+    return target_manager.cached(target_name, 'solution_columns', load_columns)
+
+def get_board_geometry(target_name):
+    """Board size of a target from its metadata (4x4 for databases without one)"""
+    def load_geometry():
+        from hippodrome.board import get_geometry
+        
+        conn = get_target_db_connection(target_name)
+        metadata = dict(conn.execute(
+            "SELECT key, value FROM metadata WHERE key IN ('board_width', 'board_height')"
+        ).fetchall())
+        conn.close()
+        return get_geometry(int(metadata.get('board_width', 4)), int(metadata.get('board_height', 4)))
+    
+    return target_manager.cached(target_name, 'geometry', load_geometry)
 
 def get_targets_index():
     """Get the targets index database connection"""
@@ -78,12 +159,105 @@ def get_targets_index():
     conn.row_factory = sqlite3.Row
     return conn
 
+def known_targets():
+    """Names of the targets served here: the configured databases and, if it is local, the targets index"""
+    names = {name for name in DB_URLS if name != 'targets_index'}
+    # Never downloads: the index is only read when a copy is already on disk
+    if os.path.exists('targets_index.db'):
+        try:
+            conn = get_targets_index()
+            names.update(row['name'] for row in conn.execute('SELECT name FROM targets'))
+            conn.close()
+        except sqlite3.Error:
+            pass
+    return names
+
+@lru_cache(maxsize=None)
+def get_target_summary():
+    """Memory-map the per-configuration moves of every target"""
+    from target_summary import SUMMARY_FILE, TargetSummary
+    
+    if not os.path.exists(SUMMARY_FILE):
+        raise FileNotFoundError(f"Target summary not found: {SUMMARY_FILE}; run create_target_databases.py")
+    return TargetSummary(SUMMARY_FILE)
+
+def load_moves_from_databases(config_id):
+    """Moves per target read from each database, for deployments without the summary"""
+    conn = get_targets_index()
+    targets = [row['name'] for row in conn.execute('SELECT name FROM targets ORDER BY name').fetchall()]
+    conn.close()
+    
+    moves = {}
+    for target in targets:
+        try:
+            target_conn = get_target_db_connection(target)
+        except FileNotFoundError:
+            continue
+        row = target_conn.execute('SELECT moves FROM solutions WHERE id = ?', (config_id,)).fetchone()
+        target_conn.close()
+        moves[target] = row['moves'] if row and row['moves'] >= 0 else None
+    
+    return moves if any(count is not None for count in moves.values()) else None
+
+# Largest page of /api/hardest (the builder keeps 1000 ranked puzzles)
+MAX_HARDEST = 100
+
 def parse_solution_path(solution_path_str):
     """Parse semicolon-separated solution path into list of board states"""
     if not solution_path_str:
         return []
     return solution_path_str.split(';')
 
+def encode_solution_moves(solution_steps):
+    """Encode consecutive board states as (from, to) square pairs.
+    
+    Every step slides one piece into the empty square, so the piece leaves
+    the square that is empty afterwards and lands on the one empty before.
+    """
+    return [
+        [after.index('x'), before.index('x')]
+        for before, after in zip(solution_steps, solution_steps[1:])
+    ]
+
+def format_solution(row, target, response_format='boards'):
+    """Build the JSON payload for a solution row in the requested format"""
+    solution_steps = parse_solution_path(row['solution_path'])
+    
+    payload = {
+        'id': row['id'],
+        'initial_board': row['initial_board'],
+        'moves': row['moves'],
+        'time_ms': row['time_ms'],
+        'target': target,
+        # Precomputed by create_target_databases.py --path-counts
+        'optimal_path_count': row['optimal_path_count'] if 'optimal_path_count' in row.keys() else None
+    }
+    
+    if response_format == 'moves':
+        payload['format'] = 'moves'
+        payload['solution_moves'] = encode_solution_moves(solution_steps)
+    else:
+        payload['solution_path'] = solution_steps
+    
+    return payload
+
+def get_solution_row(target, config_id):
+    """A solution row as a dict (None if there is none), cached per target"""
+    def load_row():
+        conn = get_target_db_connection(target)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            f'SELECT {get_solution_columns(target)} FROM solutions WHERE id = ?',
+            (config_id,)
+        )
+        
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row) if row else None
+    
+    return target_manager.cached(target, ('solution', config_id), load_row)
+
 @app.route('/')
 def index():
     """Serve the main application page"""
@@ -114,7 +288,7 @@ def get_targets():
             return jsonify(default_targets)
             
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return metrics.error_response(e)
 
 @app.route('/api/solution/<int:config_id>')
 def get_solution(config_id):
@@ -122,66 +296,39 @@ def get_solution(config_id):
     target = request.args.get('target', 'top-row')
     
     try:
-        conn = get_target_db_connection(target)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'SELECT id, initial_board, solution_path, moves, time_ms FROM solutions WHERE id = ?',
-            (config_id,)
-        )
-        
-        row = cursor.fetchone()
-        conn.close()
+        response_format = parse_format(request.args)
+        row = get_solution_row(target, config_id)
         
         if not row:
             return jsonify({'error': f'Solution not found for config {config_id} with target {target}'}), 404
         
-        # Parse the solution path
-        solution_steps = parse_solution_path(row['solution_path'])
-        
-        return jsonify({
-            'id': row['id'],
-            'initial_board': row['initial_board'],
-            'solution_path': solution_steps,
-            'moves': row['moves'],
-            'time_ms': row['time_ms'],
-            'target': target
-        })
+        return jsonify(format_solution(row, target, response_format))
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return metrics.error_response(e)
 
 @app.route('/api/random')
 def get_random_solution():
     """Get a random solution"""
-    target = request.args.get('target', 'top-row') 
+    target = request.args.get('target', 'top-row')
     
     try:
+        response_format = parse_format(request.args)
         conn = get_target_db_connection(target)
         cursor = conn.cursor()
         
         # Get random solution
-        cursor.execute('SELECT id, initial_board, solution_path, moves, time_ms FROM solutions ORDER BY RANDOM() LIMIT 1')
+        cursor.execute(f'SELECT {get_solution_columns(target)} FROM solutions ORDER BY RANDOM() LIMIT 1')
         row = cursor.fetchone()
         conn.close()
         
         if not row:
             return jsonify({'error': f'No solutions found for target {target}'}), 404
         
-        # Parse the solution path
-        solution_steps = parse_solution_path(row['solution_path'])
-        
-        return jsonify({
-            'id': row['id'],
-            'initial_board': row['initial_board'],
-            'solution_path': solution_steps,
-            'moves': row['moves'],
-            'time_ms': row['time_ms'],
-            'target': target
-        })
+        return jsonify(format_solution(row, target, response_format))
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return metrics.error_response(e)
 
 @app.route('/api/search')
 def search_solutions():
@@ -216,14 +363,35 @@ def search_solutions():
         return jsonify(results)
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return metrics.error_response(e)
+
+@app.route('/api/puzzles')
+def search_puzzles():
+    """Structured search with per-square, empty-square and knight filters and cursor pagination"""
+    target = request.args.get('target', 'top-row')
+    
+    try:
+        filters = parse_search_args(request.args)
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        conn = get_target_db_connection(target)
+        page = run_search(conn, filters)
+        conn.close()
+        
+        page['target'] = target
+        return jsonify(page)
+        
+    except Exception as e:
+        return metrics.error_response(e)
 
 @app.route('/api/stats')
 def get_statistics():
     """Get database statistics"""
     target = request.args.get('target', 'top-row')
     
-    try:
+    def compute_statistics():
         conn = get_target_db_connection(target)
         cursor = conn.cursor()
         
@@ -241,20 +409,68 @@ def get_statistics():
         cursor.execute('SELECT moves, COUNT(*) as count FROM solutions GROUP BY moves ORDER BY moves')
         move_distribution = [{'moves': row['moves'], 'count': row['count']} for row in cursor.fetchall()]
         
+        # Search effort and heuristic quality, for databases built with instrumentation
+        search = search_statistics(cursor)
+        
         conn.close()
         
-        return jsonify({
+        return {
             'target': target,
             'total_solutions': total,
             'avg_moves': round(moves_stats['avg_moves'], 2),
             'min_moves': moves_stats['min_moves'],
             'max_moves': moves_stats['max_moves'],
             'avg_time_ms': round(time_stats['avg_time'], 2),
-            'move_distribution': move_distribution
-        })
+            'move_distribution': move_distribution,
+            'search': search
+        }
+    
+    try:
+        # The tables are read-only, so statistics are computed once per load
+        return jsonify(target_manager.cached(target, 'stats', compute_statistics))
+        
+    except Exception as e:
+        return metrics.error_response(e)
+
+@app.route('/api/hardest')
+def get_hardest():
+    """Hardest puzzles first, from the catalog precomputed by the builder"""
+    target = request.args.get('target', 'top-row')
+    limit = max(1, min(request.args.get('limit', 10, type=int), MAX_HARDEST))
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    def load_page():
+        conn = get_target_db_connection(target)
+        page = hardest_solutions(conn.cursor(), limit, offset)
+        conn.close()
+        return page
+    
+    try:
+        page = target_manager.cached(target, ('hardest', limit, offset), load_page)
+        return jsonify(dict(page, target=target, offset=offset))
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return metrics.error_response(e)
+
+@app.route('/api/difficulty')
+def get_difficulty():
+    """Difficulty histograms, eccentricity and antipodal positions of a target"""
+    target = request.args.get('target', 'top-row')
+    antipodes = max(0, min(request.args.get('antipodes', 20, type=int), MAX_HARDEST))
+    
+    def load_summary():
+        conn = get_target_db_connection(target)
+        try:
+            return difficulty_summary(conn.cursor(), antipodes)
+        finally:
+            conn.close()
+    
+    try:
+        summary = target_manager.cached(target, ('difficulty', antipodes), load_summary)
+        return jsonify(dict(summary, target=target))
+        
+    except Exception as e:
+        return metrics.error_response(e)
 
 @app.route('/api/search_by_board')
 def search_by_board():
@@ -262,15 +478,15 @@ def search_by_board():
     board_state = request.args.get('board', '')
     target = request.args.get('target', 'top-row')
     
-    if len(board_state) != 16:
-        return jsonify({'error': 'Board state must be exactly 16 characters'}), 400
-    
     try:
+        response_format = parse_format(request.args)
+        check_board(get_board_geometry(target), board_state)
+        
         conn = get_target_db_connection(target)
         cursor = conn.cursor()
         
         cursor.execute(
-            'SELECT id, initial_board, solution_path, moves, time_ms FROM solutions WHERE initial_board = ?',
+            f'SELECT {get_solution_columns(target)} FROM solutions WHERE initial_board = ?',
             (board_state,)
         )
         
@@ -280,25 +496,175 @@ def search_by_board():
         if not row:
             return jsonify({'error': f'No solution found for this board configuration with target {target}'}), 404
         
-        # Parse the solution path
-        solution_steps = parse_solution_path(row['solution_path'])
+        return jsonify(format_solution(row, target, response_format))
         
-        return jsonify({
+    except Exception as e:
+        return metrics.error_response(e)
+
+@app.route('/api/hint')
+def get_hint():
+    """Distance to the goal and the optimal next moves for any board"""
+    board_state = request.args.get('board', '').replace(' ', 'x')
+    target = request.args.get('target', 'top-row')
+    
+    try:
+        table = get_distance_table(target)
+        check_board(table.geometry, board_state, table)
+        return jsonify(table.hint(board_state))
+        
+    except Exception as e:
+        return metrics.error_response(e)
+
+# Bounds for /api/alternatives
+MAX_ALTERNATIVES = 20
+MAX_SLACK = 4
+
+@app.route('/api/alternatives/<int:config_id>')
+def get_alternatives(config_id):
+    """Up to k optimal (or, with slack, near-optimal) solutions of a configuration"""
+    target = request.args.get('target', 'top-row')
+    k = request.args.get('k', 5, type=int)
+    slack = request.args.get('slack', 0, type=int)
+    if not 1 <= k <= MAX_ALTERNATIVES:
+        return jsonify({'error': f'k must be between 1 and {MAX_ALTERNATIVES}'}), 400
+    if not 0 <= slack <= MAX_SLACK:
+        return jsonify({'error': f'slack must be between 0 and {MAX_SLACK}'}), 400
+    
+    try:
+        from itertools import islice
+        from hippodrome.paths import iter_paths
+        
+        response_format = parse_format(request.args)
+        conn = get_target_db_connection(target)
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT {get_solution_columns(target)} FROM solutions WHERE id = ?', (config_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return jsonify({'error': f'Solution not found for config {config_id} with target {target}'}), 404
+        
+        table = get_distance_table(target)
+        paths = list(islice(iter_paths(table, row['initial_board'], slack), k))
+        payload = {
             'id': row['id'],
             'initial_board': row['initial_board'],
-            'solution_path': solution_steps,
-            'moves': row['moves'],
-            'time_ms': row['time_ms'],
-            'target': target
+            'target': target,
+            'distance': table.distance(row['initial_board']),
+            'optimal_path_count': row['optimal_path_count'] if 'optimal_path_count' in row.keys() else None,
+            'slack': slack,
+            'format': response_format,
+        }
+        if response_format == 'moves':
+            payload['alternatives'] = [{'moves': len(path) - 1, 'solution_moves': encode_solution_moves(path)} for path in paths]
+        else:
+            payload['alternatives'] = [{'moves': len(path) - 1, 'solution_path': path} for path in paths]
+        return jsonify(payload)
+        
+    except Exception as e:
+        return metrics.error_response(e)
+
+@app.route('/api/stream/solution/<int:config_id>')
+def stream_solution_steps(config_id):
+    """Stream a solution step by step as NDJSON or Server-Sent Events"""
+    target = request.args.get('target', 'top-row')
+    
+    try:
+        response_format, transport = parse_stream_args(request.args)
+        row = get_solution_row(target, config_id)
+        
+        if not row:
+            return jsonify({'error': f'Solution not found for config {config_id} with target {target}'}), 404
+        
+        header = {key: value for key, value in row.items() if key != 'solution_path'}
+        header['target'] = target
+        return app.response_class(
+            stream_solution(header, row['solution_path'], response_format, transport),
+            mimetype=STREAM_TRANSPORTS[transport]
+        )
+        
+    except Exception as e:
+        return metrics.error_response(e)
+
+@app.route('/api/stream/export')
+def stream_target_export():
+    """Stream every solution of a target in ID order, resumable with after_id"""
+    target = request.args.get('target', 'top-row')
+    min_moves = request.args.get('min_moves', type=int)
+    max_moves = request.args.get('max_moves', type=int)
+    after_id = request.args.get('after_id', 0, type=int)
+    
+    try:
+        response_format, transport = parse_stream_args(request.args)
+        query = f'SELECT {get_solution_columns(target)} FROM solutions WHERE id > ?'
+        params = [after_id]
+        
+        if min_moves is not None:
+            query += ' AND moves >= ?'
+            params.append(min_moves)
+        
+        if max_moves is not None:
+            query += ' AND moves <= ?'
+            params.append(max_moves)
+        
+        query += ' ORDER BY id'
+        
+        # The generator closes the connection when the stream ends; a body
+        # that is never iterated (HEAD, early disconnect) releases it on close
+        conn = get_target_db_connection(target)
+        header = {'target': target, 'format': response_format, 'after_id': after_id}
+        response = app.response_class(
+            stream_export(conn, query, params, lambda row: format_solution(row, target, response_format),
+                          header, transport),
+            mimetype=STREAM_TRANSPORTS[transport]
+        )
+        response.call_on_close(conn.close)
+        return response
+        
+    except Exception as e:
+        return metrics.error_response(e)
+
+@app.route('/api/compare/correlations')
+def get_target_correlations():
+    """How move counts of the same configurations relate across targets"""
+    try:
+        return jsonify(get_target_summary().correlations)
+        
+    except Exception as e:
+        return metrics.error_response(e)
+
+@app.route('/api/compare/<int:config_id>')
+def compare_targets(config_id):
+    """Moves of one configuration for every target"""
+    try:
+        try:
+            moves, source = get_target_summary().compare(config_id), 'summary'
+        except FileNotFoundError:
+            moves, source = load_moves_from_databases(config_id), 'databases'
+        
+        if moves is None:
+            return jsonify({'error': f'No target has a solution for config {config_id}'}), 404
+        
+        # Easiest and hardest only when the solved targets differ
+        solved = {target: count for target, count in moves.items() if count is not None}
+        differs = len(set(solved.values())) > 1
+        return jsonify({
+            'id': config_id,
+            'moves': moves,
+            'easiest_target': min(solved, key=solved.get) if differs else None,
+            'hardest_target': max(solved, key=solved.get) if differs else None,
+            'source': source
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return metrics.error_response(e)
 
 @app.route('/health')
 def health_check():
     """Simple health check endpoint"""
-    return jsonify({'status': 'ready'})
+    return jsonify({'status': 'ready', 'resident_targets': target_manager.status(), 'startup': STARTUP.report()})
+
+STARTUP.record('app_setup', time.perf_counter() - SETUP_STARTED)
 
 if __name__ == '__main__':
     print("🎯 Hippodrome Explorer (Cloud Edition) starting...")
@@ -10,56 +10,103 @@ import os
 import sys
 from pathlib import Path
 
-def get_target_config(filename):
-    """Map CSV filenames to target configurations"""
+from solution_search import create_search_indexes, upgrade_search_schema
+from search_instrumentation import (TRUE_DISTANCE_COLUMN, column_definitions, csv_instrumentation_columns,
+                                    parse_instrumentation)
+from difficulty import build_difficulty_index
+
+PATH_COUNT_COLUMN = 'optimal_path_count'
+
+def get_target_config(filename, geometry=None):
+    """Map CSV filenames to target configurations (positions on geometry's board when given)"""
     base_name = os.path.basename(filename).lower()
     
     if 'og.csv' in base_name or 'original' in base_name:
-        return {
+        config = {
             'name': 'top-row',
             'positions': [0, 1, 2, 3],
             'description': 'top-row'
         }
     elif 'first_column' in base_name:
-        return {
+        config = {
             'name': 'first-column', 
             'positions': [0, 4, 8, 12],
             'description': 'first-column'
         }
     elif 'last_column' in base_name:
-        return {
+        config = {
             'name': 'last-column',
             'positions': [3, 7, 11, 15], 
             'description': 'last-column'
         }
     elif 'corners' in base_name:
-        return {
+        config = {
             'name': 'corners',
             'positions': [0, 3, 12, 15],
             'description': 'corners'
         }
     elif 'center' in base_name:
-        return {
+        config = {
             'name': 'center',
             'positions': [5, 6, 9, 10],
             'description': 'center'
         }
     elif 'bottom' in base_name:
-        return {
+        config = {
             'name': 'bottom-row',
             'positions': [12, 13, 14, 15],
             'description': 'bottom-row'
         }
+    else:
+        return None
     
-    return None
+    if geometry is not None:
+        config['positions'] = list(geometry.targets[config['name']])
+    return config
+
+def insert_batch(cursor, insert_sql, batch_data, distance_table):
+    """Insert rows, appending each board's true distance when a table is given"""
+    if distance_table is not None:
+        distances = distance_table.distances([row[1] for row in batch_data])
+        batch_data = [row + (distance,) for row, distance in zip(batch_data, distances)]
+    cursor.executemany(insert_sql, batch_data)
+
+def add_path_counts(conn, distance_table):
+    """Store the number of optimal solutions of every board (a DP over the distance layers)"""
+    from hippodrome.paths import count_optimal_paths
+    
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA table_info(solutions)')
+    if PATH_COUNT_COLUMN not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f'ALTER TABLE solutions ADD COLUMN {PATH_COUNT_COLUMN} INTEGER')
+    
+    rows = cursor.execute('SELECT id, initial_board FROM solutions').fetchall()
+    counts = count_optimal_paths(
+        distance_table, [board for _, board in rows],
+        progress=lambda distance, count: print(f"   path counts: distance {distance:3d} ({count:,} boards)")
+    )
+    cursor.executemany(
+        f'UPDATE solutions SET {PATH_COUNT_COLUMN} = ? WHERE id = ?',
+        [(count, config_id) for (config_id, _), count in zip(rows, counts)]
+    )
+    conn.commit()
+    print(f"✅ Stored optimal path counts for {sum(count is not None for count in counts):,} solutions")
 
-def create_target_database(csv_path, target_config):
-    """Create a separate database for a specific target"""
+def create_target_database(csv_path, target_config, distance_table=None, path_counts=False, geometry=None):
+    """Create a separate database for a specific target (on a 4x4 board unless geometry is given)"""
     target_name = target_config['name']
+    board_squares = 16 if geometry is None else geometry.squares
     db_path = f"hippodrome_{target_name.replace('-', '_')}.db"
     
     print(f"🔄 Creating database for {target_name}...")
     
+    # Search instrumentation columns are kept only when the CSV has them
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore') as csvfile:
+        instrumentation = csv_instrumentation_columns(csv.DictReader(csvfile).fieldnames)
+    optional_columns = instrumentation + ([TRUE_DISTANCE_COLUMN] if distance_table is not None else [])
+    if optional_columns:
+        print(f"📈 Recording {', '.join(optional_columns)}")
+    
     # Remove existing database
     if os.path.exists(db_path):
         os.remove(db_path)
@@ -69,13 +116,14 @@ def create_target_database(csv_path, target_config):
     cursor = conn.cursor()
     
     # Create solutions table
-    cursor.execute('''
+    extra_columns = ''.join(f',\n            {column}' for column in column_definitions(optional_columns))
+    cursor.execute(f'''
         CREATE TABLE solutions (
             id INTEGER PRIMARY KEY,
             initial_board TEXT NOT NULL,
             solution_path TEXT NOT NULL,
             moves INTEGER NOT NULL,
-            time_ms REAL NOT NULL
+            time_ms REAL NOT NULL{extra_columns}
         )
     ''')
     
@@ -96,8 +144,14 @@ def create_target_database(csv_path, target_config):
     cursor.execute('INSERT INTO metadata (key, value) VALUES (?, ?)', ('target_name', target_name))
     cursor.execute('INSERT INTO metadata (key, value) VALUES (?, ?)', ('target_positions', ','.join(map(str, target_config['positions']))))
     cursor.execute('INSERT INTO metadata (key, value) VALUES (?, ?)', ('target_description', target_config['description']))
+    if geometry is not None:
+        cursor.execute('INSERT INTO metadata (key, value) VALUES (?, ?)', ('board_width', str(geometry.width)))
+        cursor.execute('INSERT INTO metadata (key, value) VALUES (?, ?)', ('board_height', str(geometry.height)))
     
     # Load CSV data
+    insert_columns = ['id', 'initial_board', 'solution_path', 'moves', 'time_ms'] + optional_columns
+    insert_sql = (f'INSERT INTO solutions ({", ".join(insert_columns)}) '
+                  f'VALUES ({", ".join("?" * len(insert_columns))})')
     row_count = 0
     batch_size = 10000
     batch_data = []
@@ -116,18 +170,16 @@ def create_target_database(csv_path, target_config):
                     time_ms = float(row.get('Time (ms)', 0.0))
                     
                     # Validate board length
-                    if len(initial_board) != 16:
+                    if len(initial_board) != board_squares:
                         continue
                     
-                    batch_data.append((solution_id, initial_board, solution_path, moves, time_ms))
+                    batch_data.append((solution_id, initial_board, solution_path, moves, time_ms,
+                                       *parse_instrumentation(row, instrumentation)))
                     row_count += 1
                     
                     # Insert in batches
                     if len(batch_data) >= batch_size:
-                        cursor.executemany(
-                            'INSERT INTO solutions (id, initial_board, solution_path, moves, time_ms) VALUES (?, ?, ?, ?, ?)',
-                            batch_data
-                        )
+                        insert_batch(cursor, insert_sql, batch_data, distance_table)
                         batch_data = []
                         
                         if row_count % 50000 == 0:
@@ -139,14 +191,27 @@ def create_target_database(csv_path, target_config):
             
             # Insert remaining batch
             if batch_data:
-                cursor.executemany(
-                    'INSERT INTO solutions (id, initial_board, solution_path, moves, time_ms) VALUES (?, ?, ?, ?, ?)',
-                    batch_data
-                )
+                insert_batch(cursor, insert_sql, batch_data, distance_table)
+        
+        if path_counts and distance_table is not None:
+            add_path_counts(conn, distance_table)
+        
+        # Branching, hardest catalog, histograms and antipodes (needs the path
+        # counts). The solutions are committed first and kept if this fails.
+        conn.commit()
+        try:
+            build_difficulty_index(conn, geometry or board_geometry({}), distance_table)
+        except Exception as e:
+            print(f"⚠️ Skipped the difficulty index for {target_name}: {e}")
         
         # Insert total count
         cursor.execute('INSERT INTO metadata (key, value) VALUES (?, ?)', ('total_solutions', str(row_count)))
         
+        # Build the covering search indexes once the data is loaded
+        print(f"🔄 Building search indexes for {target_name}...")
+        create_search_indexes(cursor)
+        cursor.execute('ANALYZE')
+        
         # Final commit
         conn.commit()
         
@@ -231,10 +296,106 @@ def create_targets_index():
     
     print(f"✅ Created targets index: {index_path}")
 
+def board_geometry(metadata):
+    """The board size recorded in a database's metadata (4x4 without one)"""
+    from hippodrome.board import get_geometry
+    
+    return get_geometry(int(metadata.get('board_width', 4)), int(metadata.get('board_height', 4)))
+
+def create_target_summary():
+    """Write the moves of every indexed target per configuration to one array"""
+    from target_summary import SUMMARY_FILE, build_target_summary
+    
+    conn = sqlite3.connect("targets_index.db")
+    databases = conn.execute('SELECT name, database_file FROM targets ORDER BY name').fetchall()
+    conn.close()
+    
+    rows, columns = build_target_summary(databases)
+    print(f"✅ Created target summary: {SUMMARY_FILE} ({rows:,} configurations x {columns} targets)")
+
+def upgrade_target_databases(distances_dir=None, path_counts=False):
+    """Add search columns and indexes, the difficulty index and optionally path counts to built target databases"""
+    upgraded = 0
+    for filename in sorted(os.listdir('.')):
+        if filename.startswith('hippodrome_') and filename.endswith('.db'):
+            print(f"🔄 Upgrading {filename}...")
+            conn = sqlite3.connect(filename)
+            try:
+                upgrade_search_schema(conn)
+                metadata = dict(conn.execute('SELECT key, value FROM metadata').fetchall())
+                geometry = board_geometry(metadata)
+                distance_table = load_distance_table(distances_dir, metadata['target_name'], geometry.name)
+                if path_counts and distance_table is not None:
+                    add_path_counts(conn, distance_table)
+                try:
+                    build_difficulty_index(conn, geometry, distance_table)
+                except Exception as e:
+                    print(f"⚠️ Skipped the difficulty index for {filename}: {e}")
+                upgraded += 1
+            except KeyError as e:
+                print(f"⚠️ Error upgrading {filename}: no {e} in its metadata")
+            except (sqlite3.Error, ValueError, OSError) as e:
+                # Corrupt database, or a distance table for other pieces or a
+                # missing sidecar: report it and upgrade the other databases
+                print(f"⚠️ Error upgrading {filename}: {e}")
+            finally:
+                conn.close()
+    
+    print(f"✅ Upgraded {upgraded} target databases")
+    if upgraded and os.path.exists("targets_index.db"):
+        create_target_summary()
+    return upgraded > 0
+
+def load_distance_table(distances_dir, target_name, size='4x4'):
+    """The target's distance table from distances_dir, or None (also when built for another board size)"""
+    if distances_dir is None:
+        return None
+    from hippodrome.distances import DistanceTable, table_path
+    
+    path = table_path(distances_dir, target_name)
+    if not os.path.exists(path):
+        print(f"⚠️ No distance table for {target_name} in {distances_dir}")
+        return None
+    table = DistanceTable(path)
+    if table.geometry.name != size:
+        print(f"⚠️ {path} is for a {table.geometry.name} board, not {size}")
+        return None
+    return table
+
 def main():
     print("🎯 Hippodrome Target Databases Creator")
     print("=" * 50)
     
+    # Optional: --distances DIR records each board's true distance from the
+    # tables written by build_distances.py, and --path-counts its number of
+    # optimal solutions
+    distances_dir = None
+    if '--distances' in sys.argv[1:]:
+        index = sys.argv.index('--distances')
+        if index + 1 >= len(sys.argv):
+            print("❌ --distances needs a directory")
+            return False
+        distances_dir = sys.argv[index + 1]
+    path_counts = '--path-counts' in sys.argv[1:]
+    if path_counts and distances_dir is None:
+        print("❌ --path-counts needs --distances DIR")
+        return False
+    
+    # Optional: --size WxH builds databases of another board size
+    geometry = None
+    if '--size' in sys.argv[1:]:
+        from hippodrome.board import parse_geometry
+        
+        index = sys.argv.index('--size')
+        try:
+            geometry = parse_geometry(sys.argv[index + 1] if index + 1 < len(sys.argv) else '')
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+    
+    if '--upgrade' in sys.argv[1:]:
+        return upgrade_target_databases(distances_dir, path_counts)
+    
     csv_dir = "../solutions_csv"
     if not os.path.exists(csv_dir):
         print(f"❌ CSV directory not found: {csv_dir}")
@@ -252,7 +413,7 @@ def main():
     
     print(f"📁 Found {len(csv_files)} CSV files:")
     for csv_file in csv_files:
-        target_config = get_target_config(csv_file)
+        target_config = get_target_config(csv_file, geometry)
         if target_config:
             print(f"   • {os.path.basename(csv_file)} -> {target_config['name']}")
         else:
@@ -261,14 +422,17 @@ def main():
     # Create databases
     success_count = 0
     for csv_file in csv_files:
-        target_config = get_target_config(csv_file)
+        target_config = get_target_config(csv_file, geometry)
         if target_config:
-            if create_target_database(csv_file, target_config):
+            size = geometry.name if geometry is not None else '4x4'
+            distance_table = load_distance_table(distances_dir, target_config['name'], size)
+            if create_target_database(csv_file, target_config, distance_table, path_counts, geometry):
                 success_count += 1
             print()
     
     if success_count > 0:
         create_targets_index()
+        create_target_summary()
         print(f"\n🚀 Successfully created {success_count} target databases!")
         print("Ready for lazy-loading frontend!")
     else:
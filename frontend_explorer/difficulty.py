@@ -0,0 +1,291 @@
+"""
+Difficulty features, hardest-puzzle catalog and antipodal positions.
+
+The builder stores each board's branching factor (legal first moves) next
+to the solution and ranks every puzzle by its difficulty features: more
+moves first, then fewer optimal solutions, more nodes expanded by the
+solver and fewer first moves.  The top of that ranking is kept in the
+hardest table and the feature distributions in difficulty_histogram, so
+the API serves both without scanning the solutions.
+
+The antipodes table holds the positions farthest from the goal: the
+eccentricity of the goal in the state graph when a distance table is
+available, otherwise the longest solutions among the configured boards.
+"""
+
+from collections import Counter
+
+BRANCHING_COLUMN = 'branching'
+
+# Puzzles kept in the hardest table and antipodal positions stored per target
+HARDEST_CATALOG_SIZE = 1000
+ANTIPODE_LIMIT = 10000
+
+# Solution columns used for ranking, hardest first, when the database has them
+RANKING = (
+    ('moves', 'DESC'),
+    ('optimal_path_count', 'ASC'),
+    ('nodes_expanded', 'DESC'),
+    (BRANCHING_COLUMN, 'ASC'),
+)
+
+# Histogram features; wide-ranging counts are bucketed by powers of two
+HISTOGRAM_FEATURES = {
+    'moves': False,
+    BRANCHING_COLUMN: False,
+    'optimal_path_count': True,
+    'nodes_expanded': True,
+}
+
+BRANCHING_BATCH_SIZE = 50000
+
+
+def solution_columns(cursor):
+    cursor.execute('PRAGMA table_info(solutions)')
+    return {row[1] for row in cursor.fetchall()}
+
+
+def has_difficulty_index(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hardest'")
+    return cursor.fetchone() is not None
+
+
+def power_of_two_bucket(value):
+    """Largest power of two not above value (0 for 0)"""
+    return 1 << (value.bit_length() - 1) if value > 0 else 0
+
+
+def add_branching(conn, geometry):
+    """Store the number of legal first moves of every board"""
+    import numpy as np
+    from hippodrome.distances import neighbor_boards
+
+    cursor = conn.cursor()
+    if BRANCHING_COLUMN not in solution_columns(cursor):
+        cursor.execute(f'ALTER TABLE solutions ADD COLUMN {BRANCHING_COLUMN} INTEGER')
+
+    rows = cursor.execute('SELECT id, initial_board FROM solutions').fetchall()
+    for start in range(0, len(rows), BRANCHING_BATCH_SIZE):
+        batch = rows[start:start + BRANCHING_BATCH_SIZE]
+        boards = np.frombuffer(''.join(board for _, board in batch).encode('ascii'),
+                               dtype=np.uint8).reshape(-1, geometry.squares)
+        parent, _, _ = neighbor_boards(boards, geometry)
+        branching = np.bincount(parent, minlength=len(batch))
+        cursor.executemany(
+            f'UPDATE solutions SET {BRANCHING_COLUMN} = ? WHERE id = ?',
+            [(int(count), config_id) for (config_id, _), count in zip(batch, branching)]
+        )
+
+
+def build_hardest(cursor, columns, size):
+    """Rank every puzzle and keep the first size in the hardest table; returns the rows kept"""
+    ranking = [(column, direction) for column, direction in RANKING if column in columns]
+    order = ', '.join(f'{column} {direction} NULLS LAST' for column, direction in ranking) + ', id ASC'
+    features = [column for column, _ in RANKING]
+    selected = ', '.join(column if column in columns else f'NULL AS {column}' for column in features)
+
+    cursor.execute('DROP TABLE IF EXISTS hardest')
+    cursor.execute(f'''
+        CREATE TABLE hardest (
+            rank INTEGER PRIMARY KEY,
+            id INTEGER NOT NULL,
+            initial_board TEXT NOT NULL,
+            {', '.join(f'{column} INTEGER' for column in features)}
+        )
+    ''')
+    cursor.execute(f'''
+        INSERT INTO hardest (rank, id, initial_board, {', '.join(features)})
+        SELECT ROW_NUMBER() OVER (ORDER BY {order}), id, initial_board, {selected}
+        FROM solutions
+        ORDER BY {order}
+        LIMIT ?
+    ''', (size,))
+    cursor.execute('SELECT COUNT(*) FROM hardest')
+    return cursor.fetchone()[0]
+
+
+def build_histograms(cursor, columns):
+    """Distribution of every difficulty feature present, in one pass"""
+    features = [feature for feature in HISTOGRAM_FEATURES if feature in columns]
+    counters = {feature: Counter() for feature in features}
+    cursor.execute(f'SELECT {", ".join(features)} FROM solutions')
+    while True:
+        rows = cursor.fetchmany(BRANCHING_BATCH_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            for feature, value in zip(features, row):
+                if value is not None:
+                    counters[feature][power_of_two_bucket(value) if HISTOGRAM_FEATURES[feature] else value] += 1
+
+    cursor.execute('DROP TABLE IF EXISTS difficulty_histogram')
+    cursor.execute('''
+        CREATE TABLE difficulty_histogram (
+            feature TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (feature, bucket)
+        ) WITHOUT ROWID
+    ''')
+    cursor.executemany(
+        'INSERT INTO difficulty_histogram (feature, bucket, count) VALUES (?, ?, ?)',
+        [(feature, bucket, count) for feature, counter in counters.items() for bucket, count in counter.items()]
+    )
+
+
+def find_antipodes(cursor, distance_table=None, limit=ANTIPODE_LIMIT):
+    """
+    Positions farthest from the goal
+
+    Returns:
+        (eccentricity, total antipodes, boards up to limit, source)
+    """
+    if distance_table is not None:
+        import numpy as np
+        from hippodrome.configs import unrank_boards
+        from hippodrome.distances import UNREACHABLE
+
+        table = np.asarray(distance_table.table)
+        reachable = table[table != UNREACHABLE]
+        if len(reachable):
+            eccentricity = int(reachable.max())
+            ranks = np.flatnonzero(table == eccentricity)
+            boards = unrank_boards(ranks[:limit], distance_table.pieces)
+            squares = boards.shape[1]
+            raw = boards.tobytes().decode('ascii')
+            return (eccentricity, len(ranks), [raw[i:i + squares] for i in range(0, len(raw), squares)],
+                    'distance_table')
+
+    cursor.execute('SELECT MAX(moves) FROM solutions')
+    eccentricity = cursor.fetchone()[0]
+    if eccentricity is None:
+        return None, 0, [], 'solutions'
+    # A CSV may list the same board under several IDs; antipodes are positions
+    cursor.execute('SELECT COUNT(DISTINCT initial_board) FROM solutions WHERE moves = ?', (eccentricity,))
+    total = cursor.fetchone()[0]
+    cursor.execute('SELECT initial_board FROM solutions WHERE moves = ? GROUP BY initial_board ORDER BY MIN(id) LIMIT ?',
+                   (eccentricity, limit))
+    return eccentricity, total, [row[0] for row in cursor.fetchall()], 'solutions'
+
+
+def build_antipodes(cursor, distance_table=None):
+    """Store the antipodal positions and the goal's eccentricity"""
+    eccentricity, total, boards, source = find_antipodes(cursor, distance_table)
+
+    cursor.execute('DROP TABLE IF EXISTS antipodes')
+    cursor.execute('''
+        CREATE TABLE antipodes (
+            board TEXT PRIMARY KEY,
+            distance INTEGER NOT NULL,
+            id INTEGER
+        ) WITHOUT ROWID
+    ''')
+    # Configuration IDs come from the board index; boards that are not
+    # configured (e.g. outside the generated set) keep a NULL id
+    cursor.executemany(
+        'INSERT INTO antipodes (board, distance, id) '
+        'VALUES (?, ?, (SELECT id FROM solutions WHERE initial_board = ? LIMIT 1))',
+        [(board, eccentricity, board) for board in boards]
+    )
+    return eccentricity, total, source
+
+
+DIFFICULTY_TABLES = ('hardest', 'difficulty_histogram', 'antipodes')
+
+
+def drop_difficulty_index(conn):
+    """Remove a partly built difficulty index so readers fall back cleanly"""
+    conn.rollback()
+    for table in DIFFICULTY_TABLES:
+        conn.execute(f'DROP TABLE IF EXISTS {table}')
+    conn.commit()
+
+
+def build_difficulty_index(conn, geometry, distance_table=None, size=HARDEST_CATALOG_SIZE):
+    """
+    Compute branching factors, then (re)build the hardest, histogram and
+    antipode tables of a target database
+
+    Commit the solutions first: on failure the index is dropped, the
+    pending transaction rolled back and the error re-raised.
+    """
+    try:
+        add_branching(conn, geometry)
+        cursor = conn.cursor()
+        columns = solution_columns(cursor)
+        ranked = build_hardest(cursor, columns, size)
+        build_histograms(cursor, columns)
+        eccentricity, antipodes, source = build_antipodes(cursor, distance_table)
+
+        cursor.executemany('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', [
+            ('hardest_size', str(ranked)),
+            ('eccentricity', '' if eccentricity is None else str(eccentricity)),
+            ('antipode_count', str(antipodes)),
+            ('antipodes_source', source),
+        ])
+        conn.commit()
+    except Exception:
+        drop_difficulty_index(conn)
+        raise
+    print(f"✅ Difficulty index: hardest {ranked:,}, eccentricity {eccentricity} "
+          f"({antipodes:,} antipodal positions from the {source.replace('_', ' ')})")
+
+
+def hardest_solutions(cursor, limit, offset=0):
+    """
+    A page of the hardest puzzles, hardest first
+
+    Databases built before the difficulty index fall back to the move count
+    alone, read backwards from the covering moves index.
+
+    Returns:
+        Dict with the ranking source and the puzzles
+    """
+    if has_difficulty_index(cursor):
+        cursor.execute('SELECT * FROM hardest WHERE rank > ? ORDER BY rank LIMIT ?', (offset, limit))
+        return {'source': 'catalog', 'hardest': [dict(row) for row in cursor.fetchall()]}
+
+    cursor.execute('SELECT id, initial_board, moves FROM solutions ORDER BY moves DESC, id DESC LIMIT ? OFFSET ?',
+                   (limit, offset))
+    return {
+        'source': 'moves',
+        'hardest': [dict(row, rank=offset + i + 1) for i, row in enumerate(cursor.fetchall())]
+    }
+
+
+def difficulty_summary(cursor, antipode_limit):
+    """
+    Precomputed feature histograms and antipodal positions
+
+    Raises:
+        FileNotFoundError: If the database was built without a difficulty index
+    """
+    if not has_difficulty_index(cursor):
+        raise FileNotFoundError('No difficulty index in this database; '
+                                'run create_target_databases.py --upgrade')
+
+    histograms = {}
+    cursor.execute('SELECT feature, bucket, count FROM difficulty_histogram ORDER BY feature, bucket')
+    for row in cursor.fetchall():
+        histograms.setdefault(row['feature'], []).append({'bucket': row['bucket'], 'count': row['count']})
+
+    metadata = dict(cursor.execute(
+        "SELECT key, value FROM metadata WHERE key IN ('hardest_size', 'eccentricity', 'antipode_count', "
+        "'antipodes_source')"
+    ).fetchall())
+    cursor.execute('SELECT board, distance, id FROM antipodes ORDER BY id IS NULL, id, board LIMIT ?',
+                   (antipode_limit,))
+    antipodes = [dict(row) for row in cursor.fetchall()]
+
+    return {
+        'ranking': [f'{column} {direction.lower()}' for column, direction in RANKING],
+        'bucketed': [feature for feature, bucketed in HISTOGRAM_FEATURES.items() if bucketed],
+        'hardest_size': int(metadata.get('hardest_size', 0)),
+        'histograms': histograms,
+        'eccentricity': int(metadata['eccentricity']) if metadata.get('eccentricity') else None,
+        'antipodes': {
+            'source': metadata.get('antipodes_source'),
+            'total': int(metadata.get('antipode_count', 0)),
+            'positions': antipodes,
+        },
+    }
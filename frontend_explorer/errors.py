@@ -0,0 +1,21 @@
+"""
+Errors in a request that the client has to fix.
+
+Request parsing raises InvalidRequest, which metrics.error_response answers
+with a 400.  Any other ValueError comes from the server's own data (a
+corrupt summary file, a table built for other pieces) and is a 500.
+"""
+
+
+class InvalidRequest(ValueError):
+    """A malformed or out-of-range request parameter"""
+
+
+def check_board(geometry, board, table=None):
+    """Validate a client's board against a target's geometry and, if given, a distance table's pieces"""
+    try:
+        geometry.check_board(board)
+        if table is not None:
+            table.normalize(board)
+    except ValueError as e:
+        raise InvalidRequest(str(e)) from e
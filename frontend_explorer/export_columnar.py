@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Export target databases to columnar files for analytics.
+
+Writes hippodrome_<target>.parquet (or .arrow) next to each database with
+the id, packed initial board, moves and time_ms columns, plus compact
+solution paths with --with-paths.  Loading only the columns a query needs
+skips the solution paths that dominate the CSVs.  Requires pyarrow.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from hippodrome.columnar import default_output_name, move_statistics, require_pyarrow, write_columnar
+
+BATCH_SIZE = 50000
+FORMAT_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def iter_rows(conn, with_paths):
+    """Yield row batches from a solutions table in id order"""
+    columns = 'id, initial_board, moves, time_ms' + (', solution_path' if with_paths else '')
+    cursor = conn.execute(f'SELECT {columns} FROM solutions ORDER BY id')
+    while True:
+        rows = cursor.fetchmany(BATCH_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+def export_database(db_path, output_path, with_paths):
+    """Export one target database; returns the number of rows written"""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        metadata = dict(conn.execute('SELECT key, value FROM metadata').fetchall())
+        metadata['source'] = os.path.basename(db_path)
+        return write_columnar(output_path, iter_rows(conn, with_paths), with_paths, metadata)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export target databases to Parquet or Arrow files')
+    parser.add_argument('databases', nargs='*', help='Target databases (default: every hippodrome_*.db here)')
+    parser.add_argument('--format', choices=list(FORMAT_EXTENSIONS), default='parquet', help='Output format')
+    parser.add_argument('--with-paths', action='store_true', help='Include compact solution paths')
+    parser.add_argument('--output-dir', help='Directory for the files (default: next to each database)')
+    parser.add_argument('--stats', metavar='FILE', help='Print move statistics of an exported file and exit')
+    args = parser.parse_args()
+
+    try:
+        require_pyarrow()
+    except ImportError as e:
+        print(f"❌ {e}")
+        return False
+
+    if args.stats:
+        print(json.dumps(move_statistics(args.stats), indent=2))
+        return True
+
+    print("🎯 Hippodrome Columnar Export")
+    print("=" * 50)
+
+    databases = args.databases or sorted(
+        filename for filename in os.listdir('.') if filename.startswith('hippodrome_') and filename.endswith('.db')
+    )
+    if not databases:
+        print("❌ No target databases found. Run: python create_target_databases.py")
+        return False
+
+    for db_path in databases:
+        output_path = default_output_name(db_path, FORMAT_EXTENSIONS[args.format])
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            output_path = os.path.join(args.output_dir, os.path.basename(output_path))
+
+        print(f"🔄 Exporting {db_path} -> {output_path}...")
+        start = time.perf_counter()
+        try:
+            rows = export_database(db_path, output_path, args.with_paths)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"❌ Error exporting {db_path}: {e}")
+            return False
+        elapsed = time.perf_counter() - start
+        print(f"✅ {rows:,} rows in {elapsed:.1f}s "
+              f"({os.path.getsize(output_path) / (1024 * 1024):.1f} MB, "
+              f"database {os.path.getsize(db_path) / (1024 * 1024):.1f} MB)")
+
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,53 @@
+"""
+Gunicorn settings for the explorer, read automatically when gunicorn is
+started from this directory (app_cloud:app, app:app or app_asgi:app).
+
+The app is preloaded in the master, which opens every target once, maps
+the distance tables and freezes the heap before forking (see startup.py),
+so workers start warm and share those pages copy-on-write.
+
+Environment:
+    HIPPODROME_PRELOAD          0 to load lazily in each worker instead (default 1)
+    HIPPODROME_PRELOAD_TARGETS  Comma-separated targets to preload (default: all)
+"""
+
+import gc
+import os
+import sys
+import time
+
+preload_app = os.environ.get('HIPPODROME_PRELOAD', '1') != '0'
+
+
+def app_module(server):
+    """The Flask module being served (the wrapped one for app_asgi)"""
+    app_uri = getattr(server.app, 'app_uri', None) or server.cfg.wsgi_app
+    module = sys.modules[app_uri.split(':')[0]]
+    return getattr(module, 'flask_module', module)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from startup import STARTUP, preload_targets
+
+    module = app_module(server)
+    targets = os.environ.get('HIPPODROME_PRELOAD_TARGETS')
+    loaded = preload_targets(module, targets.split(',') if targets else None)
+    # Objects created so far are never collected, so the collector does not
+    # touch (and copy) their pages in every worker
+    gc.freeze()
+
+    for phase in STARTUP.report()['phases']:
+        server.log.info(f"startup {phase['phase']}: {phase['seconds'] * 1000:.1f} ms")
+    server.log.info(f"Preloaded {len(loaded)} targets: {', '.join(loaded) or 'none'}")
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+
+
+def post_worker_init(worker):
+    from startup import STARTUP
+
+    STARTUP.record('worker_init', time.perf_counter() - worker.forked_at)
@@ -0,0 +1,319 @@
+"""
+Prometheus-style metrics for the Hippodrome Explorer.
+
+Collects request counts and latency histograms per route and target, and
+splits each request into SQLite time and JSON serialization time.  It also
+records response sizes, error types, and database download and target
+warm-up durations.  Everything is rendered in the Prometheus text exposition
+format by render() for the /metrics endpoint.
+
+Metrics live in process memory, so with several gunicorn workers each
+scrape reports the worker that served it.
+"""
+
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+from errors import InvalidRequest
+from startup import STARTUP
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DOWNLOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with labels"""
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series['counts']):
+                    labels = format_labels(self.labels + ('le',), label_values + (repr(float(bound)),))
+                    lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = format_labels(self.labels + ('le',), label_values + ('+Inf',))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                labels = format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {series['sum']}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+REQUESTS = Counter('hippodrome_requests_total', 'HTTP requests served', ('route', 'target', 'status'))
+REQUEST_SECONDS = Histogram('hippodrome_request_duration_seconds', 'Request latency', ('route', 'target'))
+DB_SECONDS = Histogram('hippodrome_db_query_duration_seconds', 'SQLite time per request', ('route', 'target'))
+SERIALIZE_SECONDS = Histogram('hippodrome_json_serialize_duration_seconds', 'JSON serialization time per response', ('route',))
+RESPONSE_BYTES = Histogram('hippodrome_response_bytes', 'Response body size', ('route',), buckets=SIZE_BUCKETS)
+ERRORS = Counter('hippodrome_errors_total', 'Errors by type', ('route', 'type'))
+DOWNLOAD_SECONDS = Histogram('hippodrome_db_download_duration_seconds', 'Database download time', ('database',), buckets=DOWNLOAD_BUCKETS)
+WARMUP_SECONDS = Histogram('hippodrome_target_warmup_duration_seconds', 'Time to make a target resident', ('target',), buckets=DOWNLOAD_BUCKETS)
+
+REGISTRY = [REQUESTS, REQUEST_SECONDS, DB_SECONDS, SERIALIZE_SECONDS, RESPONSE_BYTES, ERRORS, DOWNLOAD_SECONDS, WARMUP_SECONDS]
+
+
+def current_route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def target_label(target_manager):
+    """Target label for the current request, bounded to targets that exist"""
+    # Only requests that name a target are attributed to one; defaulting to
+    # top-row would count /api/targets, /api/compare and the like as top-row
+    # traffic
+    target = request.args.get('target')
+    if not request.path.startswith('/api/') or target is None:
+        return ''
+    # Only targets that loaded successfully become label values, so bogus
+    # target names cannot blow up the number of series
+    if target_manager is None or target in target_manager.targets:
+        return target
+    return 'other'
+
+
+class TimedCursor:
+    """Cursor wrapper that adds execute and fetch time to the request total"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            add_db_time(time.perf_counter() - start)
+
+    def execute(self, *args):
+        self._timed(self._cursor.execute, *args)
+        return self
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def fetchmany(self, *args):
+        return self._timed(self._cursor.fetchmany, *args)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TimedConnection:
+    """Connection wrapper whose cursors are timed"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return TimedCursor(self._conn.cursor())
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def add_db_time(seconds):
+    try:
+        g.db_seconds = getattr(g, 'db_seconds', 0.0) + seconds
+    except RuntimeError:
+        # Outside a request (e.g. warm-up scripts): nothing to attribute
+        pass
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that measures serialization time of each response"""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            try:
+                g.serialize_seconds = getattr(g, 'serialize_seconds', 0.0) + time.perf_counter() - start
+            except RuntimeError:
+                pass
+
+
+def is_busy(e):
+    """Whether a SQLite error is a lock or busy timeout, which a retry can clear"""
+    if getattr(e, 'sqlite_errorname', None) in ('SQLITE_BUSY', 'SQLITE_LOCKED'):
+        return True
+    message = str(e).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def error_response(e):
+    """Map an exception to a JSON error response and count it"""
+    # Only errors the client can act on get a 4xx or 503; anything else,
+    # e.g. a ValueError from a corrupt data file, is a server error
+    if isinstance(e, FileNotFoundError):
+        status = 404
+    elif isinstance(e, InvalidRequest):
+        status = 400
+    elif isinstance(e, sqlite3.OperationalError) and is_busy(e):
+        status = 503
+    else:
+        status = 500
+
+    ERRORS.inc(current_route(), type(e).__name__)
+    message = str(e) if status != 500 else f'Internal server error ({type(e).__name__})'
+    if status == 500:
+        current_app.logger.exception('Unhandled error on %s', request.path)
+    return jsonify({'error': message}), status
+
+
+def observe_download(database, seconds):
+    DOWNLOAD_SECONDS.observe(seconds, database)
+
+
+def observe_warmup(target, seconds):
+    WARMUP_SECONDS.observe(seconds, target)
+
+
+def init_app(app, target_manager=None):
+    """Install request hooks, the timed JSON provider and /metrics"""
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.db_seconds = 0.0
+        g.serialize_seconds = 0.0
+
+    @app.after_request
+    def record_request(response):
+        route = current_route()
+        if route == '/metrics':
+            return response
+        target = target_label(target_manager)
+        elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+
+        REQUESTS.inc(route, target, str(response.status_code))
+        REQUEST_SECONDS.observe(elapsed, route, target)
+        if g.get('db_seconds'):
+            DB_SECONDS.observe(g.db_seconds, route, target)
+        if g.get('serialize_seconds'):
+            SERIALIZE_SECONDS.observe(g.serialize_seconds, route)
+        if response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, route)
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return app.response_class(render(target_manager), mimetype='text/plain; version=0.0.4')
+
+
+def render(target_manager=None):
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    if target_manager is not None:
+        lines.extend(render_target_manager(target_manager))
+    lines.extend(render_startup())
+
+    return '\n'.join(lines) + '\n'
+
+
+def render_target_manager(target_manager):
+    """Gauges and cache counters reported by the target manager"""
+    status = target_manager.status()
+    lines = [
+        '# HELP hippodrome_target_memory_budget_bytes Memory budget shared by resident targets',
+        '# TYPE hippodrome_target_memory_budget_bytes gauge',
+        f'hippodrome_target_memory_budget_bytes {target_manager.budget_bytes}',
+        '# HELP hippodrome_target_resident_bytes Memory held by each resident target',
+        '# TYPE hippodrome_target_resident_bytes gauge',
+    ]
+    for target in status['targets']:
+        lines.append(f'hippodrome_target_resident_bytes{format_labels(("target",), (target["name"],))} '
+                     f'{target["memory_bytes"]}')
+
+    lines.extend([
+        '# HELP hippodrome_target_evictions_total Targets evicted to stay within budget',
+        '# TYPE hippodrome_target_evictions_total counter',
+        f'hippodrome_target_evictions_total {status["evictions"]}',
+        '# HELP hippodrome_cache_requests_total Result cache lookups by outcome',
+        '# TYPE hippodrome_cache_requests_total counter',
+    ])
+    for name, totals in sorted(target_manager.cache_totals().items()):
+        for result in ('hit', 'miss'):
+            labels = format_labels(('target', 'result'), (name, result))
+            lines.append(f'hippodrome_cache_requests_total{labels} {totals[result]}')
+    return lines
+
+
+def render_startup():
+    """Durations of this process's startup phases"""
+    lines = [
+        '# HELP hippodrome_startup_phase_seconds Duration of each startup phase of this process',
+        '# TYPE hippodrome_startup_phase_seconds gauge',
+    ]
+    for phase in STARTUP.report()['phases']:
+        lines.append(f'hippodrome_startup_phase_seconds{format_labels(("phase",), (phase["phase"],))} '
+                     f'{phase["seconds"]}')
+    return lines
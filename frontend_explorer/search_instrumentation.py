@@ -0,0 +1,134 @@
+"""
+Per-solve search instrumentation stored next to each solution.
+
+The solvers write search counters as extra CSV columns.  The builder keeps
+whichever of them a CSV provides in nullable columns, plus the true
+distance when a distance table is available, and /api/stats summarizes
+them so heuristic and search changes can be measured across a whole target.
+"""
+
+# Database column -> (solver CSV header, type)
+INSTRUMENTATION_COLUMNS = {
+    'nodes_expanded': ('Nodes Expanded', int),
+    'nodes_generated': ('Nodes Generated', int),
+    'peak_open': ('Peak Open', int),
+    'peak_memory_kb': ('Peak Memory (KB)', int),
+    'initial_h': ('Initial Heuristic', int),
+}
+
+# Optimal move count from a distance table (not a CSV column)
+TRUE_DISTANCE_COLUMN = 'true_distance'
+
+
+def csv_instrumentation_columns(fieldnames):
+    """Database columns for the instrumentation headers present in a CSV"""
+    fieldnames = set(fieldnames or ())
+    return [column for column, (header, _) in INSTRUMENTATION_COLUMNS.items() if header in fieldnames]
+
+
+def column_definitions(columns):
+    """Column definitions to append to the solutions CREATE TABLE"""
+    return [f'{column} INTEGER' for column in columns]
+
+
+def parse_instrumentation(row, columns):
+    """Values of the given columns from a CSV row; blank fields become NULL"""
+    values = []
+    for column in columns:
+        header, kind = INSTRUMENTATION_COLUMNS[column]
+        value = (row.get(header) or '').strip()
+        values.append(kind(value) if value else None)
+    return values
+
+
+def existing_columns(cursor):
+    """Instrumentation columns present in a solutions table"""
+    cursor.execute('PRAGMA table_info(solutions)')
+    names = {row[1] for row in cursor.fetchall()}
+    return [column for column in (*INSTRUMENTATION_COLUMNS, TRUE_DISTANCE_COLUMN) if column in names]
+
+
+def search_statistics(cursor):
+    """
+    Summary of the instrumentation columns for /api/stats
+
+    The heuristic is compared with the true distance when the database has
+    one, otherwise with the solution's move count (equal to the true
+    distance for optimal solvers, an upper bound on it otherwise).
+
+    Returns:
+        Dict of summaries, or None if no solution carries instrumentation
+    """
+    columns = existing_columns(cursor)
+    if not columns:
+        return None
+
+    summary = {}
+    if 'nodes_expanded' in columns:
+        cursor.execute('''
+            SELECT COUNT(nodes_expanded) AS instrumented, AVG(nodes_expanded) AS avg_expanded,
+                   MAX(nodes_expanded) AS max_expanded, SUM(nodes_expanded) AS total_expanded
+            FROM solutions
+        ''')
+        row = cursor.fetchone()
+        if not row['instrumented']:
+            return None
+        summary.update({
+            'instrumented_solutions': row['instrumented'],
+            'avg_nodes_expanded': round(row['avg_expanded'], 1),
+            'max_nodes_expanded': row['max_expanded'],
+        })
+        if 'nodes_generated' in columns:
+            cursor.execute('SELECT AVG(nodes_generated) AS avg_generated, SUM(nodes_generated) AS total_generated '
+                           'FROM solutions WHERE nodes_expanded IS NOT NULL')
+            generated = cursor.fetchone()
+            summary['avg_nodes_generated'] = round(generated['avg_generated'] or 0, 1)
+            if row['total_expanded']:
+                summary['branching_factor'] = round((generated['total_generated'] or 0) / row['total_expanded'], 2)
+
+    for column in ('peak_open', 'peak_memory_kb'):
+        if column in columns:
+            cursor.execute(f'SELECT AVG({column}) AS avg_value, MAX({column}) AS max_value FROM solutions')
+            row = cursor.fetchone()
+            if row['max_value'] is not None:
+                summary[f'avg_{column}'] = round(row['avg_value'], 1)
+                summary[f'max_{column}'] = row['max_value']
+
+    if 'initial_h' in columns:
+        distance = TRUE_DISTANCE_COLUMN if TRUE_DISTANCE_COLUMN in columns else 'moves'
+        cursor.execute(f'''
+            SELECT COUNT(*) AS compared, AVG(initial_h) AS avg_h, AVG({distance}) AS avg_distance,
+                   AVG(CAST(initial_h AS REAL) / {distance}) AS avg_ratio,
+                   AVG({distance} - initial_h) AS avg_gap,
+                   SUM(initial_h > {distance}) AS overestimates
+            FROM solutions
+            WHERE initial_h IS NOT NULL AND {distance} > 0
+        ''')
+        row = cursor.fetchone()
+        if row['compared']:
+            summary['heuristic'] = {
+                'compared_with': distance,
+                'solutions': row['compared'],
+                'avg_initial_h': round(row['avg_h'], 2),
+                'avg_distance': round(row['avg_distance'], 2),
+                'avg_h_to_distance_ratio': round(row['avg_ratio'], 3),
+                'avg_gap': round(row['avg_gap'], 2),
+                'overestimates': row['overestimates'],
+            }
+
+    # How search effort grows with solution length
+    aggregates = ['COUNT(*) AS count', 'AVG(time_ms) AS avg_time_ms']
+    aggregates += [f'AVG({column}) AS avg_{column}' for column in columns
+                   if column in ('nodes_expanded', 'peak_open', 'initial_h')]
+    cursor.execute(f'''
+        SELECT moves, {', '.join(aggregates)}
+        FROM solutions
+        WHERE {columns[0]} IS NOT NULL
+        GROUP BY moves ORDER BY moves
+    ''')
+    summary['by_moves'] = [
+        {key: round(row[key], 2) if isinstance(row[key], float) else row[key] for key in row.keys()}
+        for row in cursor.fetchall()
+    ]
+
+    return summary
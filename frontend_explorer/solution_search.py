@@ -0,0 +1,193 @@
+"""
+Structured search over a target's solutions table.
+
+Filters are expressed on the initial board (piece per square, empty square,
+knight positions) plus a move range, and results are paginated with a
+keyset cursor on (moves, id).  The derived values (empty square, knight
+bitmask) are computed by SQL expressions that the builder indexes, so every
+query produced here is answered from a covering index.
+"""
+
+from errors import InvalidRequest
+
+PIECES = 'KRBNx'
+BOARD_SQUARES = 16
+MAX_LIMIT = 100
+
+# Derived board values, as SQL expressions over initial_board
+EMPTY_POS_EXPR = "instr(initial_board, 'x') - 1"
+KNIGHT_MASK_EXPR = ' + '.join(
+    f"((substr(initial_board, {i + 1}, 1) = 'N') << {i})" for i in range(BOARD_SQUARES)
+)
+
+# Search indexes on the expressions themselves, which queries repeat
+# verbatim so the planner matches them; trailing columns make every search
+# index-only.
+SEARCH_INDEXES = {
+    'idx_search_moves': 'moves, id, initial_board, time_ms',
+    'idx_search_empty': f'{EMPTY_POS_EXPR}, moves, id, initial_board, time_ms',
+    'idx_search_knights': f'{KNIGHT_MASK_EXPR}, moves, id, initial_board, time_ms',
+}
+
+
+def create_search_indexes(cursor):
+    """Create the covering indexes used by structured search"""
+    for name, columns in SEARCH_INDEXES.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON solutions({columns})')
+
+
+def upgrade_search_schema(conn):
+    """Add the search indexes to an existing database"""
+    cursor = conn.cursor()
+    create_search_indexes(cursor)
+    cursor.execute('ANALYZE')
+    conn.commit()
+
+
+def parse_position(value, name):
+    """Parse a single square index (0-15)"""
+    try:
+        pos = int(value)
+    except (TypeError, ValueError):
+        raise InvalidRequest(f'{name} must be a square index between 0 and 15')
+    if not 0 <= pos < BOARD_SQUARES:
+        raise InvalidRequest(f'{name} must be a square index between 0 and 15')
+    return pos
+
+
+def parse_knights(value):
+    """Parse a comma-separated list of knight squares into a bitmask"""
+    mask = 0
+    for part in value.split(','):
+        if part.strip():
+            mask |= 1 << parse_position(part.strip(), 'knights')
+    if bin(mask).count('1') > 4:
+        raise InvalidRequest('At most 4 knight positions can be given')
+    return mask
+
+
+def encode_cursor(moves, config_id):
+    """Encode the keyset position of a result row"""
+    return f'{moves}:{config_id}'
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        moves, config_id = cursor.split(':')
+        return int(moves), int(config_id)
+    except ValueError:
+        raise InvalidRequest(f'Invalid cursor: {cursor}')
+
+
+def parse_search_args(args):
+    """Turn request query arguments into a normalized filter dict"""
+    filters = {
+        'min_moves': None,
+        'max_moves': None,
+        'empty': None,
+        'knights': None,
+        'squares': {},
+        'order': 'asc',
+        'limit': 10,
+        'cursor': None,
+    }
+
+    for key in ('min_moves', 'max_moves'):
+        if args.get(key) not in (None, ''):
+            try:
+                filters[key] = int(args[key])
+            except ValueError:
+                raise InvalidRequest(f'{key} must be an integer')
+
+    if args.get('empty') not in (None, ''):
+        filters['empty'] = parse_position(args['empty'], 'empty')
+
+    if args.get('knights'):
+        filters['knights'] = parse_knights(args['knights'])
+
+    for pos in range(BOARD_SQUARES):
+        piece = args.get(f'sq{pos}')
+        if piece:
+            if len(piece) != 1 or piece not in PIECES:
+                raise InvalidRequest(f'sq{pos} must be one of {", ".join(PIECES)}')
+            filters['squares'][pos] = piece
+
+    order = args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise InvalidRequest("order must be 'asc' or 'desc'")
+    filters['order'] = order
+
+    try:
+        limit = int(args.get('limit', 10))
+    except ValueError:
+        raise InvalidRequest('limit must be an integer')
+    filters['limit'] = max(1, min(limit, MAX_LIMIT))
+
+    if args.get('cursor'):
+        filters['cursor'] = decode_cursor(args['cursor'])
+
+    return filters
+
+
+def build_search_query(filters):
+    """Build the SQL and parameters for a structured search"""
+    clauses = []
+    params = []
+
+    if filters['empty'] is not None:
+        clauses.append(f'{EMPTY_POS_EXPR} = ?')
+        params.append(filters['empty'])
+
+    knights = filters['knights']
+    if knights is not None:
+        if bin(knights).count('1') == 4:
+            # All four knights pinned down: an equality seek on the index
+            clauses.append(f'{KNIGHT_MASK_EXPR} = ?')
+            params.append(knights)
+        else:
+            clauses.append(f'(({KNIGHT_MASK_EXPR}) & ?) = ?')
+            params.extend([knights, knights])
+
+    for pos, piece in sorted(filters['squares'].items()):
+        clauses.append('substr(initial_board, ?, 1) = ?')
+        params.extend([pos + 1, piece])
+
+    if filters['min_moves'] is not None:
+        clauses.append('moves >= ?')
+        params.append(filters['min_moves'])
+
+    if filters['max_moves'] is not None:
+        clauses.append('moves <= ?')
+        params.append(filters['max_moves'])
+
+    direction = 'DESC' if filters['order'] == 'desc' else 'ASC'
+    if filters['cursor'] is not None:
+        comparison = '<' if direction == 'DESC' else '>'
+        clauses.append(f'(moves, id) {comparison} (?, ?)')
+        params.extend(filters['cursor'])
+
+    query = 'SELECT id, initial_board, moves, time_ms FROM solutions'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    # Fetch one extra row to know whether another page exists
+    query += f' ORDER BY moves {direction}, id {direction} LIMIT ?'
+    params.append(filters['limit'] + 1)
+
+    return query, params
+
+
+def run_search(conn, filters):
+    """Execute a structured search and return one page of results"""
+    query, params = build_search_query(filters)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = [dict(row) for row in cursor.fetchall()]
+
+    next_cursor = None
+    if len(rows) > filters['limit']:
+        rows = rows[:filters['limit']]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['moves'], last['id'])
+
+    return {'results': rows, 'next_cursor': next_cursor}
@@ -0,0 +1,148 @@
+"""
+Streaming responses for long solutions and whole-target exports.
+
+/api/stream/solution sends one solution step by step and /api/stream/export
+every solution of a target, either as NDJSON (one JSON object per line) or
+as Server-Sent Events.  Solution paths are walked in place instead of being
+split into lists, and exports read the table through a single cursor in
+fixed-size batches, so a worker's memory stays flat however long the path or
+large the target.  Clients can act on each line as soon as it arrives.
+
+Every record carries a 'type': a 'solution' or 'export' header first, then
+'step' or 'solution' records, then an 'end' record with the totals.  Export
+records include the configuration ID; passing the last one received as
+after_id resumes an interrupted export.
+"""
+
+import json
+
+from errors import InvalidRequest
+
+# Response formats for endpoints returning a solution path
+SOLUTION_FORMATS = ('boards', 'moves')
+
+STREAM_TRANSPORTS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+# Rows fetched from the export cursor, and sent, per chunk
+EXPORT_BATCH_SIZE = 500
+
+
+def parse_format(args, default='boards'):
+    """
+    Read the format query parameter of an endpoint returning solutions
+
+    Raises:
+        InvalidRequest: On an unknown format
+    """
+    response_format = args.get('format', default)
+    if response_format not in SOLUTION_FORMATS:
+        raise InvalidRequest(f"Unknown format '{response_format}', expected one of: {', '.join(SOLUTION_FORMATS)}")
+    return response_format
+
+
+def parse_stream_args(args):
+    """
+    Read the format and transport query parameters
+
+    Returns:
+        (response_format, transport)
+
+    Raises:
+        InvalidRequest: On an unknown format or transport
+    """
+    response_format = parse_format(args, default='moves')
+    transport = args.get('transport', 'ndjson')
+    if transport not in STREAM_TRANSPORTS:
+        raise InvalidRequest(f"Unknown transport '{transport}', expected one of: {', '.join(STREAM_TRANSPORTS)}")
+    return response_format, transport
+
+
+def encode_record(record, transport):
+    """One NDJSON line or SSE event (named after the record type)"""
+    data = json.dumps(record, separators=(',', ':'))
+    if transport == 'sse':
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + '\n'
+
+
+def iter_path_boards(solution_path):
+    """Yield the boards of a ';'-separated path without splitting it"""
+    start = 0
+    while solution_path and start <= len(solution_path):
+        end = solution_path.find(';', start)
+        if end < 0:
+            end = len(solution_path)
+        yield solution_path[start:end]
+        start = end + 1
+
+
+def iter_solution_steps(solution_path, response_format):
+    """
+    Yield step records of a path
+
+    In 'boards' format step 0 is the initial board and step i the board after
+    move i; in 'moves' format step i is move i as a [from, to] square pair.
+    """
+    previous = None
+    for step, board in enumerate(iter_path_boards(solution_path)):
+        if response_format == 'moves':
+            if previous is not None:
+                yield {'type': 'step', 'step': step, 'move': [board.index('x'), previous.index('x')]}
+        else:
+            yield {'type': 'step', 'step': step, 'board': board}
+        previous = board
+
+
+def stream_solution(header, solution_path, response_format, transport):
+    """
+    Yield the encoded records of one solution
+
+    Args:
+        header: Solution fields sent before the steps (id, moves, ...)
+        solution_path: The ';'-separated path, walked lazily
+        response_format: 'boards' or 'moves'
+        transport: 'ndjson' or 'sse'
+    """
+    yield encode_record(dict(header, type='solution', format=response_format), transport)
+    steps = 0
+    for record in iter_solution_steps(solution_path, response_format):
+        yield encode_record(record, transport)
+        steps += 1
+    yield encode_record({'type': 'end', 'steps': steps}, transport)
+
+
+def stream_export(conn, query, params, format_row, header, transport):
+    """
+    Yield a whole query result as encoded records, one chunk per batch
+
+    The cursor stays open while the response is sent and only
+    EXPORT_BATCH_SIZE rows are held at a time.  The connection is closed
+    when the stream ends or the client goes away; a generator that is never
+    started never runs that cleanup, so callers must also close the
+    connection when the response is closed (closing twice is harmless).
+
+    Args:
+        conn: Open connection to the target database
+        query: SELECT over solutions ordered by id
+        params: Query parameters
+        format_row: Builds a record dict from a row
+        header: Fields of the leading 'export' record
+        transport: 'ndjson' or 'sse'
+    """
+    try:
+        yield encode_record(dict(header, type='export'), transport)
+        cursor = conn.execute(query, params)
+        count, last_id = 0, None
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield ''.join(encode_record(dict(format_row(row), type='solution'), transport) for row in rows)
+            count += len(rows)
+            last_id = rows[-1]['id']
+        yield encode_record({'type': 'end', 'solutions': count, 'last_id': last_id}, transport)
+    finally:
+        conn.close()
@@ -0,0 +1,110 @@
+"""
+Startup phase timings and preloading for forked workers.
+
+With gunicorn's preload_app (see gunicorn.conf.py) the master imports the
+app, downloads and opens every target once, memory-maps the distance tables
+and only then forks.  Workers inherit the imported modules, the per-target
+schema caches and the read-only mappings copy-on-write, so adding workers
+adds neither downloads nor import time, and mapped tables are shared through
+the page cache.  SQLite connections are closed before forking; each worker
+opens its own on first use.
+
+Each process records how long its startup phases took; /health and /metrics
+report them.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Durations of the named startup phases of this process"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.phases = []
+
+    def record(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self):
+        return {
+            'pid': os.getpid(),
+            # Phases of a forked worker include those run once by the master
+            'preloaded': os.getpid() != self.pid,
+            'phases': [{'phase': name, 'seconds': round(seconds, 4)} for name, seconds in self.phases],
+            'total_seconds': round(sum(seconds for _, seconds in self.phases), 4),
+        }
+
+
+STARTUP = StartupTimer()
+
+
+def preload_targets(app_module, targets=None):
+    """
+    Make targets resident before workers are forked
+
+    Resolves (downloading if needed) every target database, caches its
+    solution columns and board size, memory-maps its distance table when
+    there is one, maps the cross-target summary, and finally closes the
+    SQLite connections, which must not cross a fork.  Preloading stops at
+    the memory budget; the remaining targets load on first use.
+
+    Args:
+        app_module: app or app_cloud
+        targets: Target names (default: every target in the index)
+
+    Returns:
+        Names of the targets loaded
+    """
+    if targets is None:
+        try:
+            with STARTUP.phase('targets_index'):
+                conn = app_module.get_targets_index()
+                targets = [row['name'] for row in conn.execute('SELECT name FROM targets ORDER BY name')]
+                conn.close()
+        except Exception as e:
+            # Without an index there is nothing to preload; workers load lazily
+            print(f"⚠️ Could not read the targets index, preloading nothing: {e}")
+            return []
+
+    loaded = []
+    for name in targets:
+        if not app_module.target_manager.has_room(name):
+            print(f"⚠️ Memory budget reached, not preloading {name} and later targets")
+            break
+        try:
+            with STARTUP.phase(f'target {name}'):
+                app_module.get_solution_columns(name)
+                app_module.get_board_geometry(name)
+        except Exception as e:
+            print(f"⚠️ Could not preload {name}: {e}")
+            continue
+        loaded.append(name)
+        start = time.perf_counter()
+        try:
+            app_module.get_distance_table(name)
+        except (FileNotFoundError, ValueError):
+            # No table for this target: hints are unavailable, nothing to map
+            continue
+        STARTUP.record(f'distances {name}', time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        app_module.get_target_summary()
+        STARTUP.record('targets summary', time.perf_counter() - start)
+    except (FileNotFoundError, ValueError) as e:
+        # /api/compare falls back to the databases or reports the error itself
+        print(f"⚠️ Target summary not preloaded: {e}")
+
+    app_module.target_manager.close_idle_connections()
+    return loaded
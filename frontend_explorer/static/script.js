@@ -3,6 +3,8 @@ class HippodromeExplorer {
     constructor() {
         this.currentSolution = null;
         this.currentStep = 0;
+        this.currentBoard = null; // Board at currentStep, kept in sync by applying moves
+        this.streamController = null; // Aborts the solution stream still being read
         this.isPlaying = false;
         this.playbackTimer = null;
         this.playbackSpeed = 1000; // milliseconds
@@ -56,6 +58,8 @@ class HippodromeExplorer {
         this.clearBoardBtn = document.getElementById('clear-board-btn');
         this.searchBoardBtn = document.getElementById('search-board-btn');
         this.exitEditBtn = document.getElementById('exit-edit-btn');
+        this.hintBtn = document.getElementById('hint-btn');
+        this.hintInfo = document.getElementById('hint-info');
         
         // UI elements
         this.currentId = document.getElementById('current-id');
@@ -76,6 +80,7 @@ class HippodromeExplorer {
             this.highlightTargetSquares();
             this.loadStatistics();
             this.loadRandomSolution(); // Load new random solution for new target
+            this.updateHint();
         });
         
         // Playback controls
@@ -98,6 +103,7 @@ class HippodromeExplorer {
         this.clearBoardBtn.addEventListener('click', () => this.clearBoard());
         this.searchBoardBtn.addEventListener('click', () => this.searchByBoard());
         this.exitEditBtn.addEventListener('click', () => this.exitEditMode());
+        this.hintBtn.addEventListener('click', () => this.playHint());
         
         // Piece palette
         this.pieceBtns.forEach(btn => {
@@ -217,7 +223,12 @@ class HippodromeExplorer {
         
         this.showLoading();
         try {
-            const response = await fetch(`/api/solution/${configId}?target=${this.currentTarget}`);
+            if (window.ReadableStream && window.TextDecoder) {
+                await this.streamSolution(`/api/stream/solution/${configId}?target=${this.currentTarget}&format=moves`);
+                return;
+            }
+            
+            const response = await fetch(`/api/solution/${configId}?target=${this.currentTarget}&format=moves`);
             const data = await response.json();
             
             if (data.error) {
@@ -225,13 +236,11 @@ class HippodromeExplorer {
                 return;
             }
             
-            this.currentSolution = data;
-            this.currentStep = 0;
             this.stopPlayback();
-            this.updateUI();
-            this.displayBoard(data.solution_path[0]);
+            this.setSolution(data);
             
         } catch (error) {
+            if (error.name === 'AbortError') return; // Replaced by a newer solution
             this.showError('Failed to load solution');
             console.error('Error:', error);
         } finally {
@@ -239,10 +248,64 @@ class HippodromeExplorer {
         }
     }
 
+    // Read an NDJSON solution stream: playback can start as soon as the
+    // header arrives, and moves are appended as their lines come in
+    async streamSolution(url) {
+        if (this.streamController) this.streamController.abort();
+        const controller = new AbortController();
+        this.streamController = controller;
+        
+        const response = await fetch(url, { signal: controller.signal });
+        if (!response.ok) {
+            const data = await response.json();
+            this.showError(data.error || 'Failed to load solution');
+            return;
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        let solution = null;
+        
+        const handleLine = (line) => {
+            if (!line) return;
+            const record = JSON.parse(line);
+            if (record.type === 'solution') {
+                this.stopPlayback();
+                solution = { ...record, solution_moves: [], streaming: true };
+                this.setSolution(solution);
+                this.hideLoading();
+            } else if (record.type === 'step') {
+                solution.solution_moves.push(record.move);
+            } else if (record.type === 'end') {
+                solution.streaming = false;
+            }
+        };
+        
+        try {
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffered += decoder.decode(value, { stream: true });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+                lines.forEach(handleLine);
+                if (solution) {
+                    this.updateProgressBar();
+                    this.updateStepInfo();
+                }
+            }
+            handleLine(buffered + decoder.decode());
+        } finally {
+            if (solution) solution.streaming = false;
+            if (this.streamController === controller) this.streamController = null;
+        }
+    }
+
     async loadRandomSolution() {
         this.showLoading();
         try {
-            const response = await fetch(`/api/random?target=${this.currentTarget}`);
+            const response = await fetch(`/api/random?target=${this.currentTarget}&format=moves`);
             const data = await response.json();
             
             if (data.error) {
@@ -250,11 +313,8 @@ class HippodromeExplorer {
                 return;
             }
             
-            this.currentSolution = data;
-            this.currentStep = 0;
             this.stopPlayback();
-            this.updateUI();
-            this.displayBoard(data.solution_path[0]);
+            this.setSolution(data);
             
             // Update the config ID input
             this.configIdInput.value = data.id;
@@ -308,42 +368,94 @@ class HippodromeExplorer {
         }
     }
 
+    getTargetPositions() {
+        const target = this.availableTargets.find(t => t.name === this.currentTarget);
+        return target ? target.positions.split(',').map(p => parseInt(p.trim())) : [];
+    }
+
     displayBoard(boardState) {
         if (!boardState) return;
         
         const squares = document.querySelectorAll('.chess-square');
-        const target = this.availableTargets.find(t => t.name === this.currentTarget);
-        const targetPositions = target ? target.positions.split(',').map(p => parseInt(p.trim())) : [];
+        const targetPositions = this.getTargetPositions();
         
         for (let i = 0; i < 16; i++) {
-            const square = squares[i];
-            const piece = boardState[i];
-            
-            // Clear previous content and classes
-            square.innerHTML = '';
-            square.className = square.className.replace(/piece-\w+/g, '');
-            square.classList.remove('knight-on-target');
-            
-            if (piece !== 'x') {
-                // Create Lichess-style piece image
-                const img = document.createElement('img');
-                img.className = 'lichess-piece';
-                img.src = this.getLichessPieceUrl(piece);
-                img.alt = piece;
-                square.appendChild(img);
-                square.classList.add(`piece-${this.getPieceType(piece)}`);
-                
-                // Add special glow if knight is on target position
-                if ((piece === 'N' || piece === 'n') && targetPositions.includes(i)) {
-                    square.classList.add('knight-on-target');
-                }
-            }
+            this.renderSquare(squares[i], boardState[i], targetPositions.includes(i));
         }
         
         // Reapply target highlights
         this.highlightTargetSquares();
     }
 
+    renderSquare(square, piece, isTarget) {
+        // Clear previous content and classes
+        square.innerHTML = '';
+        square.className = square.className.replace(/piece-\w+/g, '');
+        square.classList.remove('knight-on-target');
+        
+        if (piece !== 'x') {
+            // Create Lichess-style piece image
+            const img = document.createElement('img');
+            img.className = 'lichess-piece';
+            img.src = this.getLichessPieceUrl(piece);
+            img.alt = piece;
+            square.appendChild(img);
+            square.classList.add(`piece-${this.getPieceType(piece)}`);
+            
+            // Add special glow if knight is on target position
+            if ((piece === 'N' || piece === 'n') && isTarget) {
+                square.classList.add('knight-on-target');
+            }
+        }
+    }
+
+    // Solution state: the initial board plus (from, to) moves applied incrementally
+    setSolution(data) {
+        if (this.streamController && !data.streaming) {
+            this.streamController.abort();
+            this.streamController = null;
+        }
+        if (!data.solution_moves) {
+            // Older responses carry full boards; derive the moves from them
+            const path = data.solution_path || [];
+            data.solution_moves = path.slice(1).map((board, i) => [board.indexOf('x'), path[i].indexOf('x')]);
+        }
+        
+        this.currentSolution = data;
+        this.currentStep = 0;
+        this.currentBoard = data.initial_board.split('');
+        this.updateUI();
+        this.displayBoard(data.initial_board);
+    }
+
+    getStepCount() {
+        return this.currentSolution ? this.currentSolution.solution_moves.length : 0;
+    }
+
+    getTotalSteps() {
+        // While a solution is still streaming, only its header knows the length
+        const solution = this.currentSolution;
+        return solution && solution.streaming ? solution.moves : this.getStepCount();
+    }
+
+    getCurrentBoardState() {
+        return this.currentBoard ? this.currentBoard.join('') : null;
+    }
+
+    swapSquares(a, b) {
+        // A move and its undo are the same swap of the moving piece and the empty square
+        const board = this.currentBoard;
+        [board[a], board[b]] = [board[b], board[a]];
+    }
+
+    renderSquares(positions) {
+        const squares = document.querySelectorAll('.chess-square');
+        const targetPositions = this.getTargetPositions();
+        positions.forEach(pos => {
+            this.renderSquare(squares[pos], this.currentBoard[pos], targetPositions.includes(pos));
+        });
+    }
+
     getLichessPieceUrl(piece) {
         // Using Lichess piece images for authentic look
         const baseUrl = 'https://lichess1.org/assets/piece/cburnett/';
@@ -380,7 +492,7 @@ class HippodromeExplorer {
     }
 
     startPlayback() {
-        if (!this.currentSolution || this.currentStep >= this.currentSolution.solution_path.length - 1) {
+        if (!this.currentSolution || this.currentStep >= this.getTotalSteps()) {
             return;
         }
         
@@ -388,11 +500,12 @@ class HippodromeExplorer {
         this.playPauseBtn.textContent = '⏸️';
         
         this.playbackTimer = setInterval(() => {
-            if (this.currentStep < this.currentSolution.solution_path.length - 1) {
+            if (this.currentStep < this.getStepCount()) {
                 this.nextStep();
-            } else {
+            } else if (!this.currentSolution.streaming) {
                 this.stopPlayback();
             }
+            // Otherwise wait for the next moves to arrive
         }, this.playbackSpeed);
     }
 
@@ -406,41 +519,37 @@ class HippodromeExplorer {
     }
 
     nextStep() {
-        if (!this.currentSolution || this.currentStep >= this.currentSolution.solution_path.length - 1) {
-            return;
-        }
-        
-        this.currentStep++;
-        this.displayBoard(this.currentSolution.solution_path[this.currentStep]);
-        this.updateProgressBar();
-        this.updateStepInfo();
+        this.goToStep(this.currentStep + 1);
     }
 
     previousStep() {
-        if (!this.currentSolution || this.currentStep <= 0) {
-            return;
-        }
-        
-        this.currentStep--;
-        this.displayBoard(this.currentSolution.solution_path[this.currentStep]);
-        this.updateProgressBar();
-        this.updateStepInfo();
+        this.goToStep(this.currentStep - 1);
     }
 
     goToStep(step) {
-        if (!this.currentSolution || step < 0 || step >= this.currentSolution.solution_path.length) {
+        if (!this.currentSolution || step < 0 || step > this.getStepCount()) {
             return;
         }
         
-        this.currentStep = step;
-        this.displayBoard(this.currentSolution.solution_path[this.currentStep]);
+        // Apply or undo moves one by one, then redraw only the touched squares
+        const moves = this.currentSolution.solution_moves;
+        const touched = new Set();
+        while (this.currentStep !== step) {
+            const index = this.currentStep < step ? this.currentStep++ : --this.currentStep;
+            const [from, to] = moves[index];
+            this.swapSquares(from, to);
+            touched.add(from);
+            touched.add(to);
+        }
+        
+        this.renderSquares(touched);
         this.updateProgressBar();
         this.updateStepInfo();
     }
 
     goToLastStep() {
         if (!this.currentSolution) return;
-        this.goToStep(this.currentSolution.solution_path.length - 1);
+        this.goToStep(this.getStepCount());
     }
 
     updateSpeed() {
@@ -483,14 +592,15 @@ class HippodromeExplorer {
     updateProgressBar() {
         if (!this.currentSolution) return;
         
-        const progress = (this.currentStep / (this.currentSolution.solution_path.length - 1)) * 100;
+        const stepCount = this.getTotalSteps();
+        const progress = stepCount > 0 ? (this.currentStep / stepCount) * 100 : 100;
         this.progressFill.style.width = `${progress}%`;
     }
 
     updateStepInfo() {
         if (!this.currentSolution) return;
         
-        this.currentStepDisplay.textContent = `${this.currentStep} / ${this.currentSolution.solution_path.length - 1}`;
+        this.currentStepDisplay.textContent = `${this.currentStep} / ${this.getTotalSteps()}`;
     }
 
     // Editor functionality (keeping from original)
@@ -513,12 +623,13 @@ class HippodromeExplorer {
         
         // Initialize with current board or empty board
         if (this.currentSolution) {
-            this.editorBoardState = this.currentSolution.solution_path[this.currentStep];
+            this.editorBoardState = this.getCurrentBoardState();
         } else {
             this.editorBoardState = 'xxxxxxxxxxxxxxxx';
         }
         
         this.displayBoard(this.editorBoardState);
+        this.updateHint();
     }
 
     exitEditMode() {
@@ -526,10 +637,11 @@ class HippodromeExplorer {
         this.piecePalette.classList.add('hidden');
         this.editModeBtn.textContent = '📝 Edit Board';
         this.boardModeText.textContent = '📋 Solution View';
+        this.clearHintHighlights();
         
         // Restore solution display
         if (this.currentSolution) {
-            this.displayBoard(this.currentSolution.solution_path[this.currentStep]);
+            this.displayBoard(this.getCurrentBoardState());
         }
     }
 
@@ -543,11 +655,83 @@ class HippodromeExplorer {
         
         // Update display
         this.displayBoard(this.editorBoardState);
+        this.updateHint();
     }
 
     clearBoard() {
         this.editorBoardState = 'xxxxxxxxxxxxxxxx';
         this.displayBoard(this.editorBoardState);
+        this.updateHint();
+    }
+
+    // Optimal-move hints for the edited board, from the distance tables
+    async updateHint() {
+        if (!this.editMode) return;
+        
+        this.currentHint = null;
+        this.hintBtn.disabled = true;
+        this.clearHintHighlights();
+        
+        const board = this.editorBoardState;
+        if (board.split('x').length !== 2) {
+            this.hintInfo.textContent = 'Leave exactly one empty square to see the distance to the goal';
+            return;
+        }
+        
+        // Responses can arrive out of order while the user keeps editing
+        const request = this.hintRequest = (this.hintRequest || 0) + 1;
+        try {
+            const response = await fetch(`/api/hint?board=${board}&target=${this.currentTarget}`);
+            const data = await response.json();
+            if (request !== this.hintRequest || !this.editMode) return;
+            
+            if (data.error) {
+                this.hintInfo.textContent = `Hints unavailable: ${data.error}`;
+                return;
+            }
+            
+            this.currentHint = data;
+            if (data.solved) {
+                this.hintInfo.textContent = '🏁 Goal reached!';
+            } else if (data.distance === null) {
+                this.hintInfo.textContent = '🚫 The goal cannot be reached from here';
+            } else {
+                this.hintInfo.textContent = `🎯 ${data.distance} moves to the goal`;
+                this.highlightHint(data.best_move);
+                this.hintBtn.disabled = !data.best_move;
+            }
+        } catch (error) {
+            if (request === this.hintRequest) {
+                this.hintInfo.textContent = 'Hints unavailable';
+            }
+            console.error('Error:', error);
+        }
+    }
+
+    highlightHint(move) {
+        if (!move) return;
+        const squares = document.querySelectorAll('.chess-square');
+        squares[move.from].classList.add('hint-from');
+        squares[move.to].classList.add('hint-to');
+    }
+
+    clearHintHighlights() {
+        document.querySelectorAll('.hint-from, .hint-to').forEach(square => {
+            square.classList.remove('hint-from', 'hint-to');
+        });
+    }
+
+    playHint() {
+        const move = this.currentHint && this.currentHint.best_move;
+        if (!this.editMode || !move) return;
+        
+        const boardArray = this.editorBoardState.split('');
+        boardArray[move.to] = boardArray[move.from];
+        boardArray[move.from] = 'x';
+        this.editorBoardState = boardArray.join('');
+        
+        this.displayBoard(this.editorBoardState);
+        this.updateHint();
     }
 
     async searchByBoard() {
@@ -558,7 +742,7 @@ class HippodromeExplorer {
         
         this.showLoading();
         try {
-            const response = await fetch(`/api/search_by_board?board=${this.editorBoardState}&target=${this.currentTarget}`);
+            const response = await fetch(`/api/search_by_board?board=${this.editorBoardState}&target=${this.currentTarget}&format=moves`);
             const data = await response.json();
             
             if (data.error) {
@@ -568,10 +752,7 @@ class HippodromeExplorer {
             
             // Exit edit mode and show solution
             this.exitEditMode();
-            this.currentSolution = data;
-            this.currentStep = 0;
-            this.updateUI();
-            this.displayBoard(data.solution_path[0]);
+            this.setSolution(data);
             
             // Update config ID
             this.configIdInput.value = data.id;
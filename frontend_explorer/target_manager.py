@@ -0,0 +1,278 @@
+"""
+Lazy per-target loading with a shared memory budget.
+
+A target is made resident on its first request: its database file is
+resolved (and downloaded, for the cloud app), read-only connections are
+opened with a memory-mapped window onto the file, and a small cache of
+query results is kept next to them.  Each resident target accounts for
+the bytes it holds - the mmap window, the SQLite page cache of every open
+connection and its result cache - and when the total exceeds the budget
+the least recently used idle targets are evicted.  A target holds at most
+its mmap window, TARGET_MAX_IDLE pooled connections and a full result cache
+(48 MB with the defaults), so the default budget keeps five targets resident.
+
+Environment:
+    TARGET_MEMORY_BUDGET_MB   Total budget across targets (default 256)
+    TARGET_MMAP_MB            mmap window per target (default 32)
+    TARGET_PAGE_CACHE_KIB     SQLite page cache per connection (default 2048)
+    TARGET_RESULT_CACHE_MB    Result cache per target (default 8)
+    TARGET_MAX_IDLE           Idle connections kept per target (default 4)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+MB = 1024 * 1024
+
+
+class PooledConnection:
+    """A connection checked out of a target's pool; close() returns it"""
+
+    def __init__(self, manager, target, conn):
+        self._manager = manager
+        self._target = target
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            self._manager.release(self._target, self._conn)
+            self._conn = None
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ResidentTarget:
+    """Lookup structures held for one loaded target"""
+
+    def __init__(self, name, path, mmap_bytes, page_cache_kib):
+        self.name = name
+        self.path = path
+        self.file_size = os.path.getsize(path)
+        self.mmap_bytes = min(self.file_size, mmap_bytes)
+        self.page_cache_bytes = page_cache_kib * 1024
+        self.idle = []
+        self.open_connections = 0
+        self.in_use = 0
+        self.results = OrderedDict()
+        self.result_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+        self.evicted = False
+
+    def memory_bytes(self):
+        return self.mmap_bytes + self.open_connections * self.page_cache_bytes + self.result_bytes
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'database_file': self.path,
+            'file_mb': round(self.file_size / MB, 1),
+            'memory_bytes': self.memory_bytes(),
+            'memory_mb': round(self.memory_bytes() / MB, 2),
+            'mmap_mb': round(self.mmap_bytes / MB, 1),
+            'connections': self.open_connections,
+            'in_use': self.in_use,
+            'cached_results': len(self.results),
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'idle_seconds': round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class TargetManager:
+    """Loads targets on first use and evicts the least recently used ones"""
+
+    def __init__(self, resolve_path, budget_bytes=None, mmap_bytes=None,
+                 page_cache_kib=None, result_cache_bytes=None, max_idle=None, on_load=None):
+        self.resolve_path = resolve_path
+        self.on_load = on_load
+        self.budget_bytes = budget_bytes or int(os.environ.get('TARGET_MEMORY_BUDGET_MB', 256)) * MB
+        self.mmap_bytes = mmap_bytes if mmap_bytes is not None else int(os.environ.get('TARGET_MMAP_MB', 32)) * MB
+        self.page_cache_kib = page_cache_kib or int(os.environ.get('TARGET_PAGE_CACHE_KIB', 2048))
+        self.result_cache_bytes = result_cache_bytes if result_cache_bytes is not None else \
+            int(os.environ.get('TARGET_RESULT_CACHE_MB', 8)) * MB
+        self.max_idle = max_idle or int(os.environ.get('TARGET_MAX_IDLE', 4))
+        self.targets = OrderedDict()
+        self.evictions = 0
+        # Cache hit/miss totals per target, kept across evictions
+        self.cache_counts = {}
+        self._lock = threading.RLock()
+
+    def _acquire_target(self, name):
+        """Return the resident target, loading it on first use"""
+        with self._lock:
+            target = self.targets.get(name)
+            if target is not None:
+                self.targets.move_to_end(name)
+                target.last_used = time.monotonic()
+                return target
+
+        # Resolve outside the lock: a download must not stall other targets
+        start = time.perf_counter()
+        path = self.resolve_path(name)
+
+        with self._lock:
+            target = self.targets.get(name)
+            if target is None:
+                target = ResidentTarget(name, path, self.mmap_bytes, self.page_cache_kib)
+                self.targets[name] = target
+                if self.on_load is not None:
+                    self.on_load(name, time.perf_counter() - start)
+            self.targets.move_to_end(name)
+            target.last_used = time.monotonic()
+            return target
+
+    def _open_connection(self, target):
+        uri = Path(target.path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA mmap_size = {target.mmap_bytes}')
+        conn.execute(f'PRAGMA cache_size = -{self.page_cache_kib}')
+        return conn
+
+    def connect(self, name):
+        """Check out a read-only connection to a target"""
+        while True:
+            target = self._acquire_target(name)
+            with self._lock:
+                # Evicted between lookup and checkout: load it again
+                if target.evicted:
+                    continue
+                target.in_use += 1
+                conn = target.idle.pop() if target.idle else None
+                if conn is None:
+                    target.open_connections += 1
+                break
+
+        if conn is None:
+            try:
+                conn = self._open_connection(target)
+            except Exception:
+                with self._lock:
+                    target.in_use -= 1
+                    target.open_connections -= 1
+                raise
+
+        with self._lock:
+            self._enforce_budget()
+        return PooledConnection(self, target, conn)
+
+    def release(self, target, conn):
+        """Return a connection to its target's pool"""
+        with self._lock:
+            target.in_use -= 1
+            if target.evicted or len(target.idle) >= self.max_idle:
+                conn.close()
+                target.open_connections -= 1
+            else:
+                target.idle.append(conn)
+            self._enforce_budget()
+
+    def cached(self, name, key, compute):
+        """Return a cached result for a target, computing it on a miss"""
+        target = self._acquire_target(name)
+        with self._lock:
+            counts = self.cache_counts.setdefault(name, {'hit': 0, 'miss': 0})
+            if key in target.results:
+                target.results.move_to_end(key)
+                target.hits += 1
+                counts['hit'] += 1
+                return target.results[key][0]
+            target.misses += 1
+            counts['miss'] += 1
+
+        value = compute()
+        size = len(repr(value))
+        if size > self.result_cache_bytes:
+            return value
+
+        with self._lock:
+            if not target.evicted and key not in target.results:
+                target.results[key] = (value, size)
+                target.result_bytes += size
+                while target.result_bytes > self.result_cache_bytes:
+                    _, (_, old_size) = target.results.popitem(last=False)
+                    target.result_bytes -= old_size
+                self._enforce_budget()
+        return value
+
+    def cache_totals(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self.cache_counts.items()}
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(target.memory_bytes() for target in self.targets.values())
+
+    def target_bytes(self):
+        """Most a resident target holds with its pool idle and its result cache full"""
+        return self.mmap_bytes + self.max_idle * self.page_cache_kib * 1024 + self.result_cache_bytes
+
+    def has_room(self, name):
+        """Whether one more target can be loaded without evicting another"""
+        with self._lock:
+            if name in self.targets:
+                return True
+            return self.memory_bytes() + self.target_bytes() <= self.budget_bytes
+
+    def _enforce_budget(self):
+        """Evict least recently used idle targets until under budget"""
+        total = sum(target.memory_bytes() for target in self.targets.values())
+        for name in list(self.targets):
+            if total <= self.budget_bytes:
+                break
+            target = self.targets[name]
+            # Never evict a target with checked-out connections or the one
+            # most recently used, which is the one being served right now
+            if target.in_use > 0 or name == next(reversed(self.targets)):
+                continue
+            total -= target.memory_bytes()
+            self._evict(target)
+
+    def _evict(self, target):
+        for conn in target.idle:
+            conn.close()
+        target.open_connections -= len(target.idle)
+        target.idle = []
+        target.results.clear()
+        target.result_bytes = 0
+        target.evicted = True
+        del self.targets[target.name]
+        self.evictions += 1
+        print(f"Evicted {target.name} target to stay within memory budget")
+
+    def evict(self, name):
+        """Drop a target from memory if it is not in use"""
+        with self._lock:
+            target = self.targets.get(name)
+            if target is None or target.in_use > 0:
+                return False
+            self._evict(target)
+            return True
+
+    def close_idle_connections(self):
+        """Close pooled connections but keep targets and cached results (before forking)"""
+        # SQLite connections must not be used across a fork; results are inherited
+        with self._lock:
+            for target in self.targets.values():
+                for conn in target.idle:
+                    conn.close()
+                target.open_connections -= len(target.idle)
+                target.idle = []
+
+    def status(self):
+        """Describe resident targets and the budget they share"""
+        with self._lock:
+            return {
+                'budget_mb': round(self.budget_bytes / MB, 1),
+                'used_mb': round(sum(t.memory_bytes() for t in self.targets.values()) / MB, 2),
+                'evictions': self.evictions,
+                'targets': [target.describe() for target in reversed(self.targets.values())],
+            }
@@ -0,0 +1,131 @@
+"""
+Per-configuration move counts across every target in one array.
+
+The builder writes targets_summary.npy: an int16 array with one row per
+configuration ID and one column per target holding the solution's move
+count, -1 where the target has no solution (unsolvable or not built).  A
+JSON sidecar names the columns.  /api/compare reads a single row of the
+memory-mapped array instead of opening every target database, and the
+cross-target correlations are computed from the same array once per
+process.
+"""
+
+import json
+import os
+from functools import cached_property
+
+import numpy as np
+
+SUMMARY_FILE = 'targets_summary.npy'
+UNSOLVED = -1
+
+SUMMARY_BATCH_SIZE = 50000
+
+
+def sidecar_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def build_target_summary(databases, path=SUMMARY_FILE):
+    """
+    Write the summary array from target databases
+
+    Args:
+        databases: (target name, database file) pairs, one column each
+        path: Output .npy file; the column names go to a .json sidecar
+
+    Returns:
+        Shape of the array written
+    """
+    import sqlite3
+
+    connections = [(name, sqlite3.connect(f'file:{db_file}?mode=ro', uri=True)) for name, db_file in databases]
+    try:
+        max_ids = [conn.execute('SELECT MAX(id) FROM solutions').fetchone()[0] for _, conn in connections]
+        rows = max((max_id for max_id in max_ids if max_id is not None), default=-1) + 1
+        summary = np.full((rows, len(connections)), UNSOLVED, dtype=np.int16)
+
+        for column, (_, conn) in enumerate(connections):
+            # Answered from the covering moves index, without touching the paths
+            cursor = conn.execute('SELECT id, moves FROM solutions')
+            while True:
+                batch = cursor.fetchmany(SUMMARY_BATCH_SIZE)
+                if not batch:
+                    break
+                ids, moves = np.array(batch, dtype=np.int64).T
+                summary[ids, column] = np.where(moves >= 0, moves, UNSOLVED)
+    finally:
+        for _, conn in connections:
+            conn.close()
+
+    # Write under a temporary name so a running app never maps half a file
+    partial_path = path + '.part.npy'
+    np.save(partial_path, summary)
+    with open(sidecar_path(path), 'w', encoding='utf-8') as file:
+        json.dump({'targets': [name for name, _ in connections], 'configs': rows, 'unsolved': UNSOLVED}, file)
+    os.replace(partial_path, path)
+    return summary.shape
+
+
+class TargetSummary:
+    """The memory-mapped summary array and its target columns"""
+
+    def __init__(self, path=SUMMARY_FILE):
+        with open(sidecar_path(path), 'r', encoding='utf-8') as file:
+            self.metadata = json.load(file)
+        self.targets = self.metadata['targets']
+        self.moves = np.load(path, mmap_mode='r')
+        if self.moves.ndim != 2 or self.moves.shape[1] != len(self.targets):
+            raise ValueError(f'{path} does not match its {len(self.targets)} targets')
+
+    def compare(self, config_id):
+        """Moves per target of one configuration (None where unsolved), or None for an unknown ID"""
+        if not 0 <= config_id < len(self.moves):
+            return None
+        row = self.moves[config_id]
+        if (row == UNSOLVED).all():
+            return None
+        return {target: int(moves) if moves != UNSOLVED else None for target, moves in zip(self.targets, row)}
+
+    @cached_property
+    def correlations(self):
+        """
+        How move counts relate across targets
+
+        Returns:
+            Dict with per-target solved counts and average moves, and for each
+            pair of targets the configurations solved by both, the Pearson
+            correlation of their move counts, the average difference and how
+            often each one is harder
+        """
+        moves = np.asarray(self.moves)
+        solved = moves != UNSOLVED
+
+        per_target = []
+        for column, target in enumerate(self.targets):
+            values = moves[solved[:, column], column]
+            per_target.append({
+                'target': target,
+                'solved': int(len(values)),
+                'avg_moves': round(float(values.mean()), 2) if len(values) else None,
+            })
+
+        pairs = []
+        for a in range(len(self.targets)):
+            for b in range(a + 1, len(self.targets)):
+                both = solved[:, a] & solved[:, b]
+                first = moves[both, a].astype(np.float64)
+                second = moves[both, b].astype(np.float64)
+                pearson = None
+                if len(first) > 1 and first.std() > 0 and second.std() > 0:
+                    pearson = round(float(np.corrcoef(first, second)[0, 1]), 4)
+                pairs.append({
+                    'targets': [self.targets[a], self.targets[b]],
+                    'configs': int(both.sum()),
+                    'pearson': pearson,
+                    'avg_difference': round(float((first - second).mean()), 3) if len(first) else None,
+                    'first_harder': int((first > second).sum()),
+                    'second_harder': int((first < second).sum()),
+                })
+
+        return {'configs': int(len(moves)), 'targets': per_target, 'pairs': pairs}
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Hippodrome Configuration Generator
+Enumerates every arrangement of a piece multiset and writes the solver input
+
+Each arrangement is identified by its multiset-permutation rank; the ranks
+that pass the filters, in ascending order, become configuration ids 0..n-1.
+Output is an ID,Board CSV for the solver's load_configs_from_csv, a .npy
+array of boards, or a .npy array of ranks (4-8 bytes per configuration).
+--verify compares the enumeration with the ids and boards of an existing
+configs CSV, solutions CSV or target database.  --size enumerates boards
+of other dimensions; the pieces must fill every square.
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from hippodrome.board import DEFAULT_GEOMETRY, EMPTY, Geometry, parse_geometry
+from hippodrome.configs import (
+    BoardFilter,
+    count_arrangements,
+    enumerate_ranks,
+    exclude_solved,
+    rank_boards,
+    require_empty_on,
+    unrank_boards,
+)
+
+WRITE_CHUNK = 100000
+
+
+def read_store_boards(store: str, geometry: Geometry = DEFAULT_GEOMETRY) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read (id, board) pairs from a configs CSV, solutions CSV or target database
+
+    Returns:
+        (ids, boards) with boards as an (n, squares) uint8 array
+    """
+    ids: List[int] = []
+    boards: List[str] = []
+
+    if store.endswith(('.db', '.sqlite', '.sqlite3')):
+        conn = sqlite3.connect(f'file:{store}?mode=ro', uri=True)
+        try:
+            for config_id, board in conn.execute('SELECT id, initial_board FROM solutions ORDER BY id'):
+                ids.append(config_id)
+                boards.append(board.replace(' ', EMPTY))
+        finally:
+            conn.close()
+    else:
+        with open(store, 'r', encoding='utf-8') as file:
+            file.readline()  # Skip header row
+            for line in file:
+                parts = line.rstrip('\r\n').split(',')
+                if len(parts) < 2 or len(parts[1]) != geometry.squares:
+                    continue
+                try:
+                    ids.append(int(parts[0]))
+                except ValueError:
+                    continue
+                boards.append(parts[1].replace(' ', EMPTY))
+
+    board_array = np.frombuffer(''.join(boards).encode('ascii', 'replace'), dtype=np.uint8)
+    return np.array(ids, dtype=np.int64), board_array.reshape(-1, geometry.squares)
+
+
+def build_filters(args, geometry: Geometry = DEFAULT_GEOMETRY) -> List[BoardFilter]:
+    filters = [exclude_solved(geometry.parse_target(target)) for target in args.exclude_solved]
+    if args.empty_on:
+        filters.append(require_empty_on([int(square) for square in args.empty_on.split(',')]))
+    return filters
+
+
+def iter_csv_lines(ranks: np.ndarray, pieces: str) -> Iterator[str]:
+    """Stream 'id,board' lines, unranking a chunk at a time"""
+    for start in range(0, len(ranks), WRITE_CHUNK):
+        boards = unrank_boards(ranks[start:start + WRITE_CHUNK], pieces)
+        text = boards.tobytes().decode('ascii')
+        squares = len(pieces)
+        for offset in range(len(boards)):
+            yield f'{start + offset},{text[offset * squares:(offset + 1) * squares]}\n'
+
+
+def write_output(ranks: np.ndarray, pieces: str, output: str, ranks_only: bool) -> None:
+    if output.endswith('.npy'):
+        if ranks_only:
+            dtype = np.uint32 if count_arrangements(pieces) <= np.iinfo(np.uint32).max else np.int64
+            np.save(output, ranks.astype(dtype))
+        else:
+            np.save(output, unrank_boards(ranks, pieces))
+        return
+
+    file = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8', newline='\n')
+    try:
+        file.write('ID,Initial Board\n')
+        file.writelines(iter_csv_lines(ranks, pieces))
+    finally:
+        if file is not sys.stdout:
+            file.close()
+
+
+def verify_store(store: str, ranks: np.ndarray, pieces: str, max_report: int,
+                 geometry: Geometry = DEFAULT_GEOMETRY) -> bool:
+    """
+    Compare enumerated ids with an existing store
+
+    Returns:
+        True if every stored id and board matches the enumeration
+    """
+    ids, boards = read_store_boards(store, geometry)
+    print(f"Stored configurations: {len(ids):,} | Enumerated: {len(ranks):,}")
+
+    try:
+        stored_ranks = rank_boards(boards, pieces)
+    except ValueError:
+        print("❌ Stored boards are not all arrangements of the piece multiset")
+        return False
+
+    positions = np.searchsorted(ranks, stored_ranks)
+    found = positions < len(ranks)
+    found[found] = ranks[positions[found]] == stored_ranks[found]
+    same_id = found & (positions == ids)
+
+    in_order = bool((np.diff(stored_ranks[np.argsort(ids)]) > 0).all())
+    print(f"{'✅' if in_order else '❌'} Stored ids follow rank order")
+    print(f"{'✅' if found.all() else '❌'} Stored boards kept by the filters: {int(found.sum()):,}")
+    print(f"{'✅' if same_id.all() else '❌'} Ids matching the enumeration: {int(same_id.sum()):,}")
+
+    for i in np.flatnonzero(~same_id)[:max_report]:
+        board = bytes(boards[i]).decode('ascii')
+        where = f'enumerated as id {positions[i]}' if found[i] else 'filtered out'
+        print(f"     • ID {ids[i]}: {board} ({where})")
+
+    return bool(same_id.all()) and len(ids) == len(ranks)
+
+
+def infer_pieces(store: str, geometry: Geometry = DEFAULT_GEOMETRY) -> Optional[str]:
+    """Piece multiset of the first board in a store"""
+    _, boards = read_store_boards(store, geometry)
+    if len(boards) == 0:
+        return None
+    return bytes(boards[0]).decode('ascii')
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Enumerate Hippodrome configurations')
+    parser.add_argument('--pieces', help="Piece multiset, e.g. 'NNNNKKKRRRRBBBBx' (inferred from --verify store)")
+    parser.add_argument('--exclude-solved', action='append', default=[], metavar='TARGET',
+                        help='Drop boards already solved for a target (repeatable)')
+    parser.add_argument('--empty-on', metavar='SQUARES', help="Keep boards whose empty square is one of '0,3,...'")
+    parser.add_argument('-o', '--output', help="Output .csv, .npy, or '-' for stdout")
+    parser.add_argument('--ranks-only', action='store_true', help='With a .npy output, store ranks instead of boards')
+    parser.add_argument('--verify', metavar='STORE', help='Configs CSV, solutions CSV or .db to compare ids with')
+    parser.add_argument('--max-report', type=int, default=10, help='Mismatches shown by --verify')
+    parser.add_argument('--size', default=DEFAULT_GEOMETRY.name, help="Board size such as '5x5' (default 4x4)")
+    args = parser.parse_args()
+
+    try:
+        geometry = parse_geometry(args.size)
+    except ValueError as e:
+        parser.error(str(e))
+    pieces = args.pieces or (infer_pieces(args.verify, geometry) if args.verify else None)
+    if not pieces:
+        parser.error('--pieces is required unless --verify names a store to infer it from')
+    if len(pieces) != geometry.squares:
+        parser.error(f'{len(pieces)} pieces do not fill a {geometry.name} board')
+
+    log = sys.stderr if args.output == '-' else sys.stdout
+    print(f"Pieces: {''.join(sorted(pieces))} | Arrangements: {count_arrangements(pieces):,}", file=log)
+
+    try:
+        filters = build_filters(args, geometry)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    ranks = enumerate_ranks(pieces, filters)
+    print(f"Enumerated {len(ranks):,} configurations in {time.perf_counter() - start:.2f}s", file=log)
+
+    if args.output:
+        write_output(ranks, pieces, args.output, args.ranks_only)
+        if args.output != '-':
+            print(f"✅ Wrote {args.output}")
+
+    if args.verify and not verify_store(args.verify, ranks, pieces, args.max_report, geometry):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Python tooling for the Hippodrome puzzle: board rules shared by the
+validator, builders and web explorer.
+"""
@@ -0,0 +1,215 @@
+"""
+Board representation and move rules of the Hippodrome puzzle.
+
+A board is a width * height character string in row-major order, 'x' marks
+the single empty square, knights (N) jump in L-shapes and every other piece
+slides one square into the empty square (K and Q in any direction, R
+orthogonally, B diagonally).  With a single empty square every square a
+slider would pass over is occupied, so sliders never move further.
+
+A Geometry holds the move tables and named targets of one board size.  The
+module-level names describe the standard 4x4 board and mirror
+hippodrome_solver_working.cpp.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+EMPTY = 'x'
+PIECES = 'KQRBN'
+
+
+def is_valid_move(piece: str, r1: int, c1: int, r2: int, c2: int) -> bool:
+    """Whether a piece may move from (r1, c1) into the empty square (r2, c2)"""
+    dr = abs(r1 - r2)
+    dc = abs(c1 - c2)
+
+    if piece == 'N':
+        return (dr == 1 and dc == 2) or (dr == 2 and dc == 1)
+
+    if max(dr, dc) != 1:
+        return False
+
+    if piece in ('K', 'Q'):
+        return True
+    if piece == 'R':
+        return r1 == r2 or c1 == c2
+    if piece == 'B':
+        return dr == dc
+    return False
+
+
+def _middle(length: int) -> List[int]:
+    """The middle index of an odd length, the middle two of an even one"""
+    return [length // 2] if length % 2 else [length // 2 - 1, length // 2]
+
+
+class Geometry:
+    """A rectangular board: its named targets and per-piece move tables"""
+
+    def __init__(self, width: int = 4, height: Optional[int] = None):
+        height = width if height is None else height
+        if width < 2 or height < 2:
+            raise ValueError(f'Boards need at least 2x2 squares, got {width}x{height}')
+        self.width = width
+        self.height = height
+        self.squares = width * height
+        self.name = f'{width}x{height}'
+        self.move_sources = self._build_move_sources()
+        self.targets = self._build_targets()
+
+    def __repr__(self) -> str:
+        return f'Geometry({self.width}, {self.height})'
+
+    def square(self, row: int, col: int) -> int:
+        return row * self.width + col
+
+    def coordinates(self, square: int) -> Tuple[int, int]:
+        """(row, column) of a square"""
+        return divmod(square, self.width)
+
+    def _build_move_sources(self) -> Dict[str, List[Tuple[int, ...]]]:
+        """Per piece, a list indexed by empty square of the squares it can move from"""
+        sources = {}
+        for piece in PIECES:
+            sources[piece] = [
+                tuple(
+                    src for src in range(self.squares)
+                    if src != empty and is_valid_move(piece, *self.coordinates(src), *self.coordinates(empty))
+                )
+                for empty in range(self.squares)
+            ]
+        return sources
+
+    def _build_targets(self) -> Dict[str, Tuple[int, ...]]:
+        """Named targets: the squares the knights must occupy"""
+        last_row = self.squares - self.width
+        return {
+            'top-row': tuple(range(self.width)),
+            'bottom-row': tuple(range(last_row, self.squares)),
+            'first-column': tuple(range(0, self.squares, self.width)),
+            'last-column': tuple(range(self.width - 1, self.squares, self.width)),
+            'corners': (0, self.width - 1, last_row, self.squares - 1),
+            'center': tuple(self.square(row, col) for row in _middle(self.height) for col in _middle(self.width)),
+        }
+
+    def parse_target(self, target: str) -> Tuple[int, ...]:
+        """
+        Resolve a target name or a comma-separated list of squares
+
+        Args:
+            target: Target name (e.g. 'top-row') or positions like '0,1,4,5'
+
+        Returns:
+            Sorted tuple of target squares
+
+        Raises:
+            ValueError: If the target is unknown or the positions are invalid
+        """
+        if target in self.targets:
+            return self.targets[target]
+
+        try:
+            positions = tuple(sorted(int(part) for part in target.split(',')))
+        except ValueError:
+            raise ValueError(f"Unknown target '{target}'")
+
+        if (not 0 < len(positions) < self.squares or len(set(positions)) != len(positions)
+                or not all(0 <= p < self.squares for p in positions)):
+            raise ValueError(f"Target must be distinct squares between 0 and {self.squares - 1}: '{target}'")
+        return positions
+
+    def check_board(self, board: str) -> None:
+        """
+        Reject boards that do not fit this geometry
+
+        Raises:
+            ValueError: On a wrong length, unknown pieces or not exactly one empty square
+        """
+        if len(board) != self.squares:
+            raise ValueError(f'Board state must be exactly {self.squares} characters')
+        unknown = set(board) - set(PIECES + EMPTY)
+        if unknown:
+            raise ValueError(f"Unknown pieces {''.join(sorted(unknown))}; boards use {PIECES} and {EMPTY}")
+        if board.count(EMPTY) != 1:
+            raise ValueError(f"Board must have exactly one empty square ('{EMPTY}')")
+
+    def rows(self, board: str) -> List[str]:
+        """The board split into its rows"""
+        return [board[start:start + self.width] for start in range(0, self.squares, self.width)]
+
+    def next_states(self, board: str) -> List[str]:
+        """All boards reachable in one move, in the solver's generation order"""
+        empty = board.find(EMPTY)
+        if empty < 0:
+            return []
+
+        states = []
+        for src in range(self.squares):
+            sources = self.move_sources.get(board[src])
+            if sources is not None and src in sources[empty]:
+                states.append(apply_move(board, src, empty))
+        return states
+
+
+@lru_cache(maxsize=None)
+def get_geometry(width: int = 4, height: Optional[int] = None) -> Geometry:
+    """The shared Geometry of a board size (move tables are built once)"""
+    return Geometry(width, height)
+
+
+def parse_geometry(spec: str) -> Geometry:
+    """
+    Geometry from 'WIDTHxHEIGHT' (e.g. '5x5') or a single side length
+
+    Raises:
+        ValueError: If the spec is malformed or the board too small
+    """
+    parts = spec.lower().split('x')
+    try:
+        sides = [int(part) for part in parts]
+    except ValueError:
+        raise ValueError(f"Board size must look like '5x5', got '{spec}'")
+    if len(sides) not in (1, 2):
+        raise ValueError(f"Board size must look like '5x5', got '{spec}'")
+    return get_geometry(*sides)
+
+
+DEFAULT_GEOMETRY = get_geometry(4, 4)
+BOARD_WIDTH = DEFAULT_GEOMETRY.width
+BOARD_SQUARES = DEFAULT_GEOMETRY.squares
+TARGETS = DEFAULT_GEOMETRY.targets
+MOVE_SOURCES = DEFAULT_GEOMETRY.move_sources
+
+
+def parse_target(target: str, geometry: Geometry = DEFAULT_GEOMETRY) -> Tuple[int, ...]:
+    """Resolve a target name or squares on the given board (see Geometry.parse_target)"""
+    return geometry.parse_target(target)
+
+
+def target_from_filename(filename: str) -> Optional[str]:
+    """Infer the target name from a solutions CSV or database filename"""
+    base_name = filename.lower().replace('-', '_')
+    if 'og.csv' in base_name or 'original' in base_name or 'top_row' in base_name:
+        return 'top-row'
+    for name in TARGETS:
+        if name.replace('-', '_') in base_name:
+            return name
+    return None
+
+
+def apply_move(board: str, src: int, dst: int) -> str:
+    """Slide the piece on src into the empty square dst"""
+    cells = list(board)
+    cells[dst], cells[src] = cells[src], EMPTY
+    return ''.join(cells)
+
+
+def next_states(board: str, geometry: Geometry = DEFAULT_GEOMETRY) -> List[str]:
+    """All boards reachable in one move, in the solver's generation order"""
+    return geometry.next_states(board)
+
+
+def is_goal(board: str, target: Sequence[int]) -> bool:
+    """Whether every target square holds a knight"""
+    return all(board[pos] == 'N' for pos in target)
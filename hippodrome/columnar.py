@@ -0,0 +1,259 @@
+"""
+Columnar (Parquet / Arrow IPC) solution files.
+
+Each target is one table with these columns:
+
+* id - configuration ID
+* board - the initial board packed into an int64, four bits per square with
+  square 0 in the highest nibble.  Piece codes follow ASCII order, so packed
+  boards sort like the board strings.  Boards of more than 16 squares do
+  not fit and are stored as fixed-size binary board strings instead.
+* moves, time_ms - as in the target databases
+* path (optional) - the solution as one byte per move: the square the moved
+  piece leaves, which is the empty square after the move.  Together with the
+  initial board this reconstructs every step; null for unsolved boards.
+
+Reading with column projection skips the path column entirely, so loading
+ids and move counts for 400k solutions takes a few megabytes.  Parquet
+files are compressed; Arrow IPC files (.arrow / .feather) are memory-mapped.
+
+pyarrow is optional (pip install pyarrow); everything else in the package
+works without it.
+"""
+
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .board import BOARD_SQUARES, EMPTY
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = pq = None
+
+PIECE_CODES = 'BKNQRx'
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+_ENCODE = np.full(256, 255, dtype=np.uint8)
+_ENCODE[np.frombuffer(PIECE_CODES.encode('ascii'), dtype=np.uint8)] = np.arange(len(PIECE_CODES))
+_DECODE = np.frombuffer(PIECE_CODES.encode('ascii'), dtype=np.uint8)
+
+# Squares that fit in a packed int64 board
+PACKED_SQUARES = 16
+
+
+def _shifts(squares: int) -> np.ndarray:
+    return np.arange(squares - 1, -1, -1, dtype=np.int64) * 4
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError('Columnar files need pyarrow: pip install pyarrow')
+
+
+def is_columnar(path: str) -> bool:
+    return path.endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS)
+
+
+def pack_boards(boards: Sequence[str], squares: int = BOARD_SQUARES) -> np.ndarray:
+    """Pack boards of up to 16 squares into int64s"""
+    if squares > PACKED_SQUARES:
+        raise ValueError(f'Packed boards hold at most {PACKED_SQUARES} squares, got {squares}')
+    raw = np.frombuffer(''.join(boards).encode('ascii'), dtype=np.uint8).reshape(-1, squares)
+    codes = _ENCODE[raw]
+    if (codes == 255).any():
+        raise ValueError(f'Boards may only contain {PIECE_CODES}')
+    return (codes.astype(np.int64) << _shifts(squares)).sum(axis=1)
+
+
+def unpack_boards(packed: np.ndarray, squares: int = BOARD_SQUARES) -> np.ndarray:
+    """(n, squares) uint8 array of board bytes from packed boards"""
+    codes = (np.asarray(packed, dtype=np.int64)[:, None] >> _shifts(squares)) & 0xF
+    return _DECODE[codes]
+
+
+def unpack_board_strings(packed: np.ndarray, squares: int = BOARD_SQUARES) -> List[str]:
+    raw = unpack_boards(packed, squares).tobytes().decode('ascii')
+    return [raw[i:i + squares] for i in range(0, len(raw), squares)]
+
+
+def board_squares(metadata: Dict[str, str]) -> int:
+    """Squares per board recorded in database or file metadata (16 without a size)"""
+    if 'board_width' in metadata:
+        return int(metadata['board_width']) * int(metadata['board_height'])
+    return BOARD_SQUARES
+
+
+def encode_path(solution_path: str) -> Optional[bytes]:
+    """Compact a ';'-separated path into one source square per move"""
+    if not solution_path:
+        return None
+    return bytes(board.index(EMPTY) for board in solution_path.split(';')[1:])
+
+
+def decode_path(board: str, sources: Optional[bytes]) -> List[str]:
+    """Every board of a compact path, starting with the initial board"""
+    if sources is None:
+        return []
+    steps = [board]
+    cells = list(board)
+    for source in sources:
+        empty = cells.index(EMPTY)
+        cells[empty], cells[source] = cells[source], EMPTY
+        steps.append(''.join(cells))
+    return steps
+
+
+def schema(with_paths: bool, metadata: Optional[Dict[str, str]] = None, squares: int = BOARD_SQUARES):
+    require_pyarrow()
+    board_type = pa.int64() if squares <= PACKED_SQUARES else pa.binary(squares)
+    fields = [
+        pa.field('id', pa.int64(), nullable=False),
+        pa.field('board', board_type, nullable=False),
+        pa.field('moves', pa.int16(), nullable=False),
+        pa.field('time_ms', pa.float32()),
+    ]
+    if with_paths:
+        fields.append(pa.field('path', pa.binary()))
+    return pa.schema(fields, metadata=metadata)
+
+
+def record_batch(rows: Sequence[Tuple], table_schema):
+    """
+    One record batch from (id, initial_board, moves, time_ms[, solution_path]) rows
+    """
+    columns = list(zip(*rows))
+    board_type = table_schema.field('board').type
+    if pa.types.is_fixed_size_binary(board_type):
+        boards = pa.array([board.encode('ascii') for board in columns[1]], type=board_type)
+    else:
+        boards = pa.array(pack_boards(columns[1], len(columns[1][0])))
+    arrays = [
+        pa.array(np.asarray(columns[0], dtype=np.int64)),
+        boards,
+        pa.array(np.asarray(columns[2], dtype=np.int16)),
+        pa.array(np.asarray(columns[3], dtype=np.float32)),
+    ]
+    if 'path' in table_schema.names:
+        arrays.append(pa.array([encode_path(path) for path in columns[4]], type=pa.binary()))
+    return pa.RecordBatch.from_arrays(arrays, schema=table_schema)
+
+
+def write_columnar(path: str, batches: Iterable[Sequence[Tuple]], with_paths: bool,
+                   metadata: Optional[Dict[str, str]] = None) -> int:
+    """
+    Stream row batches into a Parquet or Arrow IPC file
+
+    Args:
+        path: Output file; the extension picks the format
+        batches: Lists of (id, initial_board, moves, time_ms[, solution_path]) rows
+        with_paths: Whether rows carry a solution path to store
+        metadata: Key/value pairs stored in the file's schema; board_width and
+            board_height give the board size (4x4 without them)
+
+    Returns:
+        Rows written
+    """
+    table_schema = schema(with_paths, metadata, board_squares(metadata or {}))
+    if path.endswith(PARQUET_EXTENSIONS):
+        writer = pq.ParquetWriter(path, table_schema, compression='zstd')
+    elif path.endswith(ARROW_EXTENSIONS):
+        writer = pa.ipc.new_file(path, table_schema)
+    else:
+        raise ValueError(f'Unknown columnar format for {path}; use one of {PARQUET_EXTENSIONS + ARROW_EXTENSIONS}')
+
+    rows_written = 0
+    try:
+        for rows in batches:
+            if rows:
+                batch = record_batch(rows, table_schema)
+                if path.endswith(PARQUET_EXTENSIONS):
+                    writer.write_batch(batch)
+                else:
+                    writer.write(batch)
+                rows_written += len(rows)
+    finally:
+        writer.close()
+    return rows_written
+
+
+def read_columnar(path: str, columns: Optional[Sequence[str]] = None):
+    """Read a columnar file as a pyarrow Table, loading only the given columns"""
+    require_pyarrow()
+    if path.endswith(PARQUET_EXTENSIONS):
+        return pq.read_table(path, columns=list(columns) if columns else None)
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.select(list(columns)) if columns else table
+
+
+def columnar_schema(path: str):
+    """A columnar file's schema, without reading any data"""
+    require_pyarrow()
+    if path.endswith(PARQUET_EXTENSIONS):
+        return pq.read_schema(path)
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).schema
+
+
+def columnar_metadata(path: str) -> Dict[str, str]:
+    """Key/value metadata stored by write_columnar"""
+    metadata = columnar_schema(path).metadata or {}
+    return {key.decode('utf-8'): value.decode('utf-8') for key, value in metadata.items()}
+
+
+def iter_solution_records(path: str, chunk_size: int) -> Iterator[List[Tuple[int, str, str, int]]]:
+    """
+    Yield (id, initial_board, solution_path, moves) chunks, the records the
+    validator reads from CSVs and databases
+
+    Raises:
+        ValueError: If the file was exported without paths
+    """
+    if 'path' not in columnar_schema(path).names:
+        raise ValueError(f'{path} was exported without solution paths')
+    table = read_columnar(path, ['id', 'board', 'moves', 'path'])
+    packed = pa.types.is_integer(table.schema.field('board').type)
+    squares = board_squares(columnar_metadata(path))
+
+    for batch in table.to_batches(max_chunksize=chunk_size):
+        ids = batch.column('id').to_numpy()
+        if packed:
+            boards = unpack_board_strings(batch.column('board').to_numpy(), squares)
+        else:
+            boards = [board.decode('ascii') for board in batch.column('board').to_pylist()]
+        moves = batch.column('moves').to_numpy()
+        paths = batch.column('path').to_pylist()
+        yield [
+            (int(config_id), board, ';'.join(decode_path(board, sources)), int(move_count))
+            for config_id, board, move_count, sources in zip(ids, boards, moves, paths)
+        ]
+
+
+def move_statistics(path: str) -> Dict:
+    """
+    The /api/stats summary computed from the moves and time_ms columns only
+
+    Returns:
+        Dict with total_solutions, avg/min/max moves, avg_time_ms and
+        move_distribution
+    """
+    table = read_columnar(path, ['moves', 'time_ms'])
+    moves = table.column('moves').to_numpy()
+    times = table.column('time_ms').to_numpy()
+    values, counts = np.unique(moves, return_counts=True)
+    return {
+        'total_solutions': int(len(moves)),
+        'avg_moves': round(float(moves.mean()), 2) if len(moves) else None,
+        'min_moves': int(moves.min()) if len(moves) else None,
+        'max_moves': int(moves.max()) if len(moves) else None,
+        'avg_time_ms': round(float(times.mean()), 2) if len(times) else None,
+        'move_distribution': [{'moves': int(v), 'count': int(c)} for v, c in zip(values, counts)],
+    }
+
+
+def default_output_name(db_path: str, extension: str = '.parquet') -> str:
+    """hippodrome_<target>.db -> hippodrome_<target>.parquet"""
+    return os.path.splitext(db_path)[0] + extension
@@ -0,0 +1,249 @@
+"""
+Enumeration of the Hippodrome configuration space.
+
+A configuration is an arrangement of a fixed piece multiset (the knights,
+the obstacle pieces and the empty square) on the board.  Every
+arrangement has a rank: its position in the lexicographic order of all
+distinct permutations of the multiset, with pieces ordered by their
+character code.  Configuration ids are assigned by sorting the ranks of
+the arrangements that pass the filters, so the same pieces and filters
+always give the same ids.
+
+Boards are generated in rank order, in blocks of uint8 piece characters,
+so filters are vectorized masks over whole blocks and the surviving ranks
+come out already sorted.
+"""
+
+from functools import lru_cache
+from math import factorial
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .board import EMPTY
+
+KNIGHT = 'N'
+
+# A filter takes an (n, squares) uint8 array of boards and returns a
+# boolean mask of the boards to keep
+BoardFilter = Callable[[np.ndarray], np.ndarray]
+
+# Boards are generated in blocks that share everything but their last
+# SUFFIX_LENGTH squares
+SUFFIX_LENGTH = 11
+
+# Ranks are int64, and ranking multiplies a count of arrangements by up to
+# the number of squares left, so larger spaces can be counted but not ranked
+MAX_RANKED_ARRANGEMENTS = np.iinfo(np.int64).max // 32
+
+
+def piece_counts(pieces: str) -> Tuple[str, np.ndarray]:
+    """
+    Split a piece multiset into its alphabet and counts
+
+    Args:
+        pieces: Every piece on the board, e.g. 'NNNNKKKRRRRBBBBx'
+
+    Returns:
+        (sorted alphabet, count of each alphabet symbol)
+    """
+    alphabet = ''.join(sorted(set(pieces)))
+    return alphabet, np.array([pieces.count(symbol) for symbol in alphabet], dtype=np.int64)
+
+
+def count_arrangements(pieces: str) -> int:
+    """Number of distinct arrangements of a piece multiset (exact for any board size)"""
+    _, counts = piece_counts(pieces)
+    total = factorial(len(pieces))
+    for count in counts:
+        total //= factorial(int(count))
+    return total
+
+
+def check_rankable(pieces: str) -> None:
+    """
+    Reject piece sets whose arrangements cannot be ranked
+
+    Raises:
+        ValueError: If the arrangements of pieces are too many to rank as int64
+    """
+    if count_arrangements(pieces) > MAX_RANKED_ARRANGEMENTS:
+        raise ValueError(f'{count_arrangements(pieces):,} arrangements of {len(pieces)} squares '
+                         f'are too many to rank')
+
+
+@lru_cache(maxsize=None)
+def _sorted_permutations(pieces: str) -> np.ndarray:
+    alphabet, _ = piece_counts(pieces)
+    length = len(pieces)
+    if length == 0:
+        return np.zeros((1, 0), dtype=np.uint8)
+
+    result = np.empty((count_arrangements(pieces), length), dtype=np.uint8)
+    row = 0
+    for symbol in alphabet:
+        rest = pieces.replace(symbol, '', 1)
+        tail = _sorted_permutations(rest)
+        result[row:row + len(tail), 0] = ord(symbol)
+        result[row:row + len(tail), 1:] = tail
+        row += len(tail)
+    return result
+
+
+def multiset_permutations(pieces: str) -> np.ndarray:
+    """
+    All distinct permutations of a multiset in lexicographic order
+
+    Returns:
+        (count_arrangements(pieces), len(pieces)) uint8 array of characters
+    """
+    return _sorted_permutations(''.join(sorted(pieces))).copy()
+
+
+def _symbol_codes(boards: np.ndarray, alphabet: str) -> np.ndarray:
+    lookup = np.full(256, -1, dtype=np.int64)
+    lookup[np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)] = np.arange(len(alphabet))
+    codes = lookup[boards]
+    if (codes < 0).any():
+        raise ValueError('Boards contain pieces outside the multiset')
+    return codes
+
+
+def rank_boards(boards: np.ndarray, pieces: str) -> np.ndarray:
+    """
+    Lexicographic multiset-permutation rank of each board
+
+    Args:
+        boards: (n, squares) uint8 array of piece characters
+        pieces: The piece multiset every board is an arrangement of
+
+    Returns:
+        int64 array of ranks
+
+    Raises:
+        ValueError: If a board is not an arrangement of the multiset
+    """
+    check_rankable(pieces)
+    alphabet, counts = piece_counts(pieces)
+    boards = np.atleast_2d(np.asarray(boards, dtype=np.uint8))
+    codes = _symbol_codes(boards, alphabet).astype(np.int8)
+    n, length = codes.shape
+    piece_totals = np.stack([(codes == i).sum(axis=1) for i in range(len(alphabet))], axis=1)
+    if length != len(pieces) or (piece_totals != counts).any():
+        raise ValueError('Boards are not arrangements of the piece multiset')
+
+    # Walking left to right, the arrangements of the remaining squares that
+    # start with a smaller piece come first: total * smaller / left of them
+    total = np.full(n, count_arrangements(pieces), dtype=np.int64)
+    ranks = np.zeros(n, dtype=np.int64)
+    for i in range(length):
+        left = length - i
+        head = codes[:, i:i + 1]
+        tail = codes[:, i:]
+        ranks += total * (tail < head).sum(axis=1) // left
+        total = total * (tail == head).sum(axis=1) // left
+    return ranks
+
+
+def unrank_boards(ranks: np.ndarray, pieces: str) -> np.ndarray:
+    """
+    Boards with the given multiset-permutation ranks
+
+    Returns:
+        (n, len(pieces)) uint8 array of piece characters
+    """
+    check_rankable(pieces)
+    alphabet, counts = piece_counts(pieces)
+    symbols = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+    ranks = np.array(ranks, dtype=np.int64)
+    n, length = len(ranks), len(pieces)
+    if ((ranks < 0) | (ranks >= count_arrangements(pieces))).any():
+        raise ValueError('Rank out of range for the piece multiset')
+
+    remaining = np.tile(counts, (n, 1))
+    boards = np.empty((n, length), dtype=np.uint8)
+    rows = np.arange(n)
+    # Arrangements of the squares still to fill, updated as in rank_boards
+    total = np.full(n, count_arrangements(pieces), dtype=np.int64)
+
+    for i in range(length):
+        left = length - i
+        starting = np.cumsum(total[:, None] * remaining // left, axis=1)
+        # First symbol whose cumulative block extends past the rank
+        choice = (starting <= ranks[:, None]).sum(axis=1)
+        ranks -= np.where(choice > 0, starting[rows, np.maximum(choice - 1, 0)], 0)
+        boards[:, i] = symbols[choice]
+        total = total * remaining[rows, choice] // left
+        remaining[rows, choice] -= 1
+
+    return boards
+
+
+def _prefixes(pieces: str, length: int) -> Iterator[Tuple[str, str]]:
+    """Distinct prefixes of the given length in lexicographic order, with the pieces left over"""
+    if length == 0:
+        yield '', pieces
+        return
+    for symbol in sorted(set(pieces)):
+        for prefix, rest in _prefixes(pieces.replace(symbol, '', 1), length - 1):
+            yield symbol + prefix, rest
+
+
+def iter_blocks(pieces: str) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield every arrangement of a multiset in rank order, in blocks
+
+    Each block holds all boards sharing one prefix: the prefix followed by
+    every arrangement of the remaining pieces.
+
+    Returns:
+        Iterator of (rank of the first board, block of boards)
+    """
+    pieces = ''.join(sorted(pieces))
+    prefix_length = max(0, len(pieces) - SUFFIX_LENGTH)
+    first_rank = 0
+    for prefix, rest in _prefixes(pieces, prefix_length):
+        suffixes = _sorted_permutations(rest)
+        block = np.empty((len(suffixes), len(pieces)), dtype=np.uint8)
+        block[:, :prefix_length] = np.frombuffer(prefix.encode('ascii'), dtype=np.uint8)
+        block[:, prefix_length:] = suffixes
+        yield first_rank, block
+        first_rank += len(block)
+
+
+def enumerate_ranks(pieces: str, filters: Sequence[BoardFilter] = ()) -> np.ndarray:
+    """
+    Sorted ranks of every arrangement that passes all filters
+
+    The index of a rank in the returned array is the configuration id.
+    """
+    kept: List[np.ndarray] = []
+    for first_rank, block in iter_blocks(pieces):
+        mask = np.ones(len(block), dtype=bool)
+        for board_filter in filters:
+            mask &= board_filter(block)
+        kept.append(first_rank + np.flatnonzero(mask))
+
+    if not kept:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(kept).astype(np.int64)
+
+
+def exclude_solved(target: Sequence[int]) -> BoardFilter:
+    """Filter out boards whose knights already occupy the target"""
+    squares = list(target)
+
+    def keep(boards: np.ndarray) -> np.ndarray:
+        return ~(boards[:, squares] == ord(KNIGHT)).all(axis=1)
+
+    return keep
+
+
+def require_empty_on(squares: Sequence[int]) -> BoardFilter:
+    """Keep only boards whose empty square is one of the given squares"""
+    squares = list(squares)
+
+    def keep(boards: np.ndarray) -> np.ndarray:
+        return (boards[:, squares] == ord(EMPTY)).any(axis=1)
+
+    return keep
@@ -0,0 +1,237 @@
+"""
+Whole-state-space distance tables.
+
+A distance table is a dense uint8 array with one entry per arrangement of
+a piece multiset, indexed by multiset-permutation rank (see configs.py):
+the number of moves to the nearest goal board, or UNREACHABLE.  It is built
+by a breadth-first search backwards from every goal board - moves are
+reversible, so the backward and forward searches are the same - and saved
+as a .npy file with a .json sidecar recording the pieces and target.
+
+Tables of other board sizes record their width and height in the sidecar
+and use that geometry's move tables; tables without them are 4x4.
+
+Loaded tables are memory-mapped.  Any board's distance is then one rank
+computation and one array read, and its optimal next moves are the
+neighbours whose distance is one less.
+"""
+
+import json
+import os
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .board import DEFAULT_GEOMETRY, EMPTY, Geometry, get_geometry
+from .configs import KNIGHT, check_rankable, count_arrangements, enumerate_ranks, rank_boards, unrank_boards
+
+UNREACHABLE = 255
+FRONTIER_CHUNK = 1000000
+
+
+@lru_cache(maxsize=None)
+def legal_move_table(geometry: Geometry = DEFAULT_GEOMETRY) -> np.ndarray:
+    """LEGAL[piece byte, source square, empty square] for every piece type"""
+    table = np.zeros((256, geometry.squares, geometry.squares), dtype=bool)
+    for piece, per_empty in geometry.move_sources.items():
+        for empty, sources in enumerate(per_empty):
+            table[ord(piece), list(sources), empty] = True
+    table.flags.writeable = False
+    return table
+
+
+LEGAL_MOVES = legal_move_table()
+
+
+def neighbor_boards(boards: np.ndarray, geometry: Geometry = DEFAULT_GEOMETRY):
+    """
+    Every board reachable in one move from each board
+
+    Args:
+        boards: (n, squares) uint8 array with one empty square per board
+        geometry: The boards' size
+
+    Returns:
+        (parent row, source square, (m, squares) array of resulting boards)
+    """
+    empty = np.argmax(boards == ord(EMPTY), axis=1)
+    squares = np.arange(geometry.squares)
+    legal = legal_move_table(geometry)[boards, squares[None, :], empty[:, None]]
+    parent, source = np.nonzero(legal)
+    moved = boards[parent].copy()
+    target_square = empty[parent]
+    moved[np.arange(len(parent)), target_square] = boards[parent, source]
+    moved[np.arange(len(parent)), source] = ord(EMPTY)
+    return parent, source, moved
+
+
+def build_distance_table(pieces: str, target: Sequence[int],
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         geometry: Geometry = DEFAULT_GEOMETRY) -> np.ndarray:
+    """
+    Breadth-first search from every goal board over the whole state space
+
+    Args:
+        pieces: Piece multiset, e.g. 'NNNNKKKRRRRBBBBx'
+        target: Squares the knights must occupy
+        progress: Called with (distance, boards at that distance) per layer
+        geometry: Board size; pieces must fill every square
+
+    Returns:
+        uint8 array of distances indexed by rank
+    """
+    if pieces.count(EMPTY) != 1:
+        raise ValueError('Distance tables need exactly one empty square')
+    if len(pieces) != geometry.squares:
+        raise ValueError(f'{len(pieces)} pieces do not fill a {geometry.name} board')
+    check_rankable(pieces)
+
+    table = np.full(count_arrangements(pieces), UNREACHABLE, dtype=np.uint8)
+    squares = list(target)
+    frontier = enumerate_ranks(pieces, [lambda boards: (boards[:, squares] == ord(KNIGHT)).all(axis=1)])
+    table[frontier] = 0
+    distance = 0
+
+    while len(frontier):
+        if progress is not None:
+            progress(distance, len(frontier))
+        if distance + 1 >= UNREACHABLE:
+            raise ValueError('State space too deep for a uint8 distance table')
+
+        layer = []
+        for start in range(0, len(frontier), FRONTIER_CHUNK):
+            _, _, moved = neighbor_boards(unrank_boards(frontier[start:start + FRONTIER_CHUNK], pieces), geometry)
+            ranks = rank_boards(moved, pieces)
+            ranks = np.unique(ranks[table[ranks] == UNREACHABLE])
+            # Marked immediately so later chunks of this layer skip them
+            table[ranks] = distance + 1
+            layer.append(ranks)
+
+        frontier = np.concatenate(layer) if layer else np.zeros(0, dtype=np.int64)
+        distance += 1
+
+    return table
+
+
+def table_path(directory: str, target_name: str) -> str:
+    """File name of a target's distance table"""
+    return os.path.join(directory, f"distances_{target_name.replace('-', '_')}.npy")
+
+
+def save_distance_table(path: str, table: np.ndarray, pieces: str, target: Sequence[int], target_name: str,
+                        geometry: Geometry = DEFAULT_GEOMETRY) -> None:
+    """Write a table and its .json sidecar"""
+    np.save(path, table)
+    reachable = table[table != UNREACHABLE]
+    metadata = {
+        'pieces': ''.join(sorted(pieces)),
+        'target': target_name,
+        'target_positions': ','.join(map(str, target)),
+        'width': geometry.width,
+        'height': geometry.height,
+        'states': int(len(table)),
+        'reachable': int(len(reachable)),
+        'max_distance': int(reachable.max()) if len(reachable) else None,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as file:
+        json.dump(metadata, file, indent=2)
+
+
+class DistanceTable:
+    """A memory-mapped distance table for one target"""
+
+    def __init__(self, path: str):
+        with open(os.path.splitext(path)[0] + '.json', 'r', encoding='utf-8') as file:
+            self.metadata = json.load(file)
+        self.path = path
+        self.pieces = self.metadata['pieces']
+        self.geometry = get_geometry(self.metadata.get('width', 4), self.metadata.get('height', 4))
+        self.target = [int(p) for p in self.metadata['target_positions'].split(',')]
+        self.table = np.load(path, mmap_mode='r')
+        if len(self.table) != count_arrangements(self.pieces):
+            raise ValueError(f'{path} does not match its piece set {self.pieces}')
+
+    def normalize(self, board: str) -> str:
+        """
+        Canonical form of a board for this table
+
+        Raises:
+            ValueError: If the board is not an arrangement of the table's pieces
+        """
+        board = board.replace(' ', EMPTY)
+        # With one empty square and no captures a queen moves exactly like a
+        # king, so tables built without queens treat them as kings
+        if 'Q' not in self.pieces:
+            board = board.replace('Q', 'K')
+        if len(board) != self.geometry.squares or sorted(board) != sorted(self.pieces):
+            raise ValueError(f'Board must be an arrangement of {self.pieces}')
+        return board
+
+    def _lookup(self, boards: np.ndarray) -> np.ndarray:
+        return np.asarray(self.table[rank_boards(boards, self.pieces)])
+
+    def distance(self, board: str) -> Optional[int]:
+        """Moves to the goal, or None if the goal cannot be reached"""
+        board = self.normalize(board)
+        value = int(self._lookup(np.frombuffer(board.encode('ascii'), dtype=np.uint8)[None, :])[0])
+        return None if value == UNREACHABLE else value
+
+    def distances(self, boards: Sequence[str]) -> List[Optional[int]]:
+        """Distances of many boards; None where unreachable or not an arrangement of the pieces"""
+        rows, normalized = [], []
+        for row, board in enumerate(boards):
+            try:
+                normalized.append(self.normalize(board))
+                rows.append(row)
+            except ValueError:
+                continue
+
+        result: List[Optional[int]] = [None] * len(boards)
+        if normalized:
+            array = np.frombuffer(''.join(normalized).encode('ascii'), dtype=np.uint8).reshape(-1, self.geometry.squares)
+            for row, value in zip(rows, self._lookup(array)):
+                if value != UNREACHABLE:
+                    result[row] = int(value)
+        return result
+
+    def hint(self, board: str) -> Dict:
+        """
+        Distance to the goal and every legal next move with its distance
+
+        Returns:
+            Dict with 'distance', 'solved', 'moves' (sorted, optimal first)
+            and 'best_move' (an optimal move, or None)
+        """
+        board = self.normalize(board)
+        current = np.frombuffer(board.encode('ascii'), dtype=np.uint8)[None, :]
+        value = int(self._lookup(current)[0])
+        distance = None if value == UNREACHABLE else value
+
+        _, sources, moved = neighbor_boards(current, self.geometry)
+        next_distances = self._lookup(moved) if len(moved) else []
+        empty = board.index(EMPTY)
+
+        moves: List[Dict] = []
+        for source, after, next_distance in zip(sources, moved, next_distances):
+            next_distance = None if next_distance == UNREACHABLE else int(next_distance)
+            moves.append({
+                'from': int(source),
+                'to': empty,
+                'piece': board[source],
+                'board': bytes(after).decode('ascii'),
+                'distance': next_distance,
+                'optimal': distance is not None and distance > 0 and next_distance == distance - 1,
+            })
+        moves.sort(key=lambda move: (move['distance'] is None, move['distance'] or 0, move['from']))
+
+        return {
+            'board': board,
+            'target': self.metadata['target'],
+            'distance': distance,
+            'solved': distance == 0,
+            'moves': moves,
+            'best_move': next((move for move in moves if move['optimal']), None),
+        }
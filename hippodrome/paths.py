@@ -0,0 +1,130 @@
+"""
+Optimal path counts and alternative solutions from a distance table.
+
+Every shortest solution steps from distance d to distance d - 1, so the
+number of optimal paths from a board is the sum of the counts of its
+neighbours one layer closer to the goal.  count_optimal_paths runs that
+recurrence layer by layer over the whole state space, keeping only two
+layers in memory, and returns the counts of the requested boards.
+
+iter_paths walks the same table lazily and yields optimal (or, with slack,
+near-optimal) solutions one at a time, so callers take as many as they need.
+"""
+
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .configs import rank_boards, unrank_boards
+from .distances import FRONTIER_CHUNK, UNREACHABLE, DistanceTable, neighbor_boards
+
+# Counts are accumulated as float64: exact up to 2**53, approximate above,
+# and reported no larger than an SQLite INTEGER holds
+MAX_COUNT = 2 ** 63 - 1
+
+
+def count_optimal_paths(table: DistanceTable, boards: Sequence[str],
+                        progress: Optional[Callable[[int, int], None]] = None) -> List[Optional[int]]:
+    """
+    Number of distinct optimal solutions of each board
+
+    Args:
+        table: Distance table of the boards' piece set and target
+        boards: Boards to report
+        progress: Called with (distance, boards at that distance) per layer
+
+    Returns:
+        Path count per board (1 for a solved board), None where the goal is
+        unreachable or the board does not belong to the table
+    """
+    wanted: List[Optional[int]] = [None] * len(boards)
+    rows, normalized = [], []
+    for row, board in enumerate(boards):
+        try:
+            normalized.append(table.normalize(board))
+            rows.append(row)
+        except ValueError:
+            continue
+    if not normalized:
+        return wanted
+
+    wanted_ranks = rank_boards(
+        np.frombuffer(''.join(normalized).encode('ascii'), dtype=np.uint8).reshape(-1, table.geometry.squares),
+        table.pieces,
+    )
+    wanted_distances = np.asarray(table.table[wanted_ranks])
+    reachable = wanted_distances != UNREACHABLE
+    deepest = int(wanted_distances[reachable].max()) if reachable.any() else -1
+
+    def report(distance: int, ranks: np.ndarray, counts: np.ndarray) -> None:
+        for index in np.flatnonzero(wanted_distances == distance):
+            position = np.searchsorted(ranks, wanted_ranks[index])
+            wanted[rows[index]] = min(int(counts[position]), MAX_COUNT)
+
+    previous_ranks = np.flatnonzero(np.asarray(table.table) == 0)
+    previous_counts = np.ones(len(previous_ranks))
+    report(0, previous_ranks, previous_counts)
+
+    for distance in range(1, deepest + 1):
+        ranks = np.flatnonzero(np.asarray(table.table) == distance)
+        if progress is not None:
+            progress(distance, len(ranks))
+        counts = np.zeros(len(ranks))
+        for start in range(0, len(ranks), FRONTIER_CHUNK):
+            chunk = ranks[start:start + FRONTIER_CHUNK]
+            parent, _, moved = neighbor_boards(unrank_boards(chunk, table.pieces), table.geometry)
+            moved_ranks = rank_boards(moved, table.pieces)
+            closer = np.asarray(table.table[moved_ranks]) == distance - 1
+            contributions = previous_counts[np.searchsorted(previous_ranks, moved_ranks[closer])]
+            counts[start:start + len(chunk)] = np.bincount(parent[closer], weights=contributions,
+                                                           minlength=len(chunk))
+        report(distance, ranks, counts)
+        previous_ranks, previous_counts = ranks, counts
+
+    return wanted
+
+
+def iter_paths(table: DistanceTable, board: str, slack: int = 0) -> Iterator[List[str]]:
+    """
+    Lazily yield solutions of board, trying optimal steps first
+
+    Args:
+        table: Distance table for the board's target
+        board: Initial board
+        slack: Extra moves allowed over the optimum; 0 yields only optimal
+            solutions, each exactly once.  Near-optimal solutions never
+            revisit a board.
+
+    Yields:
+        Boards from the initial board to a goal board
+    """
+    start = table.normalize(board)
+    optimum = table.distance(start)
+    if optimum is None:
+        return
+
+    path = [start]
+    on_path = {start}
+
+    def extend(budget: int) -> Iterator[List[str]]:
+        current = path[-1]
+        if table.distance(current) == 0:
+            yield list(path)
+            return
+        if budget == 0:
+            return
+
+        children = [child for child in table.geometry.next_states(current) if child not in on_path]
+        # Most promising first: optimal steps, then the least wasteful detours
+        for child_distance, child in sorted(
+            (child_distance, child)
+            for child, child_distance in zip(children, table.distances(children))
+            if child_distance is not None and child_distance <= budget - 1
+        ):
+            path.append(child)
+            on_path.add(child)
+            yield from extend(budget - 1)
+            path.pop()
+            on_path.discard(child)
+
+    yield from extend(optimum + slack)
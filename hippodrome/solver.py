@@ -0,0 +1,262 @@
+"""
+Search-based solvers for single Hippodrome configurations.
+
+Two modes share one admissible heuristic:
+
+* astar - A* with parent pointers; memory grows with the number of boards
+  visited.
+* ida - IDA*: depth-first searches bounded by f = g + h, raising the bound
+  to the smallest f that exceeded it.  Memory is the current path plus an
+  optional fixed-size transposition table, so the deepest configurations
+  solve in constant memory at the cost of re-expanding boards.
+
+The heuristic is the cheapest assignment of knights to target squares in
+knight moves, plus one for every target square held by another piece (that
+piece has to move away at least once).  Both terms count moves no other
+term counts, so solutions are optimal.
+"""
+
+import heapq
+from collections import deque
+from functools import lru_cache
+from itertools import permutations
+from typing import Dict, List, Optional, Sequence
+
+from .board import DEFAULT_GEOMETRY, EMPTY, Geometry
+
+KNIGHT_STEPS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+FOUND = -1
+UNSOLVABLE = float('inf')
+
+
+@lru_cache(maxsize=None)
+def build_knight_distances(geometry: Geometry = DEFAULT_GEOMETRY) -> List[List[int]]:
+    """Knight-move distance between every pair of squares (-1 where a knight never gets)"""
+    distances = []
+    for start in range(geometry.squares):
+        row = [-1] * geometry.squares
+        row[start] = 0
+        queue = deque([start])
+        while queue:
+            square = queue.popleft()
+            r, c = geometry.coordinates(square)
+            for dr, dc in KNIGHT_STEPS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < geometry.height and 0 <= nc < geometry.width and row[geometry.square(nr, nc)] < 0:
+                    row[geometry.square(nr, nc)] = row[square] + 1
+                    queue.append(geometry.square(nr, nc))
+        distances.append(row)
+    return distances
+
+
+KNIGHT_DISTANCES = build_knight_distances()
+
+
+def heuristic(board: str, target: Sequence[int], geometry: Geometry = DEFAULT_GEOMETRY) -> float:
+    """
+    Admissible lower bound on the moves left to reach the target
+
+    UNSOLVABLE when a target square is out of every knight's reach, e.g.
+    with a knight stuck in the centre of a 3x3 board.
+    """
+    distances = build_knight_distances(geometry)
+    knights = [square for square, piece in enumerate(board) if piece == 'N']
+    blocked = sum(1 for square in target if board[square] not in ('N', EMPTY))
+
+    def knight_moves_to(k: int, t: int) -> float:
+        return distances[k][t] if distances[k][t] >= 0 else UNSOLVABLE
+
+    if len(knights) != len(target):
+        # Extra knights: each target square still needs its nearest knight
+        knight_moves = sum(min(knight_moves_to(k, t) for k in knights) for t in target) if knights else 0
+    else:
+        knight_moves = min(
+            sum(knight_moves_to(k, t) for k, t in zip(knights, assignment))
+            for assignment in permutations(target)
+        )
+    return knight_moves + blocked
+
+
+def is_goal(board: str, target: Sequence[int]) -> bool:
+    return all(board[square] == 'N' for square in target)
+
+
+def _add_stats(stats: Optional[Dict[str, int]], expanded: int, generated: int, peak_open: int,
+               initial_h: int) -> None:
+    """Accumulate one solve's counters; peaks and the initial heuristic keep the last solve's value"""
+    if stats is not None:
+        stats['expanded'] = stats.get('expanded', 0) + expanded
+        stats['generated'] = stats.get('generated', 0) + generated
+        stats['peak_open'] = peak_open
+        stats['initial_h'] = initial_h if initial_h != UNSOLVABLE else None
+
+
+def solve_astar(board: str, target: Sequence[int], stats: Optional[Dict[str, int]] = None,
+                geometry: Geometry = DEFAULT_GEOMETRY) -> List[str]:
+    """
+    A* search keeping one parent pointer per visited board
+
+    Args:
+        board: Initial board
+        target: Squares the knights must occupy
+        stats: If given, 'expanded' and 'generated' node counts are added to
+            it and 'peak_open' and 'initial_h' are set
+        geometry: Board size
+
+    Returns:
+        Boards from the initial board to a goal board, or [] if unsolvable
+    """
+    parents: Dict[str, Optional[str]] = {board: None}
+    best_g = {board: 0}
+    initial_h = heuristic(board, target, geometry)
+    open_list = [(initial_h, 0, board)] if initial_h != UNSOLVABLE else []
+    expanded = generated = peak_open = 0
+
+    while open_list:
+        _, g, current = heapq.heappop(open_list)
+        if g > best_g.get(current, g):
+            continue
+        if is_goal(current, target):
+            path = []
+            while current is not None:
+                path.append(current)
+                current = parents[current]
+            _add_stats(stats, expanded, generated, peak_open, initial_h)
+            return path[::-1]
+
+        expanded += 1
+        for child in geometry.next_states(current):
+            generated += 1
+            if g + 1 < best_g.get(child, g + 2):
+                best_g[child] = g + 1
+                h = heuristic(child, target, geometry)
+                if h == UNSOLVABLE:
+                    continue
+                parents[child] = current
+                heapq.heappush(open_list, (g + 1 + h, g + 1, child))
+        peak_open = max(peak_open, len(open_list))
+
+    _add_stats(stats, expanded, generated, peak_open, initial_h)
+    return []
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of the shallowest depth each board was reached at
+
+    Slots are indexed by hash and overwritten on collision, so memory stays
+    constant; a lost entry only costs re-expanding that board.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.boards: List[Optional[str]] = [None] * size
+        self.depths = [0] * size
+
+    def seen_shallower(self, board: str, g: int) -> bool:
+        """Record (board, g); True if the board was already reached at depth <= g"""
+        slot = hash(board) % self.size
+        if self.boards[slot] == board and self.depths[slot] <= g:
+            return True
+        self.boards[slot] = board
+        self.depths[slot] = g
+        return False
+
+    def clear(self) -> None:
+        self.boards = [None] * self.size
+
+
+def solve_ida(board: str, target: Sequence[int], tt_size: int = 0, max_depth: int = 254,
+              stats: Optional[Dict[str, int]] = None, geometry: Geometry = DEFAULT_GEOMETRY) -> List[str]:
+    """
+    IDA* search in memory bounded by the path length and tt_size
+
+    Args:
+        board: Initial board
+        target: Squares the knights must occupy
+        tt_size: Transposition table slots (0 disables the table)
+        max_depth: Give up once the bound exceeds this many moves; an
+            unsolvable board is only recognised when the whole reachable
+            space fits under the bound, so this caps the time spent on it
+        stats: If given, 'expanded' and 'generated' node counts (summed over
+            every iteration) are added to it and 'peak_open' (children
+            waiting on the stack) and 'initial_h' are set
+        geometry: Board size
+
+    Returns:
+        Boards from the initial board to a goal board, or [] if unsolvable
+    """
+    path = [board]
+    on_path = {board}
+    table = TranspositionTable(tt_size) if tt_size > 0 else None
+    counts = [0, 0, 0, 0]  # expanded, generated, open, peak open
+
+    def search(g: int, bound: int) -> int:
+        current = path[-1]
+        f = g + heuristic(current, target, geometry)
+        if f > bound:
+            return f
+        if is_goal(current, target):
+            return FOUND
+
+        # Children with the smallest estimate first, so the final iteration
+        # reaches the goal early
+        children = []
+        for child in geometry.next_states(current):
+            if child not in on_path:
+                h = heuristic(child, target, geometry)
+                if h != UNSOLVABLE:
+                    children.append((h, child))
+        children.sort()
+        counts[0] += 1
+        counts[1] += len(children)
+        counts[2] += len(children)
+        counts[3] = max(counts[3], counts[2])
+        minimum = None
+        for _, child in children:
+            counts[2] -= 1
+            if table is not None and table.seen_shallower(child, g + 1):
+                continue
+            path.append(child)
+            on_path.add(child)
+            result = search(g + 1, bound)
+            if result == FOUND:
+                return FOUND
+            path.pop()
+            on_path.discard(child)
+            if minimum is None or result < minimum:
+                minimum = result
+        return minimum if minimum is not None else float('inf')
+
+    initial_h = bound = heuristic(board, target, geometry)
+    while bound <= max_depth:
+        if table is not None:
+            # Depths from an earlier bound would prune boards that can now
+            # be reached within the new one
+            table.clear()
+            table.seen_shallower(board, 0)
+        counts[2] = 0
+        result = search(0, bound)
+        if result == FOUND:
+            _add_stats(stats, counts[0], counts[1], counts[3], initial_h)
+            return list(path)
+        if result == float('inf'):
+            break
+        bound = result
+
+    _add_stats(stats, counts[0], counts[1], counts[3], initial_h)
+    return []
+
+
+ALGORITHMS = ('astar', 'ida')
+
+
+def solve(board: str, target: Sequence[int], algorithm: str = 'astar', tt_size: int = 0,
+          max_depth: int = 254, stats: Optional[Dict[str, int]] = None,
+          geometry: Geometry = DEFAULT_GEOMETRY) -> List[str]:
+    """Solve one configuration with the named algorithm"""
+    if algorithm == 'astar':
+        return solve_astar(board, target, stats=stats, geometry=geometry)
+    if algorithm == 'ida':
+        return solve_ida(board, target, tt_size=tt_size, max_depth=max_depth, stats=stats, geometry=geometry)
+    raise ValueError(f"Unknown algorithm '{algorithm}', expected one of: {', '.join(ALGORITHMS)}")
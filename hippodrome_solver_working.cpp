@@ -13,6 +13,9 @@
 #include <thread>
 #include <mutex>
 #include <atomic>
+#include <climits>
+#include <cstdint>
+#include <algorithm>
 
 // Target configuration for the puzzle
 struct Target {
@@ -129,14 +132,38 @@ struct State {
     }
 };
 
+// Search algorithm selected on the command line
+struct SolverOptions {
+    std::string algorithm = "astar"; // "astar" or "ida"
+    size_t tt_size = 0;              // IDA* transposition table slots (0 = none)
+    int max_depth = 80;              // IDA* gives up (unsolved) once the bound passes this
+};
+
+// Per-solve search counters, written next to each solution
+struct SearchStats {
+    long long nodes_expanded = 0;   // boards whose successors were generated
+    long long nodes_generated = 0;  // successors produced
+    size_t peak_open = 0;           // largest number of boards waiting to be expanded
+    size_t peak_memory_bytes = 0;   // approximate peak size of the search's containers
+    int initial_heuristic = 0;      // heuristic of the initial board, as used by the algorithm
+};
+
+// Bytes a 16-character board takes in a std::string (too long for the small-string buffer)
+const size_t BOARD_BYTES = sizeof(std::string) + 17;
+
+// One row of the solutions CSV
+using SolutionRecord = std::tuple<int, std::string, std::vector<std::string>, int, double, SearchStats>;
+
 // --- Function Prototypes ---
 int calculate_heuristic(const std::string& board, const Target& target);
 bool is_valid_move(char piece, int r1, int c1, int r2, int c2);
 std::vector<std::string> get_next_states(const std::string& board);
-std::vector<std::string> solve_hippodrome(const std::string& initial_board_str, const Target& target);
+std::vector<std::string> solve_hippodrome(const std::string& initial_board_str, const Target& target, SearchStats* stats = nullptr);
+std::vector<std::string> solve_hippodrome_ida(const std::string& initial_board_str, const Target& target, size_t tt_size, int max_depth, SearchStats* stats = nullptr);
+std::vector<std::string> solve_config(const std::string& initial_board_str, const Target& target, const SolverOptions& options, SearchStats* stats = nullptr);
 void print_board(const std::string& board_str);
 std::vector<std::pair<int, std::string>> load_configs_from_csv(const std::string& csv_path);
-void save_batch_to_csv(const std::vector<std::tuple<int, std::string, std::vector<std::string>, int, double>>& solutions, const std::string& filename);
+void save_batch_to_csv(const std::vector<SolutionRecord>& solutions, const std::string& filename);
 
 // --- Threading Support ---
 std::mutex output_mutex;
@@ -148,11 +175,12 @@ void process_configs_range(
     int start_idx, 
     int end_idx,
     int thread_id,
-    std::vector<std::tuple<int, std::string, std::vector<std::string>, int, double>>& shared_results,
+    std::vector<SolutionRecord>& shared_results,
     int total_configs,
-    const Target& target
+    const Target& target,
+    const SolverOptions& options
 ) {
-    std::vector<std::tuple<int, std::string, std::vector<std::string>, int, double>> local_results;
+    std::vector<SolutionRecord> local_results;
     
     for (int i = start_idx; i <= end_idx; ++i) {
         const auto& config = configs[i];
@@ -170,8 +198,9 @@ void process_configs_range(
             print_board(initial_board);
         }
 
+        SearchStats stats;
         auto start = std::chrono::high_resolution_clock::now();
-        std::vector<std::string> solution_path = solve_hippodrome(initial_board, target);
+        std::vector<std::string> solution_path = solve_config(initial_board, target, options, &stats);
         auto end = std::chrono::high_resolution_clock::now();
 
         std::chrono::duration<double, std::milli> duration = end - start;
@@ -192,7 +221,7 @@ void process_configs_range(
             std::cout << "----------------------------------------" << std::endl;
         }
 
-        local_results.emplace_back(id, initial_board, solution_path, moves, duration.count());
+        local_results.emplace_back(id, initial_board, solution_path, moves, duration.count(), stats);
     }
     
     // Add local results to shared results (thread-safe)
@@ -265,7 +294,7 @@ Range parse_range(const std::string& range_str) {
 }
 
 void print_usage(const char* program_name) {
-    std::cout << "Usage: " << program_name << " [range] [threads] [target]\n"
+    std::cout << "Usage: " << program_name << " [range] [threads] [target] [algorithm]\n"
               << "Examples:\n"
               << "  " << program_name << "                    # Process first 5 configs, single-threaded, top-row target\n"
               << "  " << program_name << " 10                 # Process only config 10, single-threaded, top-row target\n"
@@ -283,6 +312,12 @@ void print_usage(const char* program_name) {
               << "  first-column   # Knights must reach positions 0,4,8,12\n"
               << "  last-column    # Knights must reach positions 3,7,11,15\n"
               << "  \"0,1,4,5\"      # Custom positions (must be exactly 4 positions)\n"
+              << "\nAlgorithm options:\n"
+              << "  astar          # A* search (default)\n"
+              << "  ida            # IDA*: memory bounded by the solution depth\n"
+              << "  ida:1048576    # IDA* with a fixed-size transposition table (slots)\n"
+              << "  ida:1048576:60 # ... and a depth cap (default 80); deeper configs are written unsolved\n"
+              << "  ida::60        # IDA* with a depth cap and no transposition table\n"
               << std::endl;
 }
 
@@ -367,7 +402,7 @@ void print_board(const std::string& board_str) {
 }
 
 // --- A* Solver ---
-std::vector<std::string> solve_hippodrome(const std::string& initial_board_str, const Target& target) {
+std::vector<std::string> solve_hippodrome(const std::string& initial_board_str, const Target& target, SearchStats* stats) {
     if (initial_board_str.length() != 16) {
         std::cerr << "Error: Input string must be 16 characters long." << std::endl;
         return {};
@@ -386,12 +421,23 @@ std::vector<std::string> solve_hippodrome(const std::string& initial_board_str,
     std::priority_queue<State, std::vector<State>, std::greater<State>> pq;
     std::unordered_set<std::string> visited;
 
+    // Approximate bytes held by a queued state and a visited-set node
+    auto state_bytes = [](const State& state) {
+        return sizeof(State) + 17 + state.path.size() * BOARD_BYTES;
+    };
+    const size_t visited_bytes = BOARD_BYTES + 2 * sizeof(void*);
+    SearchStats local_stats;
+    size_t open_bytes = 0;
+
     int initial_heuristic = calculate_heuristic(initial_board_str, target);
+    local_stats.initial_heuristic = initial_heuristic;
     pq.push({initial_heuristic, 0, {initial_board_str}, initial_board_str});
+    open_bytes += state_bytes(pq.top());
 
     while (!pq.empty()) {
         State current = pq.top();
         pq.pop();
+        open_bytes -= state_bytes(current);
 
         if (visited.count(current.board)) {
             continue;
@@ -399,24 +445,183 @@ std::vector<std::string> solve_hippodrome(const std::string& initial_board_str,
         visited.insert(current.board);
 
         if (is_goal_state(current.board)) {
+            if (stats) *stats = local_stats;
             return current.path;
         }
 
+        local_stats.nodes_expanded++;
         int new_g_score = current.g_score + 1;
         for (const auto& next_board : get_next_states(current.board)) {
+            local_stats.nodes_generated++;
             if (!visited.count(next_board)) {
                 int heuristic = calculate_heuristic(next_board, target);
                 int new_f_score = new_g_score + heuristic;
                 std::vector<std::string> new_path = current.path;
                 new_path.push_back(next_board);
-                pq.push({new_f_score, new_g_score, new_path, next_board});
+                State next = {new_f_score, new_g_score, new_path, next_board};
+                open_bytes += state_bytes(next);
+                pq.push(std::move(next));
             }
         }
+
+        local_stats.peak_open = std::max(local_stats.peak_open, pq.size());
+        local_stats.peak_memory_bytes = std::max(local_stats.peak_memory_bytes,
+                                                 open_bytes + visited.size() * visited_bytes);
     }
 
+    if (stats) *stats = local_stats;
     return {};
 }
 
+// --- IDA* Solver ---
+// Depth-first searches bounded by f = g + h, raising the bound to the
+// smallest f that exceeded it. Memory is the current path plus an optional
+// fixed-size transposition table, so the deepest configurations solve in
+// constant memory at the cost of re-expanding boards. The heuristic sums
+// each knight's distance to its nearest target square and adds one for
+// every target square held by another piece; unlike calculate_heuristic's
+// penalty it never overestimates, so IDA* solutions are optimal.
+namespace {
+
+const int IDA_FOUND = -1;
+const int IDA_MAX_DEPTH = 254;
+
+struct IdaSearch {
+    const Target& target;
+    std::vector<int> knight_distance;   // per square, to the nearest target
+    std::vector<bool> is_target;
+    std::vector<std::string> path;
+    std::vector<uint64_t> tt_keys;      // board hash per slot (0 = empty)
+    std::vector<uint8_t> tt_depths;     // shallowest depth the board was reached at
+    std::hash<std::string> hasher;
+    SearchStats stats;
+    size_t open = 0;                    // children generated but not yet searched
+
+    IdaSearch(const Target& t, size_t tt_size) : target(t), knight_distance(16), is_target(16, false),
+                                                 tt_keys(tt_size, 0), tt_depths(tt_size, 0) {
+        for (int pos = 0; pos < 16; ++pos) {
+            knight_distance[pos] = knight_distance_to_targets(pos, target);
+        }
+        for (int pos : target.positions) {
+            is_target[pos] = true;
+        }
+    }
+
+    int heuristic(const std::string& board) const {
+        int h = 0;
+        for (int i = 0; i < 16; ++i) {
+            if (board[i] == 'N') {
+                h += knight_distance[i];
+            } else if (is_target[i] && board[i] != 'x') {
+                h += 1;
+            }
+        }
+        return h;
+    }
+
+    bool is_goal(const std::string& board) const {
+        for (int pos : target.positions) {
+            if (board[pos] != 'N') return false;
+        }
+        return true;
+    }
+
+    bool on_path(const std::string& board) const {
+        return std::find(path.begin(), path.end(), board) != path.end();
+    }
+
+    // Record (board, g); true if the board was already reached at depth <= g
+    bool seen_shallower(const std::string& board, int g) {
+        if (tt_keys.empty()) return false;
+        uint64_t key = hasher(board) | 1;
+        size_t slot = key % tt_keys.size();
+        if (tt_keys[slot] == key && tt_depths[slot] <= g) return true;
+        tt_keys[slot] = key;
+        tt_depths[slot] = static_cast<uint8_t>(g);
+        return false;
+    }
+
+    int search(int g, int bound) {
+        const std::string current = path.back();
+        int f = g + heuristic(current);
+        if (f > bound) return f;
+        if (is_goal(current)) return IDA_FOUND;
+
+        // Children with the smallest estimate first
+        std::vector<std::pair<int, std::string>> children;
+        for (const auto& next_board : get_next_states(current)) {
+            if (!on_path(next_board)) {
+                children.emplace_back(heuristic(next_board), next_board);
+            }
+        }
+        std::sort(children.begin(), children.end());
+
+        stats.nodes_expanded++;
+        stats.nodes_generated += children.size();
+        open += children.size();
+        stats.peak_open = std::max(stats.peak_open, open);
+        stats.peak_memory_bytes = std::max(stats.peak_memory_bytes,
+                                           (path.size() + open) * BOARD_BYTES
+                                           + tt_keys.size() * (sizeof(uint64_t) + sizeof(uint8_t)));
+
+        int minimum = INT_MAX;
+        for (size_t i = 0; i < children.size(); ++i) {
+            const auto& child = children[i];
+            open--;
+            if (seen_shallower(child.second, g + 1)) continue;
+            path.push_back(child.second);
+            int result = search(g + 1, bound);
+            if (result == IDA_FOUND) return IDA_FOUND;
+            path.pop_back();
+            minimum = std::min(minimum, result);
+        }
+        return minimum;
+    }
+};
+
+} // namespace
+
+std::vector<std::string> solve_hippodrome_ida(const std::string& initial_board_str, const Target& target, size_t tt_size, int max_depth, SearchStats* stats) {
+    if (initial_board_str.length() != 16) {
+        std::cerr << "Error: Input string must be 16 characters long." << std::endl;
+        return {};
+    }
+
+    IdaSearch ida(target, tt_size);
+    ida.path.push_back(initial_board_str);
+
+    int bound = ida.heuristic(initial_board_str);
+    ida.stats.initial_heuristic = bound;
+    // Only cycles on the current path are pruned, so an unsolvable board is
+    // only recognised once the bound passes the cap
+    max_depth = std::min(max_depth, IDA_MAX_DEPTH);
+    while (bound <= max_depth) {
+        // Depths recorded under an earlier bound would prune boards that
+        // can now be reached within the new one
+        std::fill(ida.tt_keys.begin(), ida.tt_keys.end(), 0);
+        ida.seen_shallower(initial_board_str, 0);
+        ida.open = 0;
+
+        int result = ida.search(0, bound);
+        if (result == IDA_FOUND) {
+            if (stats) *stats = ida.stats;
+            return ida.path;
+        }
+        if (result == INT_MAX) break;
+        bound = result;
+    }
+
+    if (stats) *stats = ida.stats;
+    return {};
+}
+
+std::vector<std::string> solve_config(const std::string& initial_board_str, const Target& target, const SolverOptions& options, SearchStats* stats) {
+    if (options.algorithm == "ida") {
+        return solve_hippodrome_ida(initial_board_str, target, options.tt_size, options.max_depth, stats);
+    }
+    return solve_hippodrome(initial_board_str, target, stats);
+}
+
 // --- CSV Functions ---
 std::vector<std::pair<int, std::string>> load_configs_from_csv(const std::string& csv_path) {
     std::vector<std::pair<int, std::string>> configs;
@@ -462,7 +667,7 @@ std::vector<std::pair<int, std::string>> load_configs_from_csv(const std::string
     return configs;
 }
 
-void save_batch_to_csv(const std::vector<std::tuple<int, std::string, std::vector<std::string>, int, double>>& solutions, const std::string& filename) {
+void save_batch_to_csv(const std::vector<SolutionRecord>& solutions, const std::string& filename) {
     if (solutions.empty()) {
         std::cout << "No solutions to save." << std::endl;
         return;
@@ -478,14 +683,19 @@ void save_batch_to_csv(const std::vector<std::tuple<int, std::string, std::vecto
     std::string full_path = "solutions_csv/" + filename;
     std::ofstream file(full_path);
 
-    file << "ID,Initial Board,Solution Path,Moves,Time (ms)\n";
+    file << "ID,Initial Board,Solution Path,Moves,Time (ms),"
+         << "Nodes Expanded,Nodes Generated,Peak Open,Peak Memory (KB),Initial Heuristic\n";
     for (const auto& sol : solutions) {
         file << std::get<0>(sol) << "," << std::get<1>(sol) << ",";
         const auto& path = std::get<2>(sol);
         for (size_t i = 0; i < path.size(); ++i) {
             file << path[i] << (i == path.size() - 1 ? "" : ";");
         }
-        file << "," << std::get<3>(sol) << "," << std::get<4>(sol) << "\n";
+        const SearchStats& stats = std::get<5>(sol);
+        file << "," << std::get<3>(sol) << "," << std::get<4>(sol)
+             << "," << stats.nodes_expanded << "," << stats.nodes_generated
+             << "," << stats.peak_open << "," << (stats.peak_memory_bytes + 1023) / 1024
+             << "," << stats.initial_heuristic << "\n";
     }
     std::cout << "Solutions saved to " << full_path << std::endl;
 }
@@ -494,7 +704,7 @@ void save_batch_to_csv(const std::vector<std::tuple<int, std::string, std::vecto
 int main(int argc, char* argv[]) {
     std::string csv_path = "filtered_hippodrome_configs.csv";
     std::vector<std::pair<int, std::string>> configs = load_configs_from_csv(csv_path);
-    std::vector<std::tuple<int, std::string, std::vector<std::string>, int, double>> all_solutions;
+    std::vector<SolutionRecord> all_solutions;
 
     // Parse command line arguments
     Range range = {0, 4, true}; // Default: first 5 configs (0-4)
@@ -502,6 +712,7 @@ int main(int argc, char* argv[]) {
     std::string output_filename = "first_5_solutions.csv";
     int num_threads = 1; // Default: single-threaded
     Target target = Targets::TOP_ROW; // Default: top-row target
+    SolverOptions options; // Default: A*
     
     if (argc > 1) {
         std::string arg = argv[1];
@@ -568,6 +779,41 @@ int main(int argc, char* argv[]) {
         }
     }
     
+    // Parse algorithm if provided: "astar", "ida" or "ida:<tt slots>[:<max depth>]"
+    if (argc > 4) {
+        std::string algorithm = argv[4];
+        size_t colon_pos = algorithm.find(':');
+        options.algorithm = algorithm.substr(0, colon_pos);
+        if (options.algorithm != "astar" && options.algorithm != "ida") {
+            std::cerr << "Error: Unknown algorithm '" << algorithm << "'" << std::endl;
+            print_usage(argv[0]);
+            return 1;
+        }
+        if (colon_pos != std::string::npos) {
+            std::string tt_spec = algorithm.substr(colon_pos + 1);
+            size_t depth_pos = tt_spec.find(':');
+            if (depth_pos != std::string::npos) {
+                try {
+                    options.max_depth = std::stoi(tt_spec.substr(depth_pos + 1));
+                } catch (...) {
+                    options.max_depth = -1;
+                }
+                if (options.max_depth < 0 || options.max_depth > IDA_MAX_DEPTH) {
+                    std::cerr << "Error: Invalid maximum depth in '" << algorithm
+                              << "' (0 to " << IDA_MAX_DEPTH << ")" << std::endl;
+                    return 1;
+                }
+                tt_spec = tt_spec.substr(0, depth_pos);
+            }
+            try {
+                options.tt_size = tt_spec.empty() ? 0 : std::stoull(tt_spec);
+            } catch (...) {
+                std::cerr << "Error: Invalid transposition table size in '" << algorithm << "'" << std::endl;
+                return 1;
+            }
+        }
+    }
+    
     // Validate range bounds
     if (range.start < 0 || range.end >= (int)configs.size() || range.start > range.end) {
         std::cerr << "Error: Range " << range.start << " to " << range.end 
@@ -591,6 +837,11 @@ int main(int argc, char* argv[]) {
         if (i < target.positions.size() - 1) std::cout << ",";
     }
     std::cout << ")" << std::endl;
+    std::cout << "Algorithm: " << options.algorithm;
+    if (options.tt_size > 0) {
+        std::cout << " (transposition table: " << options.tt_size << " slots)";
+    }
+    std::cout << std::endl;
     std::cout << "Output file: " << output_filename << "\n" << std::endl;
 
     // Reset global counters
@@ -611,8 +862,9 @@ int main(int argc, char* argv[]) {
             std::cout << "Initial board: " << initial_board << std::endl;
             print_board(initial_board);
 
+            SearchStats stats;
             auto start = std::chrono::high_resolution_clock::now();
-            std::vector<std::string> solution_path = solve_hippodrome(initial_board, target);
+            std::vector<std::string> solution_path = solve_config(initial_board, target, options, &stats);
             auto end = std::chrono::high_resolution_clock::now();
 
             std::chrono::duration<double, std::milli> duration = end - start;
@@ -629,7 +881,7 @@ int main(int argc, char* argv[]) {
             }
             std::cout << "----------------------------------------" << std::endl;
 
-            all_solutions.emplace_back(id, initial_board, solution_path, moves, duration.count());
+            all_solutions.emplace_back(id, initial_board, solution_path, moves, duration.count(), stats);
         }
     } else {
         // Multi-threaded mode
@@ -655,7 +907,8 @@ int main(int argc, char* argv[]) {
                                thread_id, 
                                std::ref(all_solutions),
                                total_to_process,
-                               std::cref(target));
+                               std::cref(target),
+                               std::cref(options));
             
             current_start = thread_end + 1;
         }
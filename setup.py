@@ -15,6 +15,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/hippodrome-solver",
     packages=find_packages(),
+    py_modules=["visualize_solution", "validate_solutions", "generate_configs", "build_distances", "solve_configs", "benchmark"],
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -33,20 +34,29 @@ setup(
     install_requires=[
         "flask>=2.0.0",
         "flask-cors>=3.0.0",
+        "numpy>=1.20.0",
     ],
     extras_require={
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.0",
         ],
+        "columnar": [
+            "pyarrow>=10.0.0",
+        ],
         "web": [
             "gunicorn>=20.0.0",
+            "uvicorn>=0.20.0",
         ],
     },
     entry_points={
         "console_scripts": [
             "hippodrome-visualize=visualize_solution:main",
             "hippodrome-validate=validate_solutions:main",
+            "hippodrome-configs=generate_configs:main",
+            "hippodrome-distances=build_distances:main",
+            "hippodrome-solve=solve_configs:main",
+            "hippodrome-benchmark=benchmark:main",
         ],
     },
     project_urls={
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Hippodrome Batch Solver
+Python counterpart of the C++ solver's batch mode
+
+Reads filtered_hippodrome_configs.csv, solves a range of configurations
+across worker processes and writes solutions_csv/<name>.csv in the same
+format as the C++ solver, including its per-solve search counters.
+--algorithm ida solves in memory bounded by the solution depth plus an
+optional fixed-size transposition table, so large runs on many cores
+cannot run out of memory on the deepest configurations.  --size solves
+boards of other dimensions (the C++ solver is 4x4 only).
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import time
+import tracemalloc
+from typing import List, Optional, Sequence, Tuple
+
+from hippodrome.board import DEFAULT_GEOMETRY, EMPTY, TARGETS, Geometry, parse_geometry
+from hippodrome.solver import ALGORITHMS, solve
+
+Config = Tuple[int, str]
+
+CSV_HEADER = ('ID,Initial Board,Solution Path,Moves,Time (ms),'
+              'Nodes Expanded,Nodes Generated,Peak Open,Peak Memory (KB),Initial Heuristic')
+
+# Per-worker settings, set by init_worker
+_settings = {}
+
+
+def load_configs(csv_path: str, geometry: Geometry = DEFAULT_GEOMETRY) -> List[Config]:
+    """Read (id, board) pairs the way the C++ solver's load_configs_from_csv does"""
+    configs = []
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        file.readline()  # Skip header row
+        for line in file:
+            id_str, sep, board = line.rstrip('\r\n').partition(',')
+            if not sep:
+                continue
+            board = board.strip().replace(' ', EMPTY)[:geometry.squares]
+            if len(board) == geometry.squares:
+                configs.append((int(id_str), board))
+    return configs
+
+
+def parse_range(range_str: str, count: int) -> Optional[Tuple[int, int]]:
+    """Parse 'all', '5', '5-10', '5->10' or '5..10' into inclusive indexes"""
+    if range_str == 'all':
+        return 0, count - 1
+    match = re.fullmatch(r'(\d+)(?:(?:->|\.\.|-)(\d+))?', range_str)
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) is not None else start
+    return start, end
+
+
+def output_name(range_str: str, start: int, end: int, workers: int, target_name: Optional[str]) -> str:
+    """Output filename following the C++ solver's naming"""
+    if range_str == 'all':
+        name = 'all_solutions'
+    elif start == end:
+        name = f'config_{start}_solution'
+    else:
+        name = f'configs_{start}_to_{end}_solutions'
+    if workers > 1:
+        name += f'_{workers}t'
+    if target_name:
+        name += f'_{target_name}'
+    return name + '.csv'
+
+
+def init_worker(target: Sequence[int], algorithm: str, tt_size: int, max_depth: int, trace_memory: bool,
+                size: str) -> None:
+    _settings.update(target=target, algorithm=algorithm, tt_size=tt_size, max_depth=max_depth,
+                     trace_memory=trace_memory, geometry=parse_geometry(size))
+
+
+def solve_config(config: Config):
+    config_id, board = config
+    stats = {}
+    if _settings['trace_memory']:
+        tracemalloc.start()
+    start = time.perf_counter()
+    path = solve(board, _settings['target'], _settings['algorithm'], _settings['tt_size'], _settings['max_depth'],
+                 stats=stats, geometry=_settings['geometry'])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if _settings['trace_memory']:
+        stats['peak_memory_kb'] = (tracemalloc.get_traced_memory()[1] + 1023) // 1024
+        tracemalloc.stop()
+    return config_id, board, path, len(path) - 1 if path else -1, elapsed_ms, stats
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Solve Hippodrome configurations in batch')
+    parser.add_argument('range', nargs='?', default='0-4', help="'all', '5', '5-10', '5->10' or '5..10' (default 0-4)")
+    parser.add_argument('workers', nargs='?', type=int, default=1, help='Worker processes (default 1)')
+    parser.add_argument('target', nargs='?', help="Target name or squares like '0,1,4,5' (default top-row)")
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='astar', help='Search algorithm (default astar)')
+    parser.add_argument('--tt-size', type=int, default=1 << 20,
+                        help='IDA* transposition table slots, 0 to disable (default 1048576)')
+    parser.add_argument('--max-depth', type=int, default=80,
+                        help='IDA* gives up past this many moves (default 80)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Record each solve\'s peak Python memory (slower)')
+    parser.add_argument('--size', default=DEFAULT_GEOMETRY.name, help="Board size such as '5x5' (default 4x4)")
+    parser.add_argument('--configs', default='filtered_hippodrome_configs.csv', help='Configurations CSV')
+    parser.add_argument('--output-dir', default='solutions_csv', help='Directory for the solutions CSV')
+    args = parser.parse_args()
+
+    try:
+        geometry = parse_geometry(args.size)
+    except ValueError as e:
+        parser.error(str(e))
+    configs = load_configs(args.configs, geometry)
+    bounds = parse_range(args.range, len(configs))
+    if bounds is None:
+        parser.error(f"Invalid range format '{args.range}'")
+    start, end = bounds
+    if start < 0 or end >= len(configs) or start > end:
+        parser.error(f'Range {start} to {end} is invalid. Available configs: 0 to {len(configs) - 1}')
+    if args.workers <= 0:
+        parser.error(f'Worker count must be positive, got {args.workers}')
+
+    try:
+        target = geometry.parse_target(args.target or 'top-row')
+    except ValueError as e:
+        parser.error(str(e))
+    if args.target is None:
+        target_name = None
+    elif args.target in TARGETS:
+        target_name = args.target
+    else:
+        target_name = f'custom-{args.target}'
+
+    selected = configs[start:end + 1]
+    workers = min(args.workers, len(selected))
+    tt_size = args.tt_size if args.algorithm == 'ida' else 0
+    filename = output_name(args.range, start, end, workers, target_name)
+
+    print(f"Processing configs {start} to {end} ({len(selected)} configs) out of {len(configs)} total configs")
+    print(f"Using {workers} worker(s), algorithm {args.algorithm}"
+          + (f" (transposition table: {tt_size:,} slots)" if tt_size else ''))
+    print(f"Target: {args.target or 'top-row'} (positions: {','.join(map(str, target))})")
+    print(f"Output file: {filename}\n")
+
+    overall_start = time.perf_counter()
+    solutions = []
+    settings = (target, args.algorithm, tt_size, args.max_depth, args.trace_memory, geometry.name)
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=settings) as pool:
+        for done, solution in enumerate(pool.imap(solve_config, selected, chunksize=1), 1):
+            config_id, _, _, moves, elapsed_ms, _ = solution
+            print(f"[{done}/{len(selected)}] ID: {config_id}, Moves: {moves}, Time: {elapsed_ms:.1f} ms")
+            solutions.append(solution)
+
+    overall_ms = (time.perf_counter() - overall_start) * 1000
+    print(f"\nOverall processing time: {overall_ms:.0f} ms")
+    print(f"Average time per config: {overall_ms / len(selected):.1f} ms")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, filename)
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write(CSV_HEADER + '\n')
+        for config_id, board, path, moves, elapsed_ms, stats in solutions:
+            file.write(f"{config_id},{board},{';'.join(path)},{moves},{elapsed_ms},"
+                       f"{stats['expanded']},{stats['generated']},{stats['peak_open']},"
+                       f"{stats.get('peak_memory_kb', '')},{'' if stats['initial_h'] is None else stats['initial_h']}\n")
+    print(f"Solutions saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
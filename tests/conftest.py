@@ -0,0 +1,30 @@
+"""
+Shared fixtures.  The explorer's modules import each other by bare name, as
+they do when run from frontend_explorer/, so that directory goes on the path.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'frontend_explorer'))
+
+from hippodrome.board import get_geometry  # noqa: E402
+from hippodrome.distances import DistanceTable, build_distance_table, save_distance_table  # noqa: E402
+
+# A 3x3 space small enough to solve every board by search
+SMALL_GEOMETRY = get_geometry(3)
+SMALL_PIECES = 'NNNKKRBBx'
+SMALL_TARGET = SMALL_GEOMETRY.targets['top-row']
+
+
+@pytest.fixture(scope='session')
+def small_table(tmp_path_factory):
+    """Distance table of SMALL_PIECES for the 3x3 top row, saved and memory-mapped"""
+    table = build_distance_table(SMALL_PIECES, SMALL_TARGET, geometry=SMALL_GEOMETRY)
+    path = str(tmp_path_factory.mktemp('distances') / 'distances_top_row.npy')
+    save_distance_table(path, table, SMALL_PIECES, SMALL_TARGET, 'top-row', geometry=SMALL_GEOMETRY)
+    return DistanceTable(path)
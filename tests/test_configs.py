@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from hippodrome.configs import count_arrangements, multiset_permutations, rank_boards, unrank_boards
+
+from .conftest import SMALL_PIECES
+
+
+def test_unrank_then_rank_round_trips():
+    ranks = np.arange(count_arrangements(SMALL_PIECES))
+    boards = unrank_boards(ranks, SMALL_PIECES)
+    assert len({bytes(board) for board in boards}) == len(ranks)
+    assert (rank_boards(boards, SMALL_PIECES) == ranks).all()
+
+
+def test_ranks_follow_lexicographic_order():
+    boards = multiset_permutations(SMALL_PIECES)
+    assert (rank_boards(boards, SMALL_PIECES) == np.arange(len(boards))).all()
+
+
+def test_round_trip_on_the_full_board():
+    pieces = 'NNNNKKKRRRRBBBBx'
+    ranks = np.random.default_rng(0).integers(0, count_arrangements(pieces), 1000)
+    assert (rank_boards(unrank_boards(ranks, pieces), pieces) == ranks).all()
+
+
+def test_rank_rejects_other_pieces():
+    with pytest.raises(ValueError):
+        rank_boards(np.frombuffer(b'NNNNKRBBx', dtype=np.uint8)[None, :], SMALL_PIECES)
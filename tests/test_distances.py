@@ -0,0 +1,37 @@
+import numpy as np
+
+from hippodrome.configs import count_arrangements, unrank_boards
+from hippodrome.distances import UNREACHABLE
+from hippodrome.solver import solve_astar
+
+from .conftest import SMALL_GEOMETRY, SMALL_PIECES, SMALL_TARGET
+
+
+def sample_boards(count, seed=0):
+    ranks = np.random.default_rng(seed).choice(count_arrangements(SMALL_PIECES), count, replace=False)
+    return [board.tobytes().decode('ascii') for board in unrank_boards(ranks, SMALL_PIECES)]
+
+
+def test_table_matches_astar(small_table):
+    for board in sample_boards(40):
+        path = solve_astar(board, SMALL_TARGET, geometry=SMALL_GEOMETRY)
+        assert small_table.distance(board) == (len(path) - 1 if path else None), board
+
+
+def test_goal_boards_are_at_distance_zero(small_table):
+    table = np.asarray(small_table.table)
+    goals = unrank_boards(np.flatnonzero(table == 0), SMALL_PIECES)
+    assert (goals[:, list(SMALL_TARGET)] == ord('N')).all()
+    assert (table == UNREACHABLE).any()
+
+
+def test_hint_steps_one_closer(small_table):
+    for board in sample_boards(20, seed=1):
+        distance = small_table.distance(board)
+        if not distance:
+            continue
+        hint = small_table.hint(board)
+        assert hint['distance'] == distance
+        assert small_table.distance(hint['best_move']['board']) == distance - 1
+        for move in hint['moves']:
+            assert move['optimal'] == (move['distance'] == distance - 1)
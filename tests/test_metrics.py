@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+from flask import Flask
+
+import metrics
+from errors import InvalidRequest
+
+app = Flask(__name__)
+
+
+@pytest.mark.parametrize('error, status', [
+    (InvalidRequest('limit must be an integer'), 400),
+    (FileNotFoundError('Target database not found'), 404),
+    (sqlite3.OperationalError('database is locked'), 503),
+    (sqlite3.OperationalError('no such column: knight_mask'), 500),
+    (ValueError('targets_summary.npy does not match its 5 targets'), 500),
+    (KeyError('target_name'), 500),
+])
+def test_error_response_status(error, status):
+    with app.test_request_context('/api/stats'):
+        response, code = metrics.error_response(error)
+    assert code == status
+    message = response.get_json()['error']
+    # Server errors do not leak their message
+    assert (str(error) in message) == (status != 500)
+
+
+class Resident:
+    targets = {'top-row': None}
+
+
+@pytest.mark.parametrize('url, label', [
+    ('/api/stats?target=top-row', 'top-row'),
+    ('/api/stats?target=nonsense', 'other'),
+    ('/api/compare/42', ''),
+    ('/api/targets', ''),
+    ('/?target=top-row', ''),
+])
+def test_target_label(url, label):
+    with app.test_request_context(url):
+        assert metrics.target_label(Resident()) == label
@@ -0,0 +1,40 @@
+import numpy as np
+
+from hippodrome.configs import unrank_boards
+from hippodrome.paths import count_optimal_paths, iter_paths
+from hippodrome.solver import is_goal
+
+from .conftest import SMALL_GEOMETRY, SMALL_PIECES, SMALL_TARGET
+
+
+def count_walks(board, moves):
+    """Move sequences of exactly `moves` steps that end on a goal board"""
+    if moves == 0:
+        return int(is_goal(board, SMALL_TARGET))
+    return sum(count_walks(child, moves - 1) for child in SMALL_GEOMETRY.next_states(board))
+
+
+def boards_at(table, distance, count=5):
+    ranks = np.flatnonzero(np.asarray(table.table) == distance)[:count]
+    return [board.tobytes().decode('ascii') for board in unrank_boards(ranks, SMALL_PIECES)]
+
+
+def test_counts_match_brute_force(small_table):
+    boards = [board for distance in range(6) for board in boards_at(small_table, distance)]
+    counts = count_optimal_paths(small_table, boards)
+    for board, count in zip(boards, counts):
+        # No walk of the optimal length passes a goal early, so every one counts
+        assert count == count_walks(board, small_table.distance(board)), board
+
+
+def test_unreachable_and_foreign_boards_have_no_count(small_table):
+    unreachable = boards_at(small_table, 255, count=1)
+    assert count_optimal_paths(small_table, unreachable + ['NNNNKKKRx']) == [None, None]
+
+
+def test_iter_paths_yields_each_optimal_path_once(small_table):
+    board = boards_at(small_table, 5, count=1)[0]
+    paths = list(iter_paths(small_table, board))
+    assert len({tuple(path) for path in paths}) == len(paths)
+    assert len(paths) == count_optimal_paths(small_table, [board])[0]
+    assert all(len(path) == 6 for path in paths)
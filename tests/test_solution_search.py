@@ -0,0 +1,83 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from errors import InvalidRequest
+from solution_search import build_search_query, create_search_indexes, parse_search_args, run_search
+
+PIECES = 'NNNNKKKRRRRBBBBx'
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute('''
+        CREATE TABLE solutions (
+            id INTEGER PRIMARY KEY,
+            initial_board TEXT NOT NULL,
+            solution_path TEXT NOT NULL,
+            moves INTEGER NOT NULL,
+            time_ms REAL NOT NULL
+        )
+    ''')
+    rng = np.random.default_rng(0)
+    rows = []
+    for config_id in range(500):
+        board = ''.join(rng.permutation(list(PIECES)))
+        # Few distinct move counts, so pages split runs of equal moves
+        rows.append((config_id, board, board, int(rng.integers(0, 8)), 1.0))
+    conn.executemany('INSERT INTO solutions VALUES (?, ?, ?, ?, ?)', rows)
+    create_search_indexes(conn.cursor())
+    yield conn
+    conn.close()
+
+
+def page_through(conn, args):
+    ids, cursor = [], None
+    while True:
+        page = run_search(conn, parse_search_args(dict(args, cursor=cursor) if cursor else args))
+        ids.extend(row['id'] for row in page['results'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('args', [
+    {'limit': '7'},
+    {'limit': '7', 'order': 'desc'},
+    {'limit': '3', 'empty': '5'},
+    {'limit': '10', 'knights': '0,1', 'min_moves': '2', 'max_moves': '6'},
+    {'limit': '4', 'sq0': 'K', 'order': 'desc'},
+])
+def test_keyset_pages_have_no_duplicates_or_gaps(conn, args):
+    filters = parse_search_args(args)
+    # Past MAX_LIMIT, to get every match in one query
+    filters['limit'] = 100000
+    query, params = build_search_query(filters)
+    expected = [row['id'] for row in conn.execute(query, params)]
+    assert expected
+    assert page_through(conn, args) == expected
+
+
+def test_filters_select_matching_boards(conn):
+    page = run_search(conn, parse_search_args({'empty': '3', 'knights': '0', 'sq5': 'R', 'limit': '100'}))
+    for row in page['results']:
+        board = row['initial_board']
+        assert board[3] == 'x' and board[0] == 'N' and board[5] == 'R'
+
+
+def test_queries_use_covering_indexes(conn):
+    for args in ({'empty': '3'}, {'knights': '0,1,2,3'}):
+        query, params = build_search_query(parse_search_args(args))
+        plan = ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params))
+        assert 'COVERING INDEX' in plan
+
+
+@pytest.mark.parametrize('args', [
+    {'sq0': 'Q'}, {'empty': '16'}, {'knights': '0,1,2,3,4'}, {'order': 'up'}, {'limit': 'x'}, {'cursor': 'abc'},
+])
+def test_bad_arguments_are_request_errors(args):
+    with pytest.raises(InvalidRequest):
+        parse_search_args(args)
@@ -0,0 +1,62 @@
+import json
+import sqlite3
+
+import pytest
+
+from errors import InvalidRequest
+from solution_stream import iter_path_boards, iter_solution_steps, parse_format, parse_stream_args, stream_export
+
+PATH = 'NxNNKKKRRRRBBBBN;NNNxKKKRRRRBBBBN'
+
+
+class TrackedConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.closed = 0
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def close(self):
+        self.closed += 1
+
+
+def test_path_is_walked_board_by_board():
+    assert list(iter_path_boards(PATH)) == PATH.split(';')
+    assert list(iter_path_boards('')) == []
+
+
+def test_moves_format_yields_square_pairs():
+    assert list(iter_solution_steps(PATH, 'moves')) == [{'type': 'step', 'step': 1, 'move': [3, 1]}]
+
+
+def test_export_streams_every_row_and_closes_the_connection(monkeypatch):
+    monkeypatch.setattr('solution_stream.EXPORT_BATCH_SIZE', 3)
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE solutions (id INTEGER PRIMARY KEY, moves INTEGER)')
+    conn.executemany('INSERT INTO solutions VALUES (?, ?)', [(i, i % 4) for i in range(10)])
+    tracked = TrackedConnection(conn)
+
+    chunks = list(stream_export(tracked, 'SELECT id, moves FROM solutions WHERE id > ? ORDER BY id', [2],
+                                dict, {'target': 'top-row'}, 'ndjson'))
+    records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert records[0]['type'] == 'export'
+    assert [record['id'] for record in records[1:-1]] == list(range(3, 10))
+    assert records[-1] == {'type': 'end', 'solutions': 7, 'last_id': 9}
+    # Header, three batches, end record
+    assert len(chunks) == 5
+    assert tracked.closed == 1
+
+
+@pytest.mark.parametrize('args', [{'format': 'svg'}, {'transport': 'websocket'}])
+def test_bad_stream_arguments_are_request_errors(args):
+    with pytest.raises(InvalidRequest):
+        parse_stream_args(args)
+
+
+def test_format_defaults_per_endpoint():
+    assert parse_format({}) == 'boards'
+    assert parse_stream_args({}) == ('moves', 'ndjson')
+    with pytest.raises(InvalidRequest):
+        parse_format({'format': 'svg'})
@@ -0,0 +1,41 @@
+from hippodrome.solver import UNSOLVABLE, heuristic, solve_astar, solve_ida
+
+from .conftest import SMALL_GEOMETRY, SMALL_TARGET
+from .test_distances import sample_boards
+
+
+def is_solution(path):
+    return all(child in SMALL_GEOMETRY.next_states(board) for board, child in zip(path, path[1:]))
+
+
+def test_ida_is_optimal():
+    for board in sample_boards(25, seed=2):
+        expected = solve_astar(board, SMALL_TARGET, geometry=SMALL_GEOMETRY)
+        for tt_size in (0, 4096):
+            path = solve_ida(board, SMALL_TARGET, tt_size=tt_size, max_depth=20, geometry=SMALL_GEOMETRY)
+            assert len(path) == len(expected), (board, tt_size)
+            assert is_solution(path)
+
+
+def test_ida_gives_up_past_max_depth(small_table):
+    board = next(board for board in sample_boards(50, seed=3) if (small_table.distance(board) or 0) > 4)
+    assert solve_ida(board, SMALL_TARGET, max_depth=3, geometry=SMALL_GEOMETRY) == []
+
+
+def test_initial_heuristic_is_admissible(small_table):
+    for board in sample_boards(25, seed=4):
+        stats = {}
+        path = solve_ida(board, SMALL_TARGET, max_depth=20, stats=stats, geometry=SMALL_GEOMETRY)
+        if path:
+            assert stats['initial_h'] <= small_table.distance(board) == len(path) - 1
+
+
+def test_unreachable_knight_makes_the_board_unsolvable():
+    # A knight in the centre of a 3x3 board never moves, and no other
+    # knight can reach it
+    board = 'KxKBNBNRN'
+    assert heuristic(board, SMALL_TARGET, SMALL_GEOMETRY) == UNSOLVABLE
+    stats = {}
+    assert solve_astar(board, SMALL_TARGET, stats=stats, geometry=SMALL_GEOMETRY) == []
+    assert stats['initial_h'] is None
+    assert solve_ida(board, SMALL_TARGET, max_depth=20, geometry=SMALL_GEOMETRY) == []
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from target_manager import TargetManager
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def databases(tmp_path):
+    paths = {}
+    for name in ('a', 'b', 'c'):
+        path = tmp_path / f'{name}.db'
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE solutions (id INTEGER PRIMARY KEY)')
+        conn.commit()
+        conn.close()
+        paths[name] = str(path)
+    return paths
+
+
+def make_manager(databases, budget_mb):
+    # One connection's page cache is 1 MB and nothing else is counted
+    return TargetManager(databases.__getitem__, budget_bytes=int(budget_mb * MB), mmap_bytes=0,
+                         page_cache_kib=1024, result_cache_bytes=0, max_idle=1)
+
+
+def test_least_recently_used_idle_target_is_evicted(databases):
+    manager = make_manager(databases, 2.5)
+    for name in ('a', 'b', 'c'):
+        manager.connect(name).close()
+    assert list(manager.targets) == ['b', 'c']
+    assert manager.evictions == 1
+
+    manager.connect('b').close()
+    manager.connect('a').close()
+    assert list(manager.targets) == ['b', 'a']
+
+
+def test_targets_in_use_are_never_evicted(databases):
+    manager = make_manager(databases, 1)
+    held = manager.connect('a')
+    target = manager.targets['a']
+    manager.connect('b').close()
+    assert 'a' in manager.targets
+    assert manager.evict('a') is False
+
+    # Once released it is the least recently used idle target
+    held.close()
+    held.close()  # closing twice releases once
+    assert target.in_use == 0
+    assert list(manager.targets) == ['b']
+
+
+def test_cached_results_survive_until_eviction(databases):
+    manager = TargetManager(databases.__getitem__, budget_bytes=100 * MB, mmap_bytes=0,
+                            page_cache_kib=1024, result_cache_bytes=MB)
+    calls = []
+    compute = lambda: calls.append(1) or 42
+    assert manager.cached('a', 'answer', compute) == 42
+    assert manager.cached('a', 'answer', compute) == 42
+    assert len(calls) == 1
+
+    assert manager.evict('a') is True
+    manager.cached('a', 'answer', compute)
+    assert len(calls) == 2
+    assert manager.cache_totals()['a'] == {'hit': 1, 'miss': 2}
+
+
+def test_preload_room_accounts_for_a_full_target(databases):
+    manager = make_manager(databases, 2.5)
+    assert manager.target_bytes() == MB
+    manager.connect('a').close()
+    manager.connect('b').close()
+    assert manager.has_room('a')
+    assert not manager.has_room('c')
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Hippodrome Solution Validator
+Checks every stored solution step by step against the puzzle's move rules
+
+Solutions are read from a solutions CSV, a target database or a columnar
+export (exported with --with-paths), packed into
+NumPy arrays of board bytes and checked in vectorized batches across worker
+processes. For every solution it reports malformed paths, paths that do not
+start at the initial board, illegal steps, endpoints that miss the target,
+move counts that disagree with the path and, given a reference distance
+table, solutions that are not optimal.  The board size is read from the
+store's metadata (4x4 when it has none) or given with --size.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from hippodrome.board import DEFAULT_GEOMETRY, EMPTY, Geometry, get_geometry, parse_geometry, target_from_filename
+from hippodrome.columnar import columnar_metadata, columnar_schema, is_columnar, iter_solution_records
+from hippodrome.configs import rank_boards
+from hippodrome.distances import UNREACHABLE, DistanceTable, legal_move_table
+
+# Issue kinds that make a store invalid; 'unsolved' rows are only counted
+FAILURE_KINDS = (
+    'malformed',
+    'wrong_start',
+    'illegal_step',
+    'not_goal',
+    'wrong_move_count',
+    'non_optimal',
+    'beats_reference',
+)
+
+SolutionRecord = Tuple[int, str, str, int]
+
+
+EMPTY_BYTE = ord(EMPTY)
+KNIGHT_BYTE = ord('N')
+SEPARATOR_BYTE = ord(';')
+
+# Per-worker state, set by init_worker
+_target = None
+_reference = None
+_geometry = DEFAULT_GEOMETRY
+
+
+def init_worker(target: Sequence[int], reference, size: str = DEFAULT_GEOMETRY.name) -> None:
+    global _target, _reference, _geometry
+    _target = np.asarray(target, dtype=np.intp)
+    _geometry = parse_geometry(size)
+    # Whole-state-space tables are opened by path so every worker maps
+    # the same file instead of receiving a copy
+    _reference = DistanceTable(reference) if isinstance(reference, str) else reference
+
+
+def reference_distances(ids: np.ndarray, initial_boards: np.ndarray) -> np.ndarray:
+    """Optimal move counts from the reference, UNREACHABLE where unknown"""
+    optimal = np.full(len(ids), UNREACHABLE, dtype=np.int64)
+
+    if isinstance(_reference, DistanceTable):
+        # Indexed by board rank; queens count as kings in tables without them
+        boards = initial_boards.copy()
+        if 'Q' not in _reference.pieces:
+            boards[boards == ord('Q')] = ord('K')
+        pieces = np.frombuffer(_reference.pieces.encode('ascii'), dtype=np.uint8)
+        known = (np.sort(boards, axis=1) == pieces).all(axis=1)
+        if known.any():
+            optimal[known] = _reference.table[rank_boards(boards[known], _reference.pieces)]
+        return optimal
+
+    known = ids < len(_reference)
+    optimal[known] = _reference[ids[known]]
+    return optimal
+
+
+def validate_chunk(chunk: List[SolutionRecord], max_samples: int = 20) -> Dict:
+    """
+    Validate a batch of solutions with array operations
+
+    Args:
+        chunk: (id, initial board, solution path, moves) records
+        max_samples: Issues to keep as examples per kind
+
+    Returns:
+        Dict with issue counts, example issues and the number of checked steps
+    """
+    counts = {kind: 0 for kind in FAILURE_KINDS + ('unsolved',)}
+    samples = []
+
+    def report(kind, config_id, detail):
+        counts[kind] += 1
+        if sum(1 for s in samples if s[0] == kind) < max_samples:
+            samples.append((kind, int(config_id), detail))
+
+    squares = _geometry.squares
+    ids, moves, paths = [], [], []
+    for config_id, initial_board, path, move_count in chunk:
+        if move_count < 0 or not path:
+            counts['unsolved'] += 1
+            continue
+        board_count = path.count(';') + 1
+        if len(path) != (squares + 1) * board_count - 1:
+            report('malformed', config_id, f'boards are not {squares} characters')
+            continue
+        if initial_board and path[:squares] != initial_board.strip().replace(' ', EMPTY):
+            report('wrong_start', config_id, f'path starts at {path[:squares]}, expected {initial_board}')
+        ids.append(config_id)
+        moves.append(move_count)
+        paths.append(path)
+
+    if not paths:
+        return {'counts': counts, 'samples': samples, 'steps': 0, 'solutions': 0}
+
+    # One row per board: the board bytes plus the ';' that follows it
+    raw = np.frombuffer((';'.join(paths) + ';').encode('ascii', 'replace'), dtype=np.uint8).reshape(-1, squares + 1)
+    boards = raw[:, :squares]
+    board_counts = np.array([(len(p) + 1) // (squares + 1) for p in paths])
+    starts = np.cumsum(board_counts) - board_counts
+    ends = starts + board_counts - 1
+    owner = np.repeat(np.arange(len(paths)), board_counts)
+    ids = np.array(ids)
+    moves = np.array(moves)
+
+    # Structure of each board: exactly one empty square and a separator
+    board_ok = ((boards == EMPTY_BYTE).sum(axis=1) == 1) & (raw[:, squares] == SEPARATOR_BYTE)
+    bad_owner = np.zeros(len(paths), dtype=bool)
+    bad_owner[owner[~board_ok]] = True
+    for i in np.flatnonzero(bad_owner):
+        report('malformed', ids[i], 'a board does not have exactly one empty square')
+
+    # Transitions: the piece that lands on the old empty square must have
+    # come from the new empty square by a legal move, nothing else changes
+    prev, nxt = boards[:-1], boards[1:]
+    same_solution = owner[:-1] == owner[1:]
+    rows = np.arange(len(prev))
+    empty_before = np.argmax(prev == EMPTY_BYTE, axis=1)
+    empty_after = np.argmax(nxt == EMPTY_BYTE, axis=1)
+    piece = prev[rows, empty_after]
+    legal = (
+        ((prev != nxt).sum(axis=1) == 2)
+        & (nxt[rows, empty_before] == piece)
+        & legal_move_table(_geometry)[piece, empty_after, empty_before]
+        & board_ok[:-1] & board_ok[1:]
+    )
+    illegal = same_solution & ~legal
+    illegal_owner = owner[:-1][illegal]
+    illegal_rows = np.flatnonzero(illegal)
+    _, first = np.unique(illegal_owner, return_index=True)
+    for row in illegal_rows[first]:
+        i = owner[row]
+        if not bad_owner[i]:
+            step = row - starts[i] + 1
+            report('illegal_step', ids[i], f'step {step}: {bytes(prev[row]).decode()} -> {bytes(nxt[row]).decode()}')
+
+    # Endpoint must put knights on every target square
+    final = boards[ends]
+    reached = (final[:, _target] == KNIGHT_BYTE).all(axis=1)
+    for i in np.flatnonzero(~reached & ~bad_owner):
+        report('not_goal', ids[i], f'ends at {bytes(final[i]).decode()}')
+
+    # Stored move count must match the path length
+    for i in np.flatnonzero(moves != board_counts - 1):
+        report('wrong_move_count', ids[i], f'moves={moves[i]}, path has {board_counts[i] - 1} steps')
+
+    # Optimality against the reference distance table
+    if _reference is not None:
+        optimal = reference_distances(ids, boards[starts])
+        known = optimal < UNREACHABLE
+        for i in np.flatnonzero(known & (moves > optimal)):
+            report('non_optimal', ids[i], f'moves={moves[i]}, optimal={optimal[i]}')
+        for i in np.flatnonzero(known & (moves < optimal)):
+            report('beats_reference', ids[i], f'moves={moves[i]}, reference={optimal[i]}')
+
+    return {'counts': counts, 'samples': samples, 'steps': int(same_solution.sum()), 'solutions': len(paths)}
+
+
+def _validate_chunk(chunk: List[SolutionRecord]) -> Dict:
+    return validate_chunk(chunk)
+
+
+def read_csv_chunks(csv_file: str, chunk_size: int) -> Iterator[List[SolutionRecord]]:
+    """Yield solution records from a solver CSV (ID,Initial Board,Solution Path,Moves,Time)"""
+    chunk = []
+    with open(csv_file, 'r', encoding='utf-8', errors='replace') as file:
+        file.readline()  # Skip header row
+        for line in file:
+            parts = line.rstrip('\r\n').split(',')
+            if len(parts) < 4:
+                continue
+            try:
+                chunk.append((int(parts[0]), parts[1], parts[2], int(parts[3])))
+            except ValueError:
+                continue
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_db_chunks(db_file: str, chunk_size: int) -> Iterator[List[SolutionRecord]]:
+    """Yield solution records from a target database"""
+    conn = sqlite3.connect(f'file:{db_file}?mode=ro', uri=True)
+    try:
+        cursor = conn.execute('SELECT id, initial_board, solution_path, moves FROM solutions ORDER BY id')
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        conn.close()
+
+
+def is_database(path: str) -> bool:
+    return path.endswith(('.db', '.sqlite', '.sqlite3'))
+
+
+def read_chunks(store: str, chunk_size: int) -> Iterator[List[SolutionRecord]]:
+    if is_database(store):
+        return read_db_chunks(store, chunk_size)
+    if is_columnar(store):
+        return iter_solution_records(store, chunk_size)
+    return read_csv_chunks(store, chunk_size)
+
+
+def store_metadata(store: str) -> Dict[str, str]:
+    """Key/value metadata of a target database or columnar export ({} for CSVs)"""
+    if is_database(store):
+        conn = sqlite3.connect(f'file:{store}?mode=ro', uri=True)
+        try:
+            return dict(conn.execute('SELECT key, value FROM metadata').fetchall())
+        except sqlite3.Error:
+            return {}
+        finally:
+            conn.close()
+    if is_columnar(store):
+        return columnar_metadata(store)
+    return {}
+
+
+def resolve_geometry(store: str, size: Optional[str]) -> Geometry:
+    """Board size from the command line or the store's metadata, 4x4 by default"""
+    if size:
+        return parse_geometry(size)
+    metadata = store_metadata(store)
+    if 'board_width' in metadata:
+        return get_geometry(int(metadata['board_width']), int(metadata['board_height']))
+    return DEFAULT_GEOMETRY
+
+
+def resolve_target(store: str, target: Optional[str], geometry: Geometry = DEFAULT_GEOMETRY) -> Tuple[int, ...]:
+    """Target squares from the command line, the database metadata or the filename"""
+    if target:
+        return geometry.parse_target(target)
+
+    positions = store_metadata(store).get('target_positions')
+    if positions:
+        return geometry.parse_target(positions)
+
+    name = target_from_filename(os.path.basename(store))
+    if name is None:
+        raise ValueError(f'Cannot infer the target of {store}; pass --target')
+    return geometry.parse_target(name)
+
+
+def load_reference(path: str):
+    """
+    Load reference distances
+
+    Accepts a whole-state-space table from build_distances.py (returned as
+    its path, indexed by board rank), a plain .npy array indexed by
+    configuration ID (255 = unknown), or another solutions CSV/database
+    whose move counts are trusted to be optimal.
+    """
+    if path.endswith('.npy'):
+        if os.path.exists(os.path.splitext(path)[0] + '.json'):
+            DistanceTable(path)  # Fail early on a table that does not load
+            return path
+        return np.asarray(np.load(path, mmap_mode='r'))
+
+    ids, moves = [], []
+    for chunk in read_chunks(path, 50000):
+        for config_id, _, _, move_count in chunk:
+            ids.append(config_id)
+            moves.append(move_count)
+
+    table = np.full(max(ids) + 1 if ids else 0, UNREACHABLE, dtype=np.uint8)
+    ids = np.array(ids)
+    moves = np.array(moves)
+    solved = (moves >= 0) & (moves < UNREACHABLE)
+    table[ids[solved]] = moves[solved]
+    return table
+
+
+def validate_store(store: str, target: Sequence[int], reference=None,
+                   workers: int = 1, chunk_size: int = 20000, max_samples: int = 20,
+                   geometry: Geometry = DEFAULT_GEOMETRY) -> Dict:
+    """
+    Validate every solution in a CSV or database
+
+    Returns:
+        Dict with totals, issue counts and example issues
+    """
+    totals = {'counts': {kind: 0 for kind in FAILURE_KINDS + ('unsolved',)}, 'samples': [], 'steps': 0, 'solutions': 0}
+
+    def merge(result):
+        totals['steps'] += result['steps']
+        totals['solutions'] += result['solutions']
+        for kind, count in result['counts'].items():
+            totals['counts'][kind] += count
+        for sample in result['samples']:
+            if sum(1 for s in totals['samples'] if s[0] == sample[0]) < max_samples:
+                totals['samples'].append(sample)
+
+    chunks = read_chunks(store, chunk_size)
+    if workers <= 1:
+        init_worker(target, reference, geometry.name)
+        for chunk in chunks:
+            merge(validate_chunk(chunk, max_samples))
+    else:
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(target, reference, geometry.name)) as pool:
+            for result in pool.imap_unordered(_validate_chunk, chunks):
+                merge(result)
+
+    return totals
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Validate Hippodrome solutions step by step')
+    parser.add_argument('store', help='Solutions CSV, target database (.db) or columnar export (.parquet/.arrow)')
+    parser.add_argument('--target', help="Target name or squares like '0,1,2,3' (inferred if omitted)")
+    parser.add_argument('--reference', help='Distance table (.npy) or trusted CSV/.db to check optimality')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--chunk-size', type=int, default=20000, help='Solutions per batch')
+    parser.add_argument('--max-report', type=int, default=10, help='Examples shown per issue kind')
+    parser.add_argument('--size', help="Board size such as '5x5' (default: from the store, else 4x4)")
+    args = parser.parse_args()
+
+    print("🏇 Hippodrome Solution Validator 🏇")
+    print("=" * 40)
+
+    try:
+        geometry = resolve_geometry(args.store, args.size)
+        target = resolve_target(args.store, args.target, geometry)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    reference = None
+    if args.reference:
+        print(f"Loading reference distances from: {args.reference}")
+        reference = load_reference(args.reference)
+        if isinstance(reference, str):
+            table = DistanceTable(reference)
+            if tuple(table.target) != tuple(target):
+                print(f"Error: {args.reference} was built for a different target")
+                sys.exit(2)
+            if table.geometry is not geometry:
+                print(f"Error: {args.reference} was built for a {table.geometry.name} board")
+                sys.exit(2)
+
+    if is_columnar(args.store) and 'path' not in columnar_schema(args.store).names:
+        print(f"Error: {args.store} was exported without solution paths (use export_columnar.py --with-paths)")
+        sys.exit(2)
+
+    print(f"Validating: {args.store}")
+    print(f"Board: {geometry.name} | Target squares: {','.join(map(str, target))} | Workers: {args.workers}")
+
+    start = time.perf_counter()
+    totals = validate_store(args.store, target, reference, args.workers, args.chunk_size, args.max_report,
+                            geometry)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nChecked {totals['solutions']:,} solutions / {totals['steps']:,} steps "
+          f"in {elapsed:.2f}s ({totals['steps'] / max(elapsed, 1e-9):,.0f} steps/s)")
+    print(f"Unsolved rows: {totals['counts']['unsolved']:,}")
+
+    failures = 0
+    for kind in FAILURE_KINDS:
+        count = totals['counts'][kind]
+        failures += count
+        marker = '✅' if count == 0 else '❌'
+        print(f"{marker} {kind}: {count:,}")
+        for sample_kind, config_id, detail in totals['samples']:
+            if sample_kind == kind:
+                print(f"     • ID {config_id}: {detail}")
+
+    if failures:
+        print(f"\n❌ {failures:,} problems found")
+        sys.exit(1)
+    print("\n✅ All solutions valid")
+
+
+if __name__ == "__main__":
+    main()
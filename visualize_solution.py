@@ -2,24 +2,48 @@
 """
 Hippodrome Solution Visualizer
 Reads solution CSV and visualizes the board states step by step
+
+Single configurations are looked up through a sidecar id -> byte offset
+index (<csv>.offsets) that is built on first use, so opening any config
+costs one seek regardless of its position. SQLite target databases built
+by create_target_databases.py can be opened directly as well.
+Boards of other sizes are drawn with --size (e.g. --size 5x5).
 """
 
 import csv
+import mmap
+import os
+import sqlite3
+import struct
 import sys
 import time
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
+
+from hippodrome.board import DEFAULT_GEOMETRY, Geometry, parse_geometry
+
+# Sidecar offset index: header (magic, csv size, csv mtime, record count)
+# followed by (id, byte offset) records sorted by id
+INDEX_MAGIC = b'HIPPOIDX'
+INDEX_HEADER = struct.Struct('<8sQQQ')
+INDEX_RECORD = struct.Struct('<qq')
+
+CSV_FIELDS = ['ID', 'Initial Board', 'Solution Path', 'Moves', 'Time (ms)']
 
-def print_board(board_state: str, step_num: int = None, total_steps: int = None) -> None:
+SolutionRow = Tuple[int, str, str, int, float]
+
+def print_board(board_state: str, step_num: int = None, total_steps: int = None,
+                geometry: Geometry = DEFAULT_GEOMETRY) -> None:
     """
-    Print a visual representation of the 4x4 board
+    Print a visual representation of the board
     
     Args:
-        board_state: 16-character string representing the board
+        board_state: Row-major string of width * height squares
         step_num: Current step number (optional)
         total_steps: Total number of steps (optional)
+        geometry: Board size (default 4x4)
     """
-    if len(board_state) != 16:
-        print(f"Error: Board state must be 16 characters, got {len(board_state)}")
+    if len(board_state) != geometry.squares:
+        print(f"Error: Board state must be {geometry.squares} characters, got {len(board_state)}")
         return
     
     # Print step header if provided
@@ -28,20 +52,19 @@ def print_board(board_state: str, step_num: int = None, total_steps: int = None)
     elif step_num is not None:
         print(f"\n=== Step {step_num} ===")
     
-    print("┌───┬───┬───┬───┐")
-    for row in range(4):
+    print("┌" + "┬".join(["───"] * geometry.width) + "┐")
+    for row, cells in enumerate(geometry.rows(board_state)):
         print("│", end="")
-        for col in range(4):
-            char = board_state[row * 4 + col]
+        for char in cells:
             # Replace 'x' with space for better visualization
             display_char = ' ' if char == 'x' else char
             print(f" {display_char} │", end="")
         print()
         
-        if row < 3:
-            print("├───┼───┼───┼───┤")
+        if row < geometry.height - 1:
+            print("├" + "┼".join(["───"] * geometry.width) + "┤")
         else:
-            print("└───┴───┴───┴───┘")
+            print("└" + "┴".join(["───"] * geometry.width) + "┘")
 
 def parse_solution_path(solution_path: str) -> List[str]:
     """
@@ -59,7 +82,8 @@ def parse_solution_path(solution_path: str) -> List[str]:
     return [state.strip() for state in solution_path.split(';') if state.strip()]
 
 def visualize_solution(config_id: int, initial_board: str, solution_path: str, 
-                      moves: int, time_ms: float, interactive: bool = True) -> None:
+                      moves: int, time_ms: float, interactive: bool = True,
+                      geometry: Geometry = DEFAULT_GEOMETRY) -> None:
     """
     Visualize a complete solution step by step
     
@@ -70,6 +94,7 @@ def visualize_solution(config_id: int, initial_board: str, solution_path: str,
         moves: Number of moves
         time_ms: Time taken to solve
         interactive: Whether to wait for user input between steps
+        geometry: Board size (default 4x4)
     """
     print(f"\n{'='*60}")
     print(f"SOLUTION VISUALIZATION - Config ID: {config_id}")
@@ -88,10 +113,10 @@ def visualize_solution(config_id: int, initial_board: str, solution_path: str,
     # Show each step
     for i, board_state in enumerate(board_states):
         step_num = i + 1
-        print_board(board_state, step_num, total_steps)
+        print_board(board_state, step_num, total_steps, geometry)
         
         # Show goal achievement
-        if board_state.startswith("NNNN"):
+        if board_state.startswith("N" * geometry.width):
             print("\n🎉 GOAL ACHIEVED! All knights are in the top row!")
         
         # Interactive mode - wait for user input
@@ -108,56 +133,191 @@ def visualize_solution(config_id: int, initial_board: str, solution_path: str,
     
     print(f"\n✅ Solution complete! Solved in {moves} moves.")
 
-def load_and_visualize_solutions(csv_file: str, config_id: Optional[int] = None) -> None:
+def index_path_for(csv_file: str) -> str:
+    """Path of the sidecar offset index for a CSV file"""
+    return csv_file + '.offsets'
+
+def build_offset_index(csv_file: str, index_file: Optional[str] = None) -> int:
     """
-    Load solutions from CSV and visualize them
+    Scan a solution CSV once and persist an id -> byte offset index
     
     Args:
         csv_file: Path to the CSV file
+        index_file: Where to write the index (defaults to <csv>.offsets)
+        
+    Returns:
+        Number of indexed rows
+    """
+    index_file = index_file or index_path_for(csv_file)
+    records = []
+    
+    with open(csv_file, 'rb') as file:
+        offset = len(file.readline())  # Skip header row
+        for line in file:
+            comma = line.find(b',')
+            if comma > 0:
+                try:
+                    records.append((int(line[:comma]), offset))
+                except ValueError:
+                    pass
+            offset += len(line)
+    
+    records.sort()
+    stat = os.stat(csv_file)
+    
+    # Write to a temporary file first so readers never see a partial index
+    temp_file = index_file + '.tmp'
+    with open(temp_file, 'wb') as out:
+        out.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(records)))
+        out.write(b''.join(INDEX_RECORD.pack(row_id, row_offset) for row_id, row_offset in records))
+    os.replace(temp_file, index_file)
+    
+    return len(records)
+
+def lookup_offset(index_file: str, csv_file: str, config_id: int) -> Optional[int]:
+    """
+    Binary search the memory-mapped offset index for a config ID
+    
+    Returns:
+        Byte offset of the row, None if the ID is absent
+        
+    Raises:
+        ValueError: If the index is missing a header or is stale for the CSV
+    """
+    stat = os.stat(csv_file)
+    with open(index_file, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            if len(index) < INDEX_HEADER.size:
+                raise ValueError('Truncated offset index')
+            magic, size, mtime_ns, count = INDEX_HEADER.unpack_from(index, 0)
+            if magic != INDEX_MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                raise ValueError('Stale offset index')
+            
+            low, high = 0, count - 1
+            while low <= high:
+                mid = (low + high) // 2
+                row_id, offset = INDEX_RECORD.unpack_from(index, INDEX_HEADER.size + mid * INDEX_RECORD.size)
+                if row_id == config_id:
+                    return offset
+                if row_id < config_id:
+                    low = mid + 1
+                else:
+                    high = mid - 1
+    return None
+
+def find_csv_row(csv_file: str, config_id: int) -> Optional[SolutionRow]:
+    """
+    Fetch one row of a solution CSV by seeking to its indexed offset
+    
+    The index is built (or rebuilt, when the CSV changed) on first use.
+    """
+    index_file = index_path_for(csv_file)
+    try:
+        offset = lookup_offset(index_file, csv_file, config_id)
+    except (OSError, ValueError):
+        print(f"Building offset index {index_file} (one-time scan)...")
+        build_offset_index(csv_file, index_file)
+        offset = lookup_offset(index_file, csv_file, config_id)
+    
+    if offset is None:
+        return None
+    
+    with open(csv_file, 'rb') as file:
+        file.seek(offset)
+        line = file.readline().decode('utf-8')
+    
+    row = dict(zip(CSV_FIELDS, next(csv.reader([line]))))
+    return parse_csv_row(row)
+
+def parse_csv_row(row: dict) -> SolutionRow:
+    """Convert a CSV row dict into a solution tuple"""
+    return (
+        int(row['ID']),
+        row['Initial Board'],
+        row['Solution Path'],
+        int(row['Moves']),
+        float(row['Time (ms)']),
+    )
+
+def iter_csv_solutions(csv_file: str, config_id: Optional[int] = None) -> Iterator[SolutionRow]:
+    """Yield solutions from a CSV, using the offset index for a single ID"""
+    if config_id is not None:
+        row = find_csv_row(csv_file, config_id)
+        if row is not None:
+            yield row
+        return
+    
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield parse_csv_row(row)
+
+def iter_sqlite_solutions(db_file: str, config_id: Optional[int] = None) -> Iterator[SolutionRow]:
+    """Yield solutions from a target database built by create_target_databases.py"""
+    if not os.path.exists(db_file):
+        raise FileNotFoundError(db_file)
+    
+    conn = sqlite3.connect(f'file:{db_file}?mode=ro', uri=True)
+    try:
+        query = 'SELECT id, initial_board, solution_path, moves, time_ms FROM solutions'
+        if config_id is not None:
+            yield from conn.execute(query + ' WHERE id = ?', (config_id,))
+        else:
+            yield from conn.execute(query + ' ORDER BY id')
+    finally:
+        conn.close()
+
+def iter_solutions(store: str, config_id: Optional[int] = None) -> Iterator[SolutionRow]:
+    """
+    Yield solution rows from a CSV file or a SQLite target database
+    
+    Args:
+        store: Path to a solutions CSV or a .db file
+        config_id: Specific config ID to load (None for all)
+    """
+    if store.endswith(('.db', '.sqlite', '.sqlite3')):
+        return iter_sqlite_solutions(store, config_id)
+    return iter_csv_solutions(store, config_id)
+
+def load_and_visualize_solutions(csv_file: str, config_id: Optional[int] = None,
+                                 geometry: Geometry = DEFAULT_GEOMETRY) -> None:
+    """
+    Load solutions from CSV (or a SQLite target database) and visualize them
+    
+    Args:
+        csv_file: Path to the CSV file or .db file
         config_id: Specific config ID to visualize (None for all)
+        geometry: Board size (default 4x4)
     """
     try:
-        with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            solutions_found = False
+        solutions_found = False
+        
+        for row_id, initial_board, solution_path, moves, time_ms in iter_solutions(csv_file, config_id):
+            solutions_found = True
             
-            for row in reader:
-                row_id = int(row['ID'])
-                
-                # Skip if specific config requested and this isn't it
-                if config_id is not None and row_id != config_id:
-                    continue
-                
-                solutions_found = True
-                initial_board = row['Initial Board']
-                solution_path = row['Solution Path']
-                moves = int(row['Moves']) if row['Moves'] != '-1' else 0
-                time_ms = float(row['Time (ms)'])
-                
-                # Check if solution exists
-                if moves <= 0 or not solution_path:
-                    print(f"\nConfig ID {row_id}: No solution found")
-                    continue
-                
-                # Visualize this solution
-                visualize_solution(row_id, initial_board, solution_path, moves, time_ms)
-                
-                # Ask if user wants to continue to next solution
-                if config_id is None:
-                    user_input = input("\nVisualize next solution? (y/n/q): ").strip().lower()
-                    if user_input in ['n', 'q']:
-                        break
+            # Check if solution exists
+            if moves <= 0 or not solution_path:
+                print(f"\nConfig ID {row_id}: No solution found")
+                continue
             
-            if not solutions_found:
-                if config_id is not None:
-                    print(f"No solution found for config ID {config_id}")
-                else:
-                    print("No solutions found in the CSV file")
-                    
+            # Visualize this solution
+            visualize_solution(row_id, initial_board, solution_path, moves, time_ms, geometry=geometry)
+            
+            # Ask if user wants to continue to next solution
+            if config_id is None:
+                user_input = input("\nVisualize next solution? (y/n/q): ").strip().lower()
+                if user_input in ['n', 'q']:
+                    break
+        
+        if not solutions_found:
+            if config_id is not None:
+                print(f"No solution found for config ID {config_id}")
+            else:
+                print("No solutions found in the CSV file")
+                
     except FileNotFoundError:
-        print(f"Error: CSV file '{csv_file}' not found!")
+        print(f"Error: File '{csv_file}' not found!")
     except Exception as e:
-        print(f"Error reading CSV file: {e}")
+        print(f"Error reading solutions: {e}")
 
 def main():
     """Main function"""
@@ -167,23 +327,35 @@ def main():
     # Default CSV file
     csv_file = "solutions_csv/first_5_solutions.csv"
     
+    # Optional --size WxH for boards other than 4x4
+    args = sys.argv[1:]
+    geometry = DEFAULT_GEOMETRY
+    if '--size' in args:
+        index = args.index('--size')
+        try:
+            geometry = parse_geometry(args[index + 1] if index + 1 < len(args) else '')
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        del args[index:index + 2]
+    
     # Check command line arguments
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
+    if len(args) > 0:
+        csv_file = args[0]
     
     config_id = None
-    if len(sys.argv) > 2:
+    if len(args) > 1:
         try:
-            config_id = int(sys.argv[2])
+            config_id = int(args[1])
         except ValueError:
-            print(f"Error: Invalid config ID '{sys.argv[2]}'. Must be an integer.")
+            print(f"Error: Invalid config ID '{args[1]}'. Must be an integer.")
             return
     
     print(f"Reading solutions from: {csv_file}")
     if config_id is not None:
         print(f"Showing only config ID: {config_id}")
     
-    load_and_visualize_solutions(csv_file, config_id)
+    load_and_visualize_solutions(csv_file, config_id, geometry)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file